@@ -1,6 +1,7 @@
 import pandas as pd
 
 from src.models.bart_sentiment_analyzer import UniversalSentimentAnalyzer
+from src.utils.score_cache import ScoreCache
 from config import config
 
 
@@ -14,8 +15,8 @@ def analyze_news_articles(df: pd.DataFrame, crypto: str) -> pd.DataFrame:
         output_columns=["date", "title", "subtitle", "sentiment"],
         output_path=config.DATA_DIR / "temp" / f"news_sentiment_{crypto.lower()}.csv",
         device="cpu",
-        batch_size=8,
         verbose=True,
+        cache=ScoreCache(config.DATA_DIR / "cache" / "sentiment_scores.sqlite"),
     )
 
     return analyzer.analyze(df, "2017-01-01", "2022-12-31")
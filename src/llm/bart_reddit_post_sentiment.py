@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 from src.models.bart_sentiment_analyzer import UniversalSentimentAnalyzer
+from src.utils.score_cache import ScoreCache
 from config import config
 
 
@@ -31,8 +32,8 @@ def analyze_reddit_posts(
         date_column="date",
         device="cpu",
         threshold=0.25,
-        batch_size=8,
         verbose=True,
+        cache=ScoreCache(config.DATA_DIR / "cache" / "sentiment_scores.sqlite"),
         output_path=output_path,
         output_columns=["date", "title", "selftext", "score"],
     )
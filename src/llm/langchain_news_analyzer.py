@@ -1,4 +1,5 @@
 import os, csv
+import json
 import pandas as pd
 import numpy as np
 from langchain_core.prompts import ChatPromptTemplate
@@ -6,15 +7,24 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
 from datetime import datetime
 from config import config
+from src.utils.score_cache import ScoreCache
+
+MODEL_NAME = "deepseek-chat"
+TEMPERATURE = 0.4
 
 
 class CryptoNewsSentimentAnalyzer:
-    def __init__(self, verbose=False, output_file_path=None):
+    def __init__(self, verbose=False, output_file_path=None, cache=None):
         self.verbose = verbose
+        # scores of already classified (title, subtitle) pairs, see classify_article
+        self.cache = cache
         self.output_file_path = (
             output_file_path or config.DATA_DIR / "temp" / "output.csv"
         )
         self.chain = self._create_chain()
+        self.cache_namespace = ScoreCache.namespace(
+            "langchain-news", MODEL_NAME, TEMPERATURE, self.prompt_template
+        )
         self._initialize_output_file()
 
     def _initialize_output_file(self):
@@ -24,8 +34,7 @@ class CryptoNewsSentimentAnalyzer:
                 writer.writerow(["date", "title", "subtitle", "score"])
 
     def _create_chain(self):
-        prompt = ChatPromptTemplate.from_template(
-            """
+        self.prompt_template = """
             You are a financial news sentiment analyst with expertise in cryptocurrency. You will receive an article with two parts: a "title" and a "subtitle". Your task is to analyze the article and decide if it is directly relevant to cryptocurrency financial news.
 
             For each article, do the following:
@@ -47,30 +56,43 @@ class CryptoNewsSentimentAnalyzer:
             Subtitle: {subtitle}
             Analysis:
             """
-        )
+        prompt = ChatPromptTemplate.from_template(self.prompt_template)
 
         llm = ChatOpenAI(
             base_url="https://api.deepseek.com/v1",
             api_key=config.DEEPSEEK_API_KEY,
-            model="deepseek-chat",
-            temperature=0.4,
+            model=MODEL_NAME,
+            temperature=TEMPERATURE,
             max_tokens=5,
         )
 
         return prompt | llm | StrOutputParser()
 
     def classify_article(self, title: str, subtitle: str) -> float:
+        key = None
+        if self.cache is not None:
+            # a JSON pair, so ("A B", "") and ("A", "B") get different keys
+            pair = json.dumps([title.strip(), subtitle.strip()])
+            key = ScoreCache.key(pair, self.cache_namespace)
+            found = self.cache.get_many([key])
+            if key in found:
+                return found[key]
+
         try:
             response = self.chain.invoke({"title": title, "subtitle": subtitle}).strip()
             if response == "0":
-                return np.nan
-            return float(response) if 1 <= float(response) <= 10 else np.nan
+                score = np.nan
+            else:
+                score = float(response) if 1 <= float(response) <= 10 else np.nan
         except Exception as e:
             if self.verbose:
                 print(f"Classification error: {e}")
+            # failed calls are retried on the next run
             return np.nan
 
-        return self._aggregate_results(pd.DataFrame(results))
+        if key is not None:
+            self.cache.put(key, score)
+        return score
 
     def _aggregate_results(self, results_df: pd.DataFrame):
         if results_df.empty:
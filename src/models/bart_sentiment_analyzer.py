@@ -1,13 +1,55 @@
 import numpy as np
 import pandas as pd
-import csv, time, torch
+import csv, os, torch
+import multiprocessing
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional
 from datetime import datetime
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 from torch.nn.functional import softmax
 
-from src.utils.llm_utils import initialize_output_file, limit_words
+from src.models.inference_backends import load_model
+from src.models.zero_shot_engine import ZeroShotEngine, physical_cores
+from src.utils.llm_utils import limit_words
+from src.utils.inference_stats import InferenceStats
+from src.utils.result_sink import ResultSink
+from src.utils.score_cache import ScoreCache
+from src.utils.throttling import get_throttle
+
+# engine of a shard worker, loaded once per worker by _init_shard_worker
+_shard_engine = None
+
+
+def _init_shard_worker(
+    model_name: str,
+    backend: str,
+    backend_dir: Optional[str],
+    hypotheses: List[str],
+    device: str,
+    token_budget: int,
+    num_threads: int,
+):
+    global _shard_engine
+    torch.set_num_threads(num_threads)
+    model = load_model(model_name, backend, backend_dir, num_threads)
+    if backend == "torch":
+        model.to(device)
+    _shard_engine = ZeroShotEngine(
+        model,
+        AutoTokenizer.from_pretrained(model_name),
+        hypotheses,
+        device=device,
+        token_budget=token_budget,
+        num_threads=num_threads,
+        stats=InferenceStats(),
+    )
+
+
+def _predict_shard(texts: List[str]):
+    # the stats of this shard only, merged by the parent
+    _shard_engine.stats.reset()
+    return _shard_engine.predict(texts), _shard_engine.stats
 
 
 class UniversalSentimentAnalyzer:
@@ -18,12 +60,26 @@ class UniversalSentimentAnalyzer:
         date_column: str = "date",
         device: str = "cpu",
         threshold: float = 0.25,
-        batch_size: int = 8,
+        batch_size: int = 2048,
         verbose: bool = False,
         output_path: Optional[str] = None,
         output_columns: Optional[List[str]] = None,
         max_words: int = 200,
+        model_name: str = "facebook/bart-large-mnli",
+        token_budget: int = 8192,
+        num_threads: Optional[int] = None,
+        backend: str = "torch",
+        backend_dir: Optional[str] = None,
+        cache: Optional[ScoreCache] = None,
+        throttle=None,
+        output_format: Optional[str] = None,
+        flush_rows: int = 1024,
+        flush_seconds: float = 30.0,
     ):
+        # batch_size texts go to the engine per step, which sorts them by token length
+        # and packs them into inference batches under token_budget (ZeroShotEngine); a
+        # step needs thousands of texts for the packing to pay off. num_threads is one
+        # torch thread per physical core when None
         self.text_columns = text_columns
         self.hypotheses = hypotheses
         self.date_column = date_column
@@ -34,16 +90,48 @@ class UniversalSentimentAnalyzer:
         self.output_path = output_path
         self.output_columns = output_columns or ["date", "score"]
         self.max_words = max_words
+        # what the shard workers of analyze_sharded load their own model from
+        self.model_name = model_name
+        self.backend = backend
+        self.backend_dir = backend_dir
+        self.token_budget = token_budget
+        # pauses between batches, none by default (see src.utils.throttling)
+        self.throttle = get_throttle(throttle)
+        # throughput of the inference batches run in this process
+        self.stats = InferenceStats()
+        # probabilities of already scored texts, for this model and these hypotheses
+        self.cache = cache
+        self.cache_namespace = ScoreCache.namespace(
+            "zero-shot", model_name, backend, hypotheses
+        )
 
         # init model and tokenizer
-        self.tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-mnli")
-        self.model = AutoModelForSequenceClassification.from_pretrained(
-            "facebook/bart-large-mnli"
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # "int8" and "onnx" are CPU backends, see src.models.inference_backends
+        self.model = load_model(model_name, backend, backend_dir, num_threads)
+        if backend == "torch":
+            self.model.to(self.device)
+        self.engine = ZeroShotEngine(
+            self.model,
+            self.tokenizer,
+            self.hypotheses,
+            device=self.device,
+            token_budget=token_budget,
+            num_threads=num_threads,
+            stats=self.stats,
         )
-        self.model.to(self.device).eval()
 
+        # rows are buffered and appended once per flush, as CSV, JSONL or Parquet
+        self.sink = None
         if self.output_path:
-            initialize_output_file(self.output_path, self.output_columns)
+            self.sink = ResultSink(
+                self.output_path,
+                self.output_columns,
+                format=output_format,
+                flush_rows=flush_rows,
+                flush_seconds=flush_seconds,
+                float_format="%.1f",
+            )
 
     def _prepare_texts(self, df: pd.DataFrame) -> List[str]:
         combined_series = df[self.text_columns].apply(
@@ -52,21 +140,22 @@ class UniversalSentimentAnalyzer:
         )
         return combined_series.apply(lambda x: limit_words(x, self.max_words)).tolist()
 
-    def _batch_classify(self, texts: List[str]) -> np.ndarray:
-        pairs = [[text, hypothesis] for text in texts for hypothesis in self.hypotheses]
+    def _cache_key(self, text: str) -> str:
+        return ScoreCache.key(text, self.cache_namespace)
 
-        inputs = self.tokenizer(
-            pairs,
-            padding=True,
-            truncation=True,
-            max_length=512,
-            return_tensors="pt",
-        ).to(self.device)
+    def _batch_classify(self, texts: List[str]) -> np.ndarray:
+        if self.cache is None:
+            return self.engine.predict(texts)
 
-        with torch.no_grad():
-            logits = self.model(**inputs).logits
-            logits = logits.view(len(texts), len(self.hypotheses), -1)
-            return softmax(logits[..., [0, 2]], dim=-1)[..., 1].cpu().numpy()
+        keys = [self._cache_key(text) for text in texts]
+        found = self.cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            probs = self.engine.predict(list(missing.values()))
+            scored = dict(zip(missing, probs.tolist()))
+            self.cache.put_many(scored)
+            found.update(scored)
+        return np.array([found[key] for key in keys]).reshape(len(texts), -1)
 
     def _calculate_scores(
         self, bull_probs: np.ndarray, bear_probs: np.ndarray
@@ -77,7 +166,13 @@ class UniversalSentimentAnalyzer:
         scaled_scores = (net_sentiment + 1) * 4.5 + 1
         return np.clip(np.where(relevant_mask, scaled_scores, np.nan), 1, 10).round(1)
 
-    def analyze(self, df: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+    def _score(self, texts: List[str]) -> np.ndarray:
+        probs = self._batch_classify(texts)
+        return self._calculate_scores(probs[:, 0], probs[:, 1])
+
+    def _filter_dates(
+        self, df: pd.DataFrame, start_date: str, end_date: str
+    ) -> pd.DataFrame:
         start_dt = pd.to_datetime(start_date)
         end_dt = pd.to_datetime(end_date)
 
@@ -87,9 +182,21 @@ class UniversalSentimentAnalyzer:
         )
         filtered_df = df[date_mask].sort_values(self.date_column)
 
+        if filtered_df.empty and self.verbose:
+            print(f"No data found between {start_date} and {end_date}")
+        return filtered_df
+
+    def analyze(
+        self, df: pd.DataFrame, start_date: str, end_date: str, resume: bool = False
+    ) -> pd.DataFrame:
+        """
+        Score the texts between start_date and end_date, in date order.
+
+        With resume, the rows already in the output (from an interrupted call on the same
+        data and dates) are skipped and their scores read back from it.
+        """
+        filtered_df = self._filter_dates(df, start_date, end_date)
         if filtered_df.empty:
-            if self.verbose:
-                print(f"No data found between {start_date} and {end_date}")
             return pd.DataFrame(columns=[self.date_column, "score"])
 
         # Get unique dates for progress tracking
@@ -103,46 +210,170 @@ class UniversalSentimentAnalyzer:
         scores = np.full(len(texts), np.nan)
         current_month = None
 
-        for batch_idx in range(0, len(texts), self.batch_size):
-            batch_start = batch_idx
-            batch_end = batch_idx + self.batch_size
-            batch_texts = texts[batch_start:batch_end]
-
-            batch_dates = filtered_df.iloc[batch_start:batch_end][self.date_column]
-            min_date = batch_dates.min().date()
-            max_date = batch_dates.max().date()
-            # sleep for 1 minute every month
-            if current_month is not None and min_date.month != current_month:
-                if self.verbose:
-                    print(f"Month changed. Waiting for 1 minute before proceeding...")
-                time.sleep(10)
-
-            current_month = min_date.month
-
-            if self.verbose:
-                print(
-                    f"Processing batch {batch_idx//self.batch_size + 1}: "
-                    f"Dates {min_date} to {max_date} "
-                    f"({len(batch_texts)} entries)"
-                )
+        start_row = self._resume_row(scores) if resume else 0
+        try:
+            for batch_idx in range(start_row, len(texts), self.batch_size):
+                batch_start = batch_idx
+                batch_end = batch_idx + self.batch_size
+                batch_texts = texts[batch_start:batch_end]
+
+                batch_dates = filtered_df.iloc[batch_start:batch_end][self.date_column]
+                min_date = batch_dates.min().date()
+                month = (min_date.year, min_date.month)
+                month_changed = current_month is not None and month != current_month
+                self.stats.throttled_seconds += self.throttle.wait(month_changed)
+
+                # one progress line per month of data
+                if self.verbose and month != current_month:
+                    print(
+                        f"Processing {min_date:%Y-%m} from batch "
+                        f"{batch_idx//self.batch_size + 1}, {self.stats.format()}"
+                    )
+                current_month = month
+
+                # inference
+                batch_scores = self._score(batch_texts)
+                scores[batch_start:batch_end] = batch_scores
+
+                if self.output_path:
+                    self._save_batch_results(
+                        filtered_df.iloc[batch_start:batch_end], batch_scores
+                    )
+        finally:
+            if self.sink is not None:
+                self.sink.flush()
+
+        if self.verbose:
+            print(f"Scored {len(texts)} entries: {self.stats.format()}")
 
-            # inference
-            probs = self._batch_classify(batch_texts)
-            batch_scores = self._calculate_scores(probs[:, 0], probs[:, 1])
-            scores[batch_start:batch_end] = batch_scores
+        filtered_df["score"] = scores
+        return filtered_df
+
+    def _resume_row(self, scores: np.ndarray) -> int:
+        if self.sink is None:
+            raise ValueError("resume needs an output_path")
+        if "score" not in self.output_columns:
+            raise ValueError(
+                "resume reads the scores back, output_columns needs 'score'"
+            )
+
+        start_row = min(self.sink.rows, len(scores))
+        scores[:start_row] = self.sink.read()["score"].to_numpy(dtype=float)[:start_row]
+        if self.verbose and start_row:
+            print(f"Resuming after {start_row} rows already in {self.output_path}")
+        return start_row
+
+    def analyze_sharded(
+        self,
+        df: pd.DataFrame,
+        start_date: str,
+        end_date: str,
+        n_workers: int = 2,
+        threads_per_worker: Optional[int] = None,
+        shards_per_worker: int = 4,
+    ) -> pd.DataFrame:
+        """
+        analyze() over date-ordered shards scored by worker processes.
+
+        Workers are spawned, not forked: a fork after torch has started its thread pool
+        (or a CUDA context) can deadlock the child. Each worker loads the model from
+        model_name with the same backend and device in its initializer, once for all
+        its shards, and runs torch with its own thread budget. Shards are contiguous in
+        date order; their scores are merged back by position and appended to the output
+        file by this process only, shard by shard in date order, so the CSV has the same
+        rows as with analyze(). The score cache is only used by this process, the batch
+        stats of the workers are merged into self.stats. No throttling is applied.
+
+        Parameters:
+        - df, start_date, end_date: As in analyze.
+        - n_workers (int): Worker processes.
+        - threads_per_worker (int): torch threads per worker, the physical cores split evenly
+          between workers by default.
+        - shards_per_worker (int): Shards per worker, smaller shards balance the load and
+          make the output file grow more often.
+        """
+        filtered_df = self._filter_dates(df, start_date, end_date)
+        if filtered_df.empty:
+            return pd.DataFrame(columns=[self.date_column, "score"])
+        if n_workers <= 1:
+            return self.analyze(filtered_df, start_date, end_date)
+
+        texts = self._prepare_texts(filtered_df)
+        n_shards = min(len(texts), n_workers * shards_per_worker)
+        bounds = np.linspace(0, len(texts), n_shards + 1).astype(int)
+        shards = list(zip(bounds[:-1], bounds[1:]))
+        if threads_per_worker is None:
+            threads_per_worker = max(1, physical_cores() // n_workers)
 
-            if self.output_path:
-                self._save_batch_results(
-                    filtered_df.iloc[batch_start:batch_end], batch_scores
+        # cache lookups and writes stay in this process, workers only get the
+        # uncached texts, each distinct one in the first shard it appears in
+        keys = [self._cache_key(text) for text in texts]
+        found = self.cache.get_many(keys) if self.cache is not None else {}
+        assigned = set(found)
+        tasks = []
+        for start, end in shards:
+            task = {}
+            for key, text in zip(keys[start:end], texts[start:end]):
+                if key not in assigned:
+                    task[key] = text
+                    assigned.add(key)
+            tasks.append(task)
+
+        scores = np.full(len(texts), np.nan)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_shard_worker,
+                initargs=(
+                    self.model_name,
+                    self.backend,
+                    self.backend_dir,
+                    self.hypotheses,
+                    self.device,
+                    self.token_budget,
+                    threads_per_worker,
+                ),
+            ) as executor:
+                results = executor.map(
+                    _predict_shard, [list(task.values()) for task in tasks]
                 )
+                # map yields in shard order, so rows are written in date order
+                for (start, end), task, (probs, stats) in zip(shards, tasks, results):
+                    self.stats.merge(stats)
+                    scored = dict(zip(task, probs.tolist()))
+                    if self.cache is not None and scored:
+                        self.cache.put_many(scored)
+                    found.update(scored)
+
+                    shard_probs = np.array([found[key] for key in keys[start:end]])
+                    shard_scores = self._calculate_scores(
+                        shard_probs[:, 0], shard_probs[:, 1]
+                    )
+                    scores[start:end] = shard_scores
+                    if self.verbose:
+                        print(f"Scored rows {start} to {end} of {len(texts)}")
+                    if self.output_path:
+                        self._save_batch_results(
+                            filtered_df.iloc[start:end], shard_scores
+                        )
+        finally:
+            if self.sink is not None:
+                self.sink.flush()
 
         filtered_df["score"] = scores
         return filtered_df
 
     def _save_batch_results(self, batch_df: pd.DataFrame, scores: np.ndarray):
-        batch_df.loc[:, "score"] = scores.astype(float)
-
-        with open(self.output_path, "a", newline="") as f:
-            batch_df[self.output_columns].to_csv(
-                f, header=False, index=False, float_format="%.1f", mode="a"
-            )
+        # a new frame of the output columns, batch_df is a slice of filtered_df
+        rows = pd.DataFrame(
+            {
+                column: (
+                    scores.astype(float)
+                    if column == "score"
+                    else batch_df[column].to_numpy()
+                )
+                for column in self.output_columns
+            }
+        )
+        self.sink.write(rows)
@@ -0,0 +1,180 @@
+import time
+import numpy as np
+import pandas as pd
+import torch
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+from transformers import AutoConfig, AutoModelForSequenceClassification
+
+BACKENDS = ["torch", "int8", "onnx"]
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations fp32)"""
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def _load_int8(model_name: str, cache_dir: Optional[Path]):
+    path = cache_dir / "model_int8.state_dict.pt" if cache_dir else None
+    if path is not None and path.exists():
+        # rebuilt from the config and quantized, then filled with the cached int8
+        # weights; only tensors are read from the cache dir, the fp32 weights are not
+        model = quantize_int8(
+            AutoModelForSequenceClassification.from_config(
+                AutoConfig.from_pretrained(model_name)
+            ).eval()
+        )
+        model.load_state_dict(torch.load(path, weights_only=True))
+        return model
+
+    model = quantize_int8(
+        AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    )
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save(model.state_dict(), path)
+    return model
+
+
+def export_onnx(model, path, opset: int = 17):
+    """Export a sequence classifier to ONNX with dynamic batch and sequence axes"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dummy = {
+        "input_ids": torch.tensor([[0, 5, 6, 2, 2, 7, 2]] * 2),
+        "attention_mask": torch.ones(2, 7, dtype=torch.long),
+    }
+    axes = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        model.eval(),
+        (dummy["input_ids"], dummy["attention_mask"]),
+        str(path),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": axes,
+            "attention_mask": axes,
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+        dynamo=False,
+    )
+    return path
+
+
+class OnnxSequenceClassifier:
+    """ONNX Runtime session with the call interface the zero-shot engine uses"""
+
+    def __init__(self, path, num_threads: Optional[int] = None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+
+    def __call__(self, input_ids, attention_mask, **kwargs):
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": input_ids.cpu().numpy().astype(np.int64),
+                "attention_mask": attention_mask.cpu().numpy().astype(np.int64),
+            },
+        )
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def load_model(
+    model_name: str,
+    backend: str = "torch",
+    cache_dir: Optional[str] = None,
+    num_threads: Optional[int] = None,
+):
+    """
+    Sequence classification model for one of the CPU backends.
+
+    Parameters:
+    - model_name (str): Hugging Face model name or path.
+    - backend (str): "torch" (fp32), "int8" (dynamic quantization) or "onnx"
+      (ONNX Runtime, from the onnxruntime requirement).
+    - cache_dir (str): Where the int8 weights / exported ONNX graph are kept, so later
+      loads skip the fp32 checkpoint. Nothing is cached when None (int8 only, the ONNX
+      export needs a location).
+    - num_threads (int): Intra-op threads of the ONNX Runtime session.
+
+    Returns:
+    - callable: model(input_ids=..., attention_mask=...) returning an object with logits.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    if backend == "torch":
+        return AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    if backend == "int8":
+        return _load_int8(model_name, cache_dir)
+
+    if cache_dir is None:
+        raise ValueError("the onnx backend needs a cache_dir for the exported model")
+    path = cache_dir / "model.onnx"
+    if not path.exists():
+        export_onnx(
+            AutoModelForSequenceClassification.from_pretrained(model_name), path
+        )
+    return OnnxSequenceClassifier(path, num_threads=num_threads)
+
+
+def compare_backends(
+    engines: Dict[str, object],
+    texts: List[str],
+    reference: str = "torch",
+    score_fn: Optional[Callable] = None,
+) -> pd.DataFrame:
+    """
+    Validation harness: drift from the reference backend and throughput on held-out texts.
+
+    Parameters:
+    - engines (dict): Backend name -> ZeroShotEngine.
+    - texts (list): Held-out texts.
+    - reference (str): Name of the fp32 reference engine.
+    - score_fn (callable): score_fn(bull_probs, bear_probs) -> scores, e.g. the
+      analyzer's _calculate_scores, to also report the drift of the final scores.
+
+    Returns:
+    - pd.DataFrame: One row per backend with "seconds", "texts_per_second", "speedup",
+      "max_prob_drift", "mean_prob_drift" and, with score_fn, "mean_score_drift" and
+      "relevance_agreement" (share of texts on the same side of the threshold).
+    """
+    probs, seconds = {}, {}
+    for name, engine in engines.items():
+        start = time.perf_counter()
+        probs[name] = engine.predict(texts)
+        seconds[name] = time.perf_counter() - start
+
+    rows = {}
+    for name in engines:
+        drift = np.abs(probs[name] - probs[reference])
+        row = {
+            "seconds": seconds[name],
+            "texts_per_second": len(texts) / seconds[name],
+            "speedup": seconds[reference] / seconds[name],
+            "max_prob_drift": drift.max(),
+            "mean_prob_drift": drift.mean(),
+        }
+        if score_fn is not None:
+            scores = score_fn(probs[name][:, 0], probs[name][:, 1])
+            expected = score_fn(probs[reference][:, 0], probs[reference][:, 1])
+            relevant = ~np.isnan(scores) & ~np.isnan(expected)
+            row["mean_score_drift"] = (
+                np.abs(scores - expected)[relevant].mean() if relevant.any() else 0.0
+            )
+            row["relevance_agreement"] = np.mean(np.isnan(scores) == np.isnan(expected))
+        rows[name] = row
+
+    return pd.DataFrame.from_dict(rows, orient="index")
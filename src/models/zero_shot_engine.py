@@ -0,0 +1,147 @@
+import os
+import numpy as np
+import torch
+
+from typing import List, Optional
+from torch.nn.functional import softmax
+
+from src.utils.inference_stats import BatchTimer, InferenceStats
+
+
+def physical_cores() -> int:
+    """Physical CPU cores, the logical count when psutil cannot tell"""
+    try:
+        import psutil
+
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    return cores or os.cpu_count() or 1
+
+
+class ZeroShotEngine:
+    """
+    Batched NLI zero-shot scoring of (text, hypothesis) pairs.
+
+    Pairs are tokenized once without padding, sorted by token length and grouped into
+    batches whose padded size stays within a token budget, so short titles are never
+    padded to the longest selftext of the input. Each batch is padded only to its own
+    longest pair and scored under torch.inference_mode(). Results are returned in the
+    original order.
+
+    BART-MNLI encodes premise and hypothesis jointly (bidirectional encoder, decoder
+    cross-attending the whole pair), so premise states cannot be shared between
+    hypotheses. With deduplicate, each distinct premise is scored once per call instead,
+    which is exact and skips repeated texts ("[removed]", reposts, empty selftexts).
+
+    With stats, the pairs, real and padded tokens and latency of every inference batch
+    are recorded.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        hypotheses: List[str],
+        device: str = "cpu",
+        token_budget: int = 8192,
+        max_batch_size: int = 64,
+        max_length: int = 512,
+        num_threads: Optional[int] = None,
+        deduplicate: bool = True,
+        stats: Optional[InferenceStats] = None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.hypotheses = hypotheses
+        self.device = device
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.max_length = max_length
+        self.deduplicate = deduplicate
+        self.stats = stats
+
+        # intra-op threads of the CPU kernels while scoring, restored afterwards as the
+        # setting is process-wide; hyperthreads do not speed up the matrix kernels, one
+        # thread per physical core by default
+        self.num_threads = num_threads
+        if device == "cpu" and num_threads is None:
+            self.num_threads = physical_cores()
+
+    def _encode(self, texts: List[str]) -> dict:
+        pairs = [(text, hypothesis) for text in texts for hypothesis in self.hypotheses]
+        return self.tokenizer(
+            [text for text, _ in pairs],
+            [hypothesis for _, hypothesis in pairs],
+            truncation=True,
+            max_length=self.max_length,
+        )
+
+    def _batches(self, lengths: np.ndarray) -> List[np.ndarray]:
+        # longest first, each batch sized so that rows x longest row fits the budget
+        order = np.argsort(-lengths, kind="stable")
+        batches, start = [], 0
+        while start < len(order):
+            size = self.token_budget // int(lengths[order[start]])
+            size = min(max(size, 1), self.max_batch_size)
+            batches.append(order[start : start + size])
+            start += size
+        return batches
+
+    def _forward(self, inputs: dict) -> torch.Tensor:
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        return self.model(**inputs).logits
+
+    def entailment_logits(self, texts: List[str]) -> np.ndarray:
+        """(len(texts) x len(hypotheses) x n_labels) NLI logits in input order"""
+        if not texts:
+            return np.empty((0, len(self.hypotheses), 3), dtype=np.float32)
+        if not self.deduplicate:
+            return self._pair_logits(texts)
+
+        # position of each text among the distinct texts, in first-seen order
+        positions = {}
+        inverse = np.array(
+            [positions.setdefault(text, len(positions)) for text in texts]
+        )
+        return self._pair_logits(list(positions))[inverse]
+
+    def _pair_logits(self, texts: List[str]) -> np.ndarray:
+        encodings = self._encode(texts)
+        lengths = np.array([len(ids) for ids in encodings["input_ids"]])
+
+        previous_threads = torch.get_num_threads()
+        if self.num_threads is not None:
+            torch.set_num_threads(self.num_threads)
+        try:
+            logits = self._score_batches(encodings, lengths)
+        finally:
+            torch.set_num_threads(previous_threads)
+        return logits.reshape(len(texts), len(self.hypotheses), -1)
+
+    def _score_batches(self, encodings, lengths: np.ndarray) -> np.ndarray:
+        logits = None
+        with torch.inference_mode():
+            for batch in self._batches(lengths):
+                features = [
+                    {key: encodings[key][i] for key in encodings.keys()} for i in batch
+                ]
+                inputs = self.tokenizer.pad(features, return_tensors="pt")
+                with BatchTimer(self.stats, lengths[batch], len(batch)):
+                    batch_logits = self._forward(inputs).float().cpu().numpy()
+                if logits is None:
+                    logits = np.empty(
+                        (len(lengths), batch_logits.shape[-1]), dtype=np.float32
+                    )
+                logits[batch] = batch_logits
+        return logits
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        """
+        Probability of entailment versus contradiction for every text and hypothesis.
+
+        Returns:
+        - np.ndarray: (len(texts) x len(hypotheses)) probabilities in input order.
+        """
+        logits = torch.from_numpy(self.entailment_logits(texts))
+        return softmax(logits[..., [0, 2]], dim=-1)[..., 1].numpy()
@@ -3,6 +3,9 @@ import pandas_ta as ta
 import numpy as np
 
 from config import config
+from src.preprocessing import indicator_kernels
+
+BACKENDS = ["pandas_ta", "numba"]
 
 
 # BUG with pandas_ta MFI (https://github.com/twopirllc/pandas-ta/issues/731)
@@ -38,13 +41,12 @@ def create_log_price_change(df):
 
 
 def create_local_extrema(df, periods: [int], price_column: str):
-    for period in periods:
-        df[f"localMin_{period}"] = (
-            df[price_column] == df[price_column].rolling(period, min_periods=1).min()
-        ).astype(int)
-        df[f"localMax_{period}"] = (
-            df[price_column] == df[price_column].rolling(period, min_periods=1).max()
-        ).astype(int)
+    # all windows in one pass, stored as compact int8 flags
+    price = df[price_column].to_numpy(dtype=float)
+    mins, maxs = indicator_kernels.rolling_extrema(price, periods)
+    for period, local_min, local_max in zip(periods, mins, maxs):
+        df[f"localMin_{period}"] = (price == local_min).astype(np.int8)
+        df[f"localMax_{period}"] = (price == local_max).astype(np.int8)
 
 
 def create_day_of_week_sin_cos(df):
@@ -58,16 +60,27 @@ def create_day_of_week_sin_cos(df):
     return df
 
 
-def calculate_technical_indicators(df):
+def calculate_technical_indicators(df, backend="pandas_ta"):
     """
     Calculate technical indicators for cryptocurrency price data using pandas_ta.
 
     Parameters:
     - df (pd.DataFrame): DataFrame containing 'open', 'high', 'low', 'close', 'volume' columns.
+    - backend (str): "pandas_ta", or "numba" to compute PSAR, KAMA, NVI, Ichimoku,
+      Mass Index and KST with the compiled kernels in indicator_kernels.
 
     Returns:
     - pd.DataFrame: DataFrame with added technical indicator columns using pandas_ta.
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    use_kernels = backend == "numba"
+    if use_kernels:
+        # float arrays for the compiled kernels, the pandas_ta path reads the frame
+        high, low, close, volume = (
+            df[col].to_numpy(dtype=float) for col in ["high", "low", "close", "volume"]
+        )
 
     # 1. Exponential Moving Averages (EMA)
     df["EMA_12"] = df.ta.ema(close="close", length=12)
@@ -86,7 +99,10 @@ def calculate_technical_indicators(df):
     df["OBV"] = df.ta.obv(close="close", volume="volume")
 
     df["AO"] = df.ta.ao(high="high", low="low")
-    df["KAMA"] = df.ta.kama(close="close")
+    if use_kernels:
+        df["KAMA"] = indicator_kernels.kama(close)
+    else:
+        df["KAMA"] = df.ta.kama(close="close")
 
     ppo = df.ta.ppo(close="close")
     df["PPO"] = ppo["PPO_12_26_9"]
@@ -125,7 +141,10 @@ def calculate_technical_indicators(df):
         df["high"], df["low"], df["close"], df["volume"], period=14
     )
     # Negative Volume Index
-    df["NVI"] = df.ta.nvi(close="close", volume="volume")
+    if use_kernels:
+        df["NVI"] = indicator_kernels.nvi(close, volume)
+    else:
+        df["NVI"] = df.ta.nvi(close="close", volume="volume")
 
     # Volume Price Trend
     df["VPT"] = df.ta.pvol(close="close", volume="volume")
@@ -158,15 +177,25 @@ def calculate_technical_indicators(df):
     df["DPO"] = df.ta.dpo()
 
     # Ichimoku Cloud
-    ichimoku_df = df.ta.ichimoku(include_leading_span=False)[0]
-
-    df["Ichimoku_A"] = ichimoku_df["ISA_9"]
-    df["Ichimoku_B"] = ichimoku_df["ISB_26"]
-    df["Ichimoku_Base"] = ichimoku_df["IKS_26"]
-    df["Ichimoku_Conversion"] = ichimoku_df["ITS_9"]
+    if use_kernels:
+        span_a, span_b, tenkan_sen, kijun_sen = indicator_kernels.ichimoku(high, low)
+        df["Ichimoku_A"] = span_a
+        df["Ichimoku_B"] = span_b
+        df["Ichimoku_Base"] = kijun_sen
+        df["Ichimoku_Conversion"] = tenkan_sen
+    else:
+        ichimoku_df = df.ta.ichimoku(include_leading_span=False)[0]
+
+        df["Ichimoku_A"] = ichimoku_df["ISA_9"]
+        df["Ichimoku_B"] = ichimoku_df["ISB_26"]
+        df["Ichimoku_Base"] = ichimoku_df["IKS_26"]
+        df["Ichimoku_Conversion"] = ichimoku_df["ITS_9"]
 
     # Know Sure Thing (KST)
-    df["KST"] = df.ta.kst()["KST_10_15_20_30_10_10_10_15"]
+    if use_kernels:
+        df["KST"] = indicator_kernels.kst(close)
+    else:
+        df["KST"] = df.ta.kst()["KST_10_15_20_30_10_10_10_15"]
 
     # MACD
     macd = df.ta.macd(close="close")
@@ -174,7 +203,10 @@ def calculate_technical_indicators(df):
     df["MACD_Signal"] = macd["MACDs_12_26_9"]
 
     # # Mass Index (MI)
-    df["MI"] = df.ta.massi()
+    if use_kernels:
+        df["MI"] = indicator_kernels.massi(high, low)
+    else:
+        df["MI"] = df.ta.massi()
 
     # TRIX
     df["TRIX"] = df.ta.trix(length=30)["TRIX_30_9"]
@@ -191,18 +223,23 @@ def calculate_technical_indicators(df):
     df["CR"] = df.ta.cmo()
 
     # Parabolic Stop and Reverse (PSAR)
-    psar = df.ta.psar()
-    df["PSAR_down"] = psar["PSARs_0.02_0.2"].notnull().astype(int)
-    df["PSAR_up"] = psar["PSARl_0.02_0.2"].notnull().astype(int)
+    if use_kernels:
+        psar_long, psar_short = indicator_kernels.psar(high, low)
+        df["PSAR_down"] = (~np.isnan(psar_short)).astype(int)
+        df["PSAR_up"] = (~np.isnan(psar_long)).astype(int)
+    else:
+        psar = df.ta.psar()
+        df["PSAR_down"] = psar["PSARs_0.02_0.2"].notnull().astype(int)
+        df["PSAR_up"] = psar["PSARl_0.02_0.2"].notnull().astype(int)
 
     return df
 
 
-def create_variables(df):
+def create_variables(df, backend="pandas_ta"):
     create_log_price_change(df)
     create_local_extrema(df, [7, 14, 21], "close")
     create_day_of_week_sin_cos(df)
-    calculate_technical_indicators(df)
+    calculate_technical_indicators(df, backend=backend)
     return df
 
 
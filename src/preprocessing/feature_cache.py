@@ -0,0 +1,235 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import config
+from src.preprocessing.create_variables import create_variables
+from src.preprocessing.transformations.stationarity import (
+    difference_non_stationary_features,
+)
+from src.preprocessing.transformations.heteroskedasticity import (
+    log_heteroskedastic_vars,
+)
+
+# bump when the feature pipeline changes so stale entries are never reused
+CACHE_VERSION = 1
+META_FILE = "meta.json"
+
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class FeatureCache:
+    """
+    Content-addressed cache for feature matrices.
+
+    Each entry is a directory holding one .npy file per column plus the index,
+    loaded back with ``mmap_mode="c"`` so warm reads only map the files. The least
+    recently used entries are evicted once the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: int = 2 * 1024**3,
+    ):
+        self.cache_dir = Path(cache_dir or config.DATA_DIR / "cache" / "features")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(df: pd.DataFrame, **params) -> str:
+        """Hash of the frame's contents, columns and dtypes plus the pipeline parameters"""
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        digest.update(json.dumps([str(c) for c in df.columns]).encode())
+        digest.update(json.dumps([str(d) for d in df.dtypes]).encode())
+        digest.update(
+            json.dumps(
+                {"version": CACHE_VERSION, **params}, sort_keys=True, default=str
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        meta_path = path / META_FILE
+        if not meta_path.exists():
+            self.misses += 1
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        # mark as recently used
+        os.utime(meta_path)
+        self.hits += 1
+
+        index = pd.Index(
+            np.asarray(np.load(path / "index.npy", mmap_mode="c")),
+            name=meta["index_name"],
+            dtype=meta["index_dtype"],
+        )
+        # one block per column, each a plain ndarray view over its map; a frame built
+        # from a dict of same-dtype arrays may be consolidated into a copied 2D block
+        columns = [
+            pd.Series(
+                np.asarray(np.load(path / f"{i}.npy", mmap_mode="c")),
+                index=index,
+                name=name,
+                copy=False,
+            )
+            for i, name in enumerate(meta["columns"])
+        ]
+        if columns:
+            df = pd.concat(columns, axis=1, copy=False)
+        else:
+            df = pd.DataFrame(index=index)
+        df.attrs.update(meta["attrs"])
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        if isinstance(df.index, pd.MultiIndex):
+            raise ValueError("FeatureCache only supports single-level indexes")
+        # .npy files are written without pickle, which object arrays need
+        objects = [
+            str(name) for name in df.columns if df[name].to_numpy().dtype == object
+        ]
+        if df.index.to_numpy().dtype == object:
+            objects.append(f"index {df.index.name!r}")
+        if objects:
+            raise ValueError(
+                f"FeatureCache only stores numeric, boolean and datetime data, "
+                f"convert the object columns first: {objects}"
+            )
+
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-"))
+        try:
+            np.save(tmp_dir / "index.npy", df.index.to_numpy(), allow_pickle=False)
+            for i, name in enumerate(df.columns):
+                np.save(tmp_dir / f"{i}.npy", df[name].to_numpy(), allow_pickle=False)
+            meta = {
+                "columns": [str(c) for c in df.columns],
+                "index_name": df.index.name,
+                "index_dtype": str(df.index.dtype),
+                "attrs": df.attrs,
+            }
+            with open(tmp_dir / META_FILE, "w") as f:
+                json.dump(meta, f)
+
+            path = self._path(key)
+            if path.exists():
+                shutil.rmtree(path)
+            os.replace(tmp_dir, path)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+
+        self._evict()
+
+    def get_or_compute(
+        self, df: pd.DataFrame, func: Callable[..., pd.DataFrame], **params
+    ) -> pd.DataFrame:
+        """Return ``func(df, **params)`` from the cache, computing and storing it on a miss"""
+        key = self.key(df, func=f"{func.__module__}.{func.__qualname__}", **params)
+        result = self.get(key)
+        if result is None:
+            result = func(df, **params)
+            self.put(key, result)
+        return result
+
+    def _entries(self):
+        return [
+            path
+            for path in self.cache_dir.iterdir()
+            if path.is_dir() and (path / META_FILE).exists()
+        ]
+
+    def _evict(self):
+        entries = sorted(
+            self._entries(), key=lambda path: (path / META_FILE).stat().st_mtime
+        )
+        sizes = {path: _directory_size(path) for path in entries}
+        total = sum(sizes.values())
+
+        # keep the newest entry even if it alone exceeds the budget
+        while total > self.max_bytes and len(entries) > 1:
+            oldest = entries.pop(0)
+            total -= sizes[oldest]
+            shutil.rmtree(oldest, ignore_errors=True)
+
+    def clear(self):
+        for path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        requests = self.hits + self.misses
+        return {
+            "entries": len(entries),
+            "bytes": sum(_directory_size(path) for path in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+
+def _build_features(df, target, variables_to_exclude, alpha, backend):
+    df = create_variables(df.copy(), backend=backend)
+    df, differenced_columns = difference_non_stationary_features(
+        df, target=target, variables_to_exclude=variables_to_exclude, alpha=alpha
+    )
+    df = log_heteroskedastic_vars(
+        df, target=target, variables_to_exclude=variables_to_exclude, alpha=alpha
+    )
+    df.attrs["differenced_columns"] = differenced_columns
+    return df
+
+
+def build_features(
+    df: pd.DataFrame,
+    cache: Optional[FeatureCache] = None,
+    target: str = "logPriceChange",
+    variables_to_exclude: list = config.EXCLUDE_VARIABLES,
+    alpha: float = 0.05,
+    backend: str = "pandas_ta",
+):
+    """
+    Run create_variables, difference_non_stationary_features and log_heteroskedastic_vars,
+    reusing a cached result when the input data and parameters are unchanged.
+
+    Parameters:
+    - df (pd.DataFrame): Raw OHLCV data.
+    - cache (FeatureCache): Cache to use, None to always recompute.
+    - target (str): Target column left untransformed.
+    - variables_to_exclude (list): Columns left untransformed.
+    - alpha (float): Significance level of the stationarity and heteroskedasticity tests.
+    - backend (str): Indicator backend passed to create_variables.
+
+    Returns:
+    - pd.DataFrame: Feature matrix.
+    - list: Columns that were differenced.
+    """
+    params = dict(
+        target=target,
+        variables_to_exclude=list(variables_to_exclude),
+        alpha=alpha,
+        backend=backend,
+    )
+    if cache is None:
+        result = _build_features(df, **params)
+    else:
+        result = cache.get_or_compute(df, _build_features, **params)
+    return result, list(result.attrs["differenced_columns"])
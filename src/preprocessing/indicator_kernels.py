@@ -0,0 +1,317 @@
+import sys
+import numpy as np
+
+from numba import njit
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Compiled/vectorized versions of the pandas_ta indicators that dominate the
+# runtime of calculate_technical_indicators. Every function accepts a 1-D array
+# (one asset) or a 2-D (time x asset) array and reproduces pandas_ta 0.3.14b.
+
+EPSILON = sys.float_info.epsilon
+
+
+def _as_float(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _as_columns(x):
+    # njit kernels loop over a 2-D (time x asset) array
+    return x.reshape(x.shape[0], -1)
+
+
+def shift(x, periods=1):
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    if periods < len(x):
+        out[periods:] = x[: len(x) - periods]
+    return out
+
+
+def non_zero_range(high, low):
+    """pandas_ta adds epsilon to the whole series as soon as one range is zero"""
+    diff = _as_float(high) - _as_float(low)
+    return diff + EPSILON * (diff == 0).any(axis=0)
+
+
+def roc(close, length=10, scalar=100):
+    previous = shift(close, length)
+    return scalar * (_as_float(close) - previous) / previous
+
+
+def _rolling(x, window, func):
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    if window <= len(x):
+        out[window - 1 :] = func(sliding_window_view(x, window, axis=0), axis=-1)
+    return out
+
+
+def rolling_sum(x, window):
+    return _rolling(x, window, np.sum)
+
+
+def rolling_mean(x, window):
+    return _rolling(x, window, np.mean)
+
+
+def rolling_min(x, window):
+    return _rolling(x, window, np.min)
+
+
+def rolling_max(x, window):
+    return _rolling(x, window, np.max)
+
+
+@njit(cache=True)
+def _rolling_extrema(x, windows):
+    # monotonic deque of row positions per column, window and side: O(n) each
+    n, k = x.shape
+    out = np.empty((2, len(windows), n, k))
+    queue = np.empty(max(n, 1), dtype=np.int64)
+    for w in range(len(windows)):
+        window = windows[w]
+        for j in range(k):
+            for side in range(2):
+                head = 0
+                tail = 0
+                for i in range(n):
+                    value = x[i, j]
+                    # NaN is skipped, as in rolling(min_periods=1)
+                    if value == value:
+                        if side == 0:
+                            while tail > head and x[queue[tail - 1], j] >= value:
+                                tail -= 1
+                        else:
+                            while tail > head and x[queue[tail - 1], j] <= value:
+                                tail -= 1
+                        queue[tail] = i
+                        tail += 1
+                    while tail > head and queue[head] <= i - window:
+                        head += 1
+                    out[side, w, i, j] = x[queue[head], j] if tail > head else np.nan
+    return out
+
+
+def rolling_extrema(x, windows):
+    """
+    Rolling min and max with ``min_periods=1`` for several windows in one pass.
+    Returns an array of shape (2, len(windows), *x.shape) holding the mins then the maxes.
+    """
+    x = _as_float(x)
+    windows = np.asarray(list(windows), dtype=np.int64)
+    out = _rolling_extrema(_as_columns(x), windows)
+    return out.reshape((2, len(windows)) + x.shape)
+
+
+def rolling_std(x, window, ddof=0):
+    return _rolling(x, window, lambda values, axis: np.std(values, axis, ddof=ddof))
+
+
+def true_range(high, low, close, drift=1):
+    prev_close = shift(close, drift)
+    ranges = np.stack([non_zero_range(high, low), high - prev_close, prev_close - low])
+    true_range_ = np.fmax.reduce(np.abs(ranges), axis=0)
+    true_range_[:drift] = np.nan
+    return true_range_
+
+
+@njit(cache=True)
+def _ewm_mean(x, alpha, adjust, min_periods):
+    # Series.ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean()
+    n, k = x.shape
+    out = np.empty((n, k))
+    new_wt = 1.0 if adjust else alpha
+    min_periods = max(min_periods, 1)
+    for j in range(k):
+        weighted = np.nan
+        old_wt = 1.0
+        nobs = 0
+        for i in range(n):
+            cur = x[i, j]
+            is_observation = cur == cur
+            nobs += is_observation
+            if weighted == weighted:
+                old_wt *= 1.0 - alpha
+                if is_observation:
+                    if weighted != cur:
+                        weighted = (old_wt * weighted + new_wt * cur) / (
+                            old_wt + new_wt
+                        )
+                    old_wt = old_wt + new_wt if adjust else 1.0
+            elif is_observation:
+                weighted = cur
+            out[i, j] = weighted if nobs >= min_periods else np.nan
+    return out
+
+
+def ema(close, length=10):
+    """pandas_ta ema: SMA of the first ``length`` values as seed, then ewm(adjust=False)"""
+    close = _as_float(close)
+    values = _as_columns(close).copy()
+    if len(values) < length:
+        return np.full(close.shape, np.nan)
+
+    head = values[:length]
+    valid = ~np.isnan(head)
+    seed = np.where(
+        valid.any(axis=0),
+        np.nansum(head, axis=0) / np.maximum(valid.sum(axis=0), 1),
+        np.nan,
+    )
+    values[: length - 1] = np.nan
+    values[length - 1] = seed
+
+    return _ewm_mean(values, 2.0 / (length + 1), False, 0).reshape(close.shape)
+
+
+def rma(close, length=10):
+    """Wilder's moving average, ewm(alpha=1/length, min_periods=length)"""
+    close = _as_float(close)
+    return _ewm_mean(_as_columns(close), 1.0 / length, True, length).reshape(
+        close.shape
+    )
+
+
+@njit(cache=True)
+def _kama(close, sc, length):
+    n, k = close.shape
+    out = np.full((n, k), np.nan)
+    if n < length:
+        return out
+    for j in range(k):
+        out[length - 1, j] = 0.0
+        for i in range(length, n):
+            out[i, j] = sc[i, j] * close[i, j] + (1 - sc[i, j]) * out[i - 1, j]
+    return out
+
+
+def kama(close, length=10, fast=2, slow=30, drift=1):
+    close = _as_float(close)
+    fast_rate, slow_rate = 2 / (fast + 1), 2 / (slow + 1)
+
+    abs_diff = np.abs(non_zero_range(close, shift(close, length)))
+    peer_diff = np.abs(non_zero_range(close, shift(close, drift)))
+    er = abs_diff / rolling_sum(peer_diff, length)
+    sc = (er * (fast_rate - slow_rate) + slow_rate) ** 2
+
+    return _kama(_as_columns(close), _as_columns(sc), length).reshape(close.shape)
+
+
+def nvi(close, volume, length=1, initial=1000):
+    roc_ = roc(close, length)
+    volume = _as_float(volume)
+
+    decreasing = np.zeros(volume.shape, dtype=bool)
+    decreasing[1:] = volume[1:] < volume[:-1]
+
+    nvi_ = np.where(decreasing & ~np.isnan(roc_), roc_, 0.0)
+    nvi_[0] = initial
+    return np.cumsum(nvi_, axis=0)
+
+
+def midprice(high, low, length):
+    return 0.5 * (rolling_min(low, length) + rolling_max(high, length))
+
+
+def ichimoku(high, low, tenkan=9, kijun=26, senkou=52):
+    """Return (span_a, span_b, tenkan_sen, kijun_sen), spans shifted ``kijun`` bars forward"""
+    tenkan_sen = midprice(high, low, tenkan)
+    kijun_sen = midprice(high, low, kijun)
+    span_a = 0.5 * (tenkan_sen + kijun_sen)
+    span_b = midprice(high, low, senkou)
+
+    return shift(span_a, kijun), shift(span_b, kijun), tenkan_sen, kijun_sen
+
+
+def massi(high, low, fast=9, slow=25):
+    hl_ema1 = ema(non_zero_range(high, low), fast)
+    hl_ema2 = ema(hl_ema1, fast)
+    return rolling_sum(hl_ema1 / hl_ema2, slow)
+
+
+def kst(close, roc1=10, roc2=15, roc3=20, roc4=30, sma1=10, sma2=10, sma3=10, sma4=15):
+    rocma1 = rolling_mean(roc(close, roc1), sma1)
+    rocma2 = rolling_mean(roc(close, roc2), sma2)
+    rocma3 = rolling_mean(roc(close, roc3), sma3)
+    rocma4 = rolling_mean(roc(close, roc4), sma4)
+    return 100 * (rocma1 + 2 * rocma2 + 3 * rocma3 + 4 * rocma4)
+
+
+@njit(cache=True)
+def _psar(high, low, lengths, af0, af_start, max_af):
+    n, k = high.shape
+    long = np.full((n, k), np.nan)
+    short = np.full((n, k), np.nan)
+
+    for j in range(k):
+        if lengths[j] < 2:
+            continue
+        up = high[1, j] - high[0, j]
+        down = low[0, j] - low[1, j]
+        dmn = down if (down > up and down > 0) else 0.0
+        falling = abs(dmn) >= EPSILON and dmn > 0
+
+        if falling:
+            sar, ep = high[0, j], low[0, j]
+        else:
+            sar, ep = low[0, j], high[0, j]
+        af = af_start
+
+        for row in range(1, lengths[j]):
+            high_, low_ = high[row, j], low[row, j]
+            # row - 2 wraps around to the last bar on row 1, as in pandas_ta
+            prev2 = row - 2 if row >= 2 else lengths[j] - 1
+
+            if falling:
+                _sar = sar + af * (ep - sar)
+                reverse = high_ > _sar
+                if low_ < ep:
+                    ep = low_
+                    af = min(af + af0, max_af)
+                _sar = max(high[row - 1, j], high[prev2, j], _sar)
+            else:
+                _sar = sar + af * (ep - sar)
+                reverse = low_ < _sar
+                if high_ > ep:
+                    ep = high_
+                    af = min(af + af0, max_af)
+                _sar = min(low[row - 1, j], low[prev2, j], _sar)
+
+            if reverse:
+                _sar = ep
+                af = af0
+                falling = not falling
+                ep = low_ if falling else high_
+
+            sar = _sar
+            if falling:
+                short[row, j] = sar
+            else:
+                long[row, j] = sar
+
+    return long, short
+
+
+def psar(high, low, af0=0.02, af=None, max_af=0.2, lengths=None):
+    """
+    Return the (long, short) PSAR series, NaN where the other side is active.
+    ``lengths`` gives the number of leading valid rows per column of a panel whose
+    assets have different history lengths (trailing rows are padding).
+    """
+    high = _as_float(high)
+    high_columns = _as_columns(high)
+    af = af0 if af is None else af
+    if lengths is None:
+        lengths = np.full(high_columns.shape[1], high_columns.shape[0])
+
+    long, short = _psar(
+        high_columns,
+        _as_columns(_as_float(low)),
+        np.asarray(lengths, dtype=np.int64).reshape(-1),
+        af0,
+        af,
+        max_af,
+    )
+    return long.reshape(high.shape), short.reshape(high.shape)
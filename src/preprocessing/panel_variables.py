@@ -0,0 +1,375 @@
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.preprocessing import indicator_kernels as kernels
+
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+EXTREMA_PERIODS = [7, 14, 21]
+EXTREMA_FEATURES = [
+    f"local{kind}_{p}" for p in EXTREMA_PERIODS for kind in ["Min", "Max"]
+]
+INT_FEATURES = ["priceMovement", "PSAR_down", "PSAR_up"]
+
+
+def panel_from_frames(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Pivot per-asset OHLCV frames (e.g. {"BTC": btc_df, "ETH": eth_df}) into one (time x asset) frame per field"""
+    return {
+        field: pd.concat({asset: df[field] for asset, df in frames.items()}, axis=1)
+        .sort_index()
+        .astype(float)
+        for field in OHLCV
+    }
+
+
+def _windows(x, window, pad_value=None):
+    if pad_value is not None:
+        padding = np.full((window - 1,) + x.shape[1:], pad_value)
+        x = np.concatenate([padding, x])
+    return sliding_window_view(x, window, axis=0)
+
+
+def _from_windows(values, n, window):
+    out = np.full((n,) + values.shape[1:], np.nan)
+    out[window - 1 :] = values
+    return out
+
+
+def _periods_since(x, window, argfunc):
+    # aroon: bars since the most recent extreme of the last ``window`` bars
+    if len(x) < window:
+        return np.full(x.shape, np.nan)
+    view = _windows(x, window)[..., ::-1]
+    periods = argfunc(view, axis=-1).astype(float)
+    periods[np.isnan(view).any(axis=-1)] = np.nan
+    return _from_windows(periods, len(x), window)
+
+
+def _mean_absolute_deviation(x, window):
+    if len(x) < window:
+        return np.full(x.shape, np.nan)
+    view = _windows(x, window)
+    mad = np.abs(view - view.mean(axis=-1, keepdims=True)).mean(axis=-1)
+    return _from_windows(mad, len(x), window)
+
+
+def _wma(x, length):
+    if len(x) < length:
+        return np.full(x.shape, np.nan)
+    weights = np.arange(1, length + 1)
+    wma = _windows(x, length) @ weights / (0.5 * length * (length + 1))
+    return _from_windows(wma, len(x), length)
+
+
+def _mfi(high, low, close, volume, lengths, period=14):
+    # panel version of create_variables.calculate_mfi
+    typical_price = (high + low + close) / 3
+    money_flow = typical_price * volume
+
+    # np.roll compares the first bar with each asset's last bar
+    previous = kernels.shift(typical_price)
+    previous[0] = typical_price[lengths - 1, np.arange(typical_price.shape[1])]
+    signed_mf = money_flow * np.where(typical_price > previous, 1, -1)
+
+    positive_mf = np.maximum(signed_mf, 0)
+    negative_mf = np.maximum(-signed_mf, 0)
+    mf_avg_gain = _windows(positive_mf, period, 0.0).sum(axis=-1) / period
+    mf_avg_loss = _windows(negative_mf, period, 0.0).sum(axis=-1) / period
+
+    epsilon = 1e-10
+    return 100 - 100 / (1 + mf_avg_gain / (mf_avg_loss + epsilon))
+
+
+def _indicators(high, low, close, volume, lengths):
+    """calculate_technical_indicators on (time x asset) arrays, in the same column order"""
+    n = len(close)
+    features = {}
+    diff = close - kernels.shift(close)
+    prev_high, prev_low = kernels.shift(high), kernels.shift(low)
+
+    # 1. Exponential Moving Averages (EMA)
+    ema_12 = features["EMA_12"] = kernels.ema(close, 12)
+    ema_26 = features["EMA_26"] = kernels.ema(close, 26)
+
+    # 2. Relative Strength Index (RSI)
+    positive_avg = kernels.rma(np.where(diff < 0, 0.0, diff), 14)
+    negative_avg = kernels.rma(np.where(diff > 0, 0.0, diff), 14)
+    rsi = features["RSI_14"] = (
+        100 * positive_avg / (positive_avg + np.abs(negative_avg))
+    )
+
+    # 4. Bollinger Bands (BB)
+    bb_mid = kernels.rolling_mean(close, 20)
+    bb_std = kernels.rolling_std(close, 20)
+    features["BB_Middle"] = bb_mid
+    features["BB_Upper"] = bb_mid + 2 * bb_std
+    features["BB_Lower"] = bb_mid - 2 * bb_std
+
+    # 5. On-Balance Volume (OBV)
+    sign = np.sign(diff)
+    sign[0] = 1
+    features["OBV"] = np.cumsum(sign * volume, axis=0)
+
+    median_price = 0.5 * (high + low)
+    features["AO"] = kernels.rolling_mean(median_price, 5) - kernels.rolling_mean(
+        median_price, 34
+    )
+    features["KAMA"] = kernels.kama(close)
+
+    slow_ma = kernels.rolling_mean(close, 26)
+    ppo = 100 * (kernels.rolling_mean(close, 12) - slow_ma) / slow_ma
+    ppo_signal = kernels.ema(ppo, 9)
+    features["PPO"] = ppo
+    features["PPO_Signal"] = ppo_signal
+    features["PPO_Histogram"] = ppo - ppo_signal
+
+    volume_slow = kernels.ema(volume, 26)
+    pvo = 100 * (kernels.ema(volume, 12) - volume_slow) / volume_slow
+    pvo_signal = kernels.ema(pvo, 9)
+    features["PVO"] = pvo
+    features["PVO_Signal"] = pvo_signal
+    features["PVO_Histogram"] = pvo - pvo_signal
+
+    features["ROC"] = kernels.roc(close, 10)
+    features["RSI"] = rsi
+
+    lowest_rsi = kernels.rolling_min(rsi, 14)
+    highest_rsi = kernels.rolling_max(rsi, 14)
+    stoch_rsi = (
+        100 * (rsi - lowest_rsi) / kernels.non_zero_range(highest_rsi, lowest_rsi)
+    )
+    stoch_rsi_k = kernels.rolling_mean(stoch_rsi, 3)
+    features["Stoch_RSI_K"] = stoch_rsi_k
+    features["Stoch_RSI_D"] = kernels.rolling_mean(stoch_rsi_k, 3)
+
+    lowest_low = kernels.rolling_min(low, 14)
+    highest_high = kernels.rolling_max(high, 14)
+    stoch = (
+        100 * (close - lowest_low) / kernels.non_zero_range(highest_high, lowest_low)
+    )
+    stoch_k = kernels.rolling_mean(stoch, 3)
+    features["Stoch_K"] = stoch_k
+    features["Stoch_D"] = kernels.rolling_mean(stoch_k, 3)
+
+    tsi_fast = kernels.ema(kernels.ema(diff, 25), 13)
+    tsi_abs_fast = kernels.ema(kernels.ema(np.abs(diff), 25), 13)
+    features["TSI"] = 100 * tsi_fast / tsi_abs_fast
+
+    prev_close = kernels.shift(close)
+    buying_pressure = close - np.fmin(low, prev_close)
+    uo_range = np.fmax(high, prev_close) - np.fmin(low, prev_close)
+    uo = sum(
+        weight
+        * kernels.rolling_sum(buying_pressure, length)
+        / kernels.rolling_sum(uo_range, length)
+        for length, weight in [(7, 4.0), (14, 2.0), (28, 1.0)]
+    )
+    uo = 100 * uo / 7.0
+    features["Ultimate_Oscillator"] = uo
+    features["WilliamsR"] = 100 * (
+        (close - lowest_low) / (highest_high - lowest_low) - 1
+    )
+
+    money_flow_volume = (
+        (2 * close - (high + low)) * volume / kernels.non_zero_range(high, low)
+    )
+    features["ADI"] = np.cumsum(money_flow_volume, axis=0)
+    features["CMF"] = kernels.rolling_sum(money_flow_volume, 20) / kernels.rolling_sum(
+        volume, 20
+    )
+
+    distance = median_price - 0.5 * (prev_high + prev_low)
+    box_ratio = volume / 100000000 / kernels.non_zero_range(high, low)
+    features["EMV"] = kernels.rolling_mean(distance / box_ratio, 14)
+    # Force Index
+    features["FI"] = kernels.ema(diff * volume, 13)
+    # Money Flow Index
+    features["MFI"] = _mfi(high, low, close, volume, lengths)
+    # Negative Volume Index
+    features["NVI"] = kernels.nvi(close, volume)
+    # Volume Price Trend
+    features["VPT"] = close * volume
+
+    bbm = kernels.rolling_mean(close, 5)
+    bb5_std = kernels.rolling_std(close, 5)
+    features["BBM"] = bbm
+    features["BBW"] = ((bbm + 2 * bb5_std) - (bbm - 2 * bb5_std)) / bbm
+
+    dc_lower = kernels.rolling_min(low, 20)
+    dc_upper = kernels.rolling_max(high, 20)
+    features["DCM"] = 0.5 * (dc_lower + dc_upper)
+    features["DCW"] = dc_upper - dc_lower
+
+    # Keltner Channel (KC)
+    true_range = kernels.true_range(high, low, close)
+    kc_basis = kernels.ema(close, 20)
+    kc_band = kernels.ema(true_range, 20)
+    features["KCM"] = kc_basis
+    features["KCW"] = (kc_basis + 2 * kc_band) - (kc_basis - 2 * kc_band)
+
+    features["UI"] = uo
+
+    # Aroon Oscillator
+    features["Aroon_down"] = 100 * (1 - _periods_since(low, 15, np.argmin) / 14)
+    features["Aroon_up"] = 100 * (1 - _periods_since(high, 15, np.argmax) / 14)
+
+    # Commodity Channel Index (CCI)
+    typical_price = (high + low + close) / 3
+    features["CCI"] = (typical_price - kernels.rolling_mean(typical_price, 14)) / (
+        0.015 * _mean_absolute_deviation(typical_price, 14)
+    )
+
+    # Detrended Price Oscillator (DPO), centred 11 bars ahead
+    dpo = np.full(close.shape, np.nan)
+    dpo[: n - 11] = close[: n - 11] - kernels.rolling_mean(close, 20)[11:]
+    features["DPO"] = dpo
+
+    # Ichimoku Cloud
+    span_a, span_b, tenkan_sen, kijun_sen = kernels.ichimoku(high, low)
+    features["Ichimoku_A"] = span_a
+    features["Ichimoku_B"] = span_b
+    features["Ichimoku_Base"] = kijun_sen
+    features["Ichimoku_Conversion"] = tenkan_sen
+
+    features["KST"] = kernels.kst(close)
+
+    # MACD, the signal line starts at the first valid MACD value
+    macd = ema_12 - ema_26
+    macd_signal = np.full(close.shape, np.nan)
+    macd_signal[25:] = kernels.ema(macd[25:], 9)
+    features["MACD"] = macd
+    features["MACD_Signal"] = macd_signal
+
+    features["MI"] = kernels.massi(high, low)
+
+    triple_ema = kernels.ema(kernels.ema(kernels.ema(close, 30), 30), 30)
+    features["TRIX"] = 100 * (triple_ema / kernels.shift(triple_ema) - 1)
+
+    tr_sum = kernels.rolling_sum(true_range, 14)
+    features["Vortex_down"] = kernels.rolling_sum(np.abs(low - prev_high), 14) / tr_sum
+    features["Vortex_up"] = kernels.rolling_sum(np.abs(high - prev_low), 14) / tr_sum
+
+    features["WMA"] = _wma(close, 10)
+
+    cmo_positive = kernels.rma(np.where(diff < 0, 0.0, diff), 14)
+    cmo_negative = kernels.rma(np.abs(np.where(diff > 0, 0.0, diff)), 14)
+    features["CR"] = 100 * (cmo_positive - cmo_negative) / (cmo_positive + cmo_negative)
+
+    psar_long, psar_short = kernels.psar(high, low, lengths=lengths)
+    features["PSAR_down"] = ~np.isnan(psar_short)
+    features["PSAR_up"] = ~np.isnan(psar_long)
+
+    return features
+
+
+def _compute_chunk(fields: Dict[str, np.ndarray]):
+    close = fields["close"]
+    n = len(close)
+    log_price_change = np.log(close / kernels.shift(close))
+
+    # rows create_log_price_change would keep for each asset
+    valid = ~np.isnan(log_price_change)
+    for field in OHLCV:
+        valid &= ~np.isnan(fields[field])
+
+    # pack each asset's kept rows to the top so every column is computed on its own
+    # contiguous history, exactly as create_variables does per asset
+    order = np.argsort(~valid, axis=0, kind="stable")
+    lengths = valid.sum(axis=0)
+    padding = np.arange(n)[:, None] >= lengths
+
+    packed = {}
+    for field in OHLCV:
+        packed[field] = np.take_along_axis(fields[field], order, axis=0)
+        packed[field][padding] = np.nan
+    packed_close = packed["close"]
+
+    features = {
+        "logPriceChange": np.take_along_axis(log_price_change, order, axis=0),
+        "priceMovement": np.take_along_axis(log_price_change > 0, order, axis=0),
+    }
+    mins, maxs = kernels.rolling_extrema(packed_close, EXTREMA_PERIODS)
+    for period, local_min, local_max in zip(EXTREMA_PERIODS, mins, maxs):
+        features[f"localMin_{period}"] = packed_close == local_min
+        features[f"localMax_{period}"] = packed_close == local_max
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features.update(
+            _indicators(
+                packed["high"],
+                packed["low"],
+                packed_close,
+                packed["volume"],
+                lengths,
+            )
+        )
+
+    unpacked = {}
+    for name, values in features.items():
+        out = np.full(values.shape, np.nan)
+        np.put_along_axis(out, order, values, axis=0)
+        unpacked[name] = out
+    return valid, unpacked
+
+
+def create_panel_variables(
+    panel: Dict[str, pd.DataFrame], n_jobs: int = 1, chunk_size: int = 64
+) -> pd.DataFrame:
+    """
+    Calculate the create_variables features for a whole panel of assets at once.
+
+    Parameters:
+    - panel (dict): One (time x asset) DataFrame per OHLCV field, see panel_from_frames.
+      Assets may start, end or have gaps on different dates.
+    - n_jobs (int): Number of worker processes. Chunks of assets are computed in
+      parallel when greater than 1.
+    - chunk_size (int): Number of assets per chunk.
+
+    Returns:
+    - pd.DataFrame: Long frame indexed by (date, asset) with the columns of
+      create_variables, holding the rows create_variables keeps for each asset.
+    """
+    dates = pd.DatetimeIndex(panel["close"].index)
+    assets = panel["close"].columns
+    fields = {
+        field: panel[field].reindex(index=dates, columns=assets).to_numpy(dtype=float)
+        for field in OHLCV
+    }
+
+    chunks = [
+        {field: values[:, i : i + chunk_size] for field, values in fields.items()}
+        for i in range(0, len(assets), chunk_size)
+    ]
+    if n_jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_compute_chunk, chunks))
+    else:
+        results = [_compute_chunk(chunk) for chunk in chunks]
+
+    valid = np.concatenate([chunk_valid for chunk_valid, _ in results], axis=1)
+    features = {
+        name: np.concatenate([chunk[name] for _, chunk in results], axis=1)
+        for name in results[0][1]
+    }
+
+    rows, cols = np.nonzero(valid)
+    index = pd.MultiIndex.from_arrays(
+        [dates[rows], assets[cols]], names=[dates.name or "date", "asset"]
+    )
+
+    data = {field: fields[field][valid] for field in OHLCV}
+    for name in ["logPriceChange", "priceMovement"] + EXTREMA_FEATURES:
+        data[name] = features.pop(name)[valid]
+    day_of_week = index.get_level_values(0).dayofweek
+    data["dayOfWeek_Sin"] = np.sin(2 * np.pi * day_of_week / 7)
+    data["dayOfWeek_Cos"] = np.cos(2 * np.pi * day_of_week / 7)
+    data.update({name: values[valid] for name, values in features.items()})
+
+    result = pd.DataFrame(data, index=index)
+    result[INT_FEATURES] = result[INT_FEATURES].astype(int)
+    result[EXTREMA_FEATURES] = result[EXTREMA_FEATURES].astype(np.int8)
+    return result
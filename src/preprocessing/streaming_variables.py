@@ -0,0 +1,660 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from collections import deque
+from typing import Optional
+
+from src.preprocessing.create_variables import create_variables
+
+
+EPSILON = sys.float_info.epsilon
+INT_COLUMNS = ["priceMovement", "PSAR_down", "PSAR_up"]
+INT8_COLUMNS = [
+    "localMin_7",
+    "localMax_7",
+    "localMin_14",
+    "localMax_14",
+    "localMin_21",
+    "localMax_21",
+]
+
+
+def _non_zero(diff):
+    # same guard as pandas_ta's non_zero_range
+    return diff + EPSILON if diff == 0 else diff
+
+
+def _nanmean(values):
+    values = np.asarray(values, dtype=float)
+    valid = values[~np.isnan(values)]
+    return valid.mean() if len(valid) else np.nan
+
+
+class _EWM:
+    """Running equivalent of ``Series.ewm(alpha=alpha, adjust=adjust).mean()``"""
+
+    def __init__(self, alpha: float, adjust: bool = False, min_periods: int = 0):
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = np.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, value: float) -> float:
+        value = np.float64(value)
+        is_observation = not np.isnan(value)
+        self.nobs += is_observation
+        new_wt = 1.0 if self.adjust else self.alpha
+
+        if not np.isnan(self.weighted):
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                if self.weighted != value:
+                    self.weighted = (self.old_wt * self.weighted + new_wt * value) / (
+                        self.old_wt + new_wt
+                    )
+                self.old_wt = self.old_wt + new_wt if self.adjust else 1.0
+        elif is_observation:
+            self.weighted = value
+
+        return self.weighted if self.nobs >= self.min_periods else np.nan
+
+
+class _EMA:
+    """pandas_ta ``ema``: SMA of the first ``length`` values as seed, then ``ewm(adjust=False)``"""
+
+    def __init__(self, length: int, skip_leading_nan: bool = False):
+        self.length = length
+        self.skip_leading_nan = skip_leading_nan
+        self._seed = []
+        self._ewm = _EWM(2 / (length + 1))
+
+    def update(self, value: float) -> float:
+        if self._seed is not None:
+            # macd's signal line is computed on the series trimmed to its first valid value
+            if self.skip_leading_nan and not self._seed and np.isnan(value):
+                return np.nan
+            self._seed.append(value)
+            if len(self._seed) < self.length:
+                return np.nan
+            value = _nanmean(self._seed)
+            self._seed = None
+        return self._ewm.update(value)
+
+
+def _rma(length: int) -> _EWM:
+    return _EWM(1.0 / length, adjust=True, min_periods=length)
+
+
+class _Window:
+    """Ring buffer equivalent of ``Series.rolling(length, min_periods)``"""
+
+    def __init__(self, length: int, min_periods: Optional[int] = None):
+        self._buffer = deque(maxlen=length)
+        self.min_periods = length if min_periods is None else min_periods
+
+    def push(self, value: float) -> "_Window":
+        self._buffer.append(value)
+        return self
+
+    def _values(self):
+        values = np.fromiter(self._buffer, dtype=float, count=len(self._buffer))
+        if np.count_nonzero(~np.isnan(values)) < self.min_periods:
+            return None
+        return values
+
+    def sum(self) -> float:
+        values = self._values()
+        return np.nan if values is None else np.nansum(values)
+
+    def mean(self) -> float:
+        values = self._values()
+        return np.nan if values is None else np.nanmean(values)
+
+    def min(self) -> float:
+        values = self._values()
+        return np.nan if values is None else np.nanmin(values)
+
+    def max(self) -> float:
+        values = self._values()
+        return np.nan if values is None else np.nanmax(values)
+
+    def std(self, ddof: int = 0) -> float:
+        values = self._values()
+        return np.nan if values is None else np.sqrt(np.nanvar(values, ddof=ddof))
+
+    def apply(self, func) -> float:
+        values = self._values()
+        return np.nan if values is None else func(values)
+
+
+class _Lag:
+    """Equivalent of ``Series.shift(periods)`` for a stream of values"""
+
+    def __init__(self, periods: int):
+        self._buffer = deque(maxlen=periods + 1)
+
+    def push(self, value: float) -> float:
+        self._buffer.append(value)
+        return self._buffer[0] if len(self._buffer) == self._buffer.maxlen else np.nan
+
+
+class StreamingFeatureEngine:
+    """
+    Incrementally compute the ``create_variables`` features one daily bar at a time.
+
+    Every indicator keeps its own state (EMA/RMA values, ring buffers for rolling
+    windows, OBV/NVI/ADI accumulators and the PSAR state), so appending a bar costs
+    O(window) instead of recomputing the whole history.
+
+    Parameters:
+    - verify (bool): If True, every bar passed to ``update`` after warm-up is checked
+      against ``create_variables`` run on the full history and a ValueError is raised
+      on mismatch. This keeps a copy of the raw bars and is meant for testing only.
+    - rtol, atol (float): Tolerances used by the verification mode.
+
+    Notes:
+    - DPO is centred by pandas_ta (it looks 11 bars ahead), so it is always NaN for
+      the newest bar, exactly as in the batch output.
+    - pandas_ta's PSAR reads the last bar of the series on its second row (negative
+      index wrap-around). The engine uses the first bar instead, so PSAR flags agree
+      with the batch output once the first reversal has passed. calculate_mfi has the
+      same wrap-around (np.roll), which only affects its first 14 rows.
+    """
+
+    def __init__(self, verify: bool = False, rtol: float = 1e-6, atol: float = 1e-8):
+        self.verify = verify
+        self.rtol = rtol
+        self.atol = atol
+        self._history = [] if verify else None
+        self._verifying = verify
+        self.index_name = None
+
+        self._prev_raw_close = np.nan
+        self._n = 0  # number of bars kept after create_log_price_change's dropna
+
+        self._close = deque(maxlen=31)
+        self._high = deque(maxlen=2)
+        self._low = deque(maxlen=2)
+        self._volume = deque(maxlen=2)
+
+        self._extrema = {
+            period: _Window(period, min_periods=1) for period in [7, 14, 21]
+        }
+
+        self._ema = {
+            "close_12": _EMA(12),
+            "close_26": _EMA(26),
+            "volume_12": _EMA(12),
+            "volume_26": _EMA(26),
+            "ppo_signal": _EMA(9),
+            "pvo_signal": _EMA(9),
+            "tsi_slow": _EMA(25),
+            "tsi_fast": _EMA(13),
+            "tsi_abs_slow": _EMA(25),
+            "tsi_abs_fast": _EMA(13),
+            "efi": _EMA(13),
+            "kc_basis": _EMA(20),
+            "kc_band": _EMA(20),
+            "macd_signal": _EMA(9, skip_leading_nan=True),
+            "massi_1": _EMA(9),
+            "massi_2": _EMA(9),
+            "trix_1": _EMA(30),
+            "trix_2": _EMA(30),
+            "trix_3": _EMA(30),
+        }
+        self._rma = {
+            "rsi_pos": _rma(14),
+            "rsi_neg": _rma(14),
+            "cmo_pos": _rma(14),
+            "cmo_neg": _rma(14),
+        }
+        self._window = {
+            "close_20": _Window(20),
+            "close_5": _Window(5),
+            "close_12": _Window(12),
+            "close_26": _Window(26),
+            "close_10": _Window(10),
+            "median_5": _Window(5),
+            "median_34": _Window(34),
+            "kama_peer": _Window(10),
+            "rsi_14": _Window(14),
+            "stoch_rsi_k": _Window(3),
+            "stoch_rsi_d": _Window(3),
+            "low_14": _Window(14),
+            "high_14": _Window(14),
+            "stoch_k": _Window(3),
+            "stoch_d": _Window(3),
+            "cmf_mfv": _Window(20),
+            "cmf_volume": _Window(20),
+            "eom": _Window(14),
+            "mfi_pos": _Window(14, min_periods=1),
+            "mfi_neg": _Window(14, min_periods=1),
+            "low_20": _Window(20),
+            "high_20": _Window(20),
+            "aroon_high": _Window(15),
+            "aroon_low": _Window(15),
+            "cci_tp": _Window(14),
+            "low_9": _Window(9),
+            "high_9": _Window(9),
+            "low_26": _Window(26),
+            "high_26": _Window(26),
+            "low_52": _Window(52),
+            "high_52": _Window(52),
+            "kst_1": _Window(10),
+            "kst_2": _Window(10),
+            "kst_3": _Window(10),
+            "kst_4": _Window(15),
+            "massi": _Window(25),
+            "vortex_tr": _Window(14),
+            "vortex_plus": _Window(14),
+            "vortex_minus": _Window(14),
+        }
+        self._window.update(
+            {f"uo_bp_{n}": _Window(n) for n in [7, 14, 28]}
+            | {f"uo_tr_{n}": _Window(n) for n in [7, 14, 28]}
+        )
+        self._lag = {"span_a": _Lag(26), "span_b": _Lag(26)}
+
+        self._obv = 0.0
+        self._adi = 0.0
+        self._nvi = np.nan
+        self._prev_tp = np.nan
+        self._kama = np.nan
+        self._trix_prev = np.nan
+        self._psar = None
+
+    @classmethod
+    def from_history(
+        cls, df: pd.DataFrame, verify: bool = False, **kwargs
+    ) -> "StreamingFeatureEngine":
+        """Warm up the indicator state on raw OHLCV history (same input as create_variables)"""
+        engine = cls(verify=verify, **kwargs)
+        engine._verifying = False
+        engine.index_name = df.index.name
+        for _, bar in df.iterrows():
+            engine.update(bar)
+        engine._verifying = verify
+        return engine
+
+    def update(self, bar: pd.Series) -> Optional[pd.DataFrame]:
+        """
+        Append one raw bar (a row of the OHLCV frame, named by its date) and return
+        its feature row, or None if create_variables would drop it.
+        """
+        if self._history is not None:
+            self._history.append(bar)
+
+        close = float(bar["close"])
+        log_price_change = np.log(close / self._prev_raw_close)
+        self._prev_raw_close = close
+
+        # create_log_price_change drops every row with a NaN in any column
+        if np.isnan(log_price_change) or bar.isna().any():
+            return None
+
+        row = bar.to_dict()
+        row["logPriceChange"] = log_price_change
+        row["priceMovement"] = int(log_price_change > 0)
+
+        for period, window in self._extrema.items():
+            window.push(close)
+            row[f"localMin_{period}"] = int(close == window.min())
+            row[f"localMax_{period}"] = int(close == window.max())
+
+        day_of_week = pd.Timestamp(bar.name).dayofweek
+        row["dayOfWeek_Sin"] = np.sin(2 * np.pi * day_of_week / 7)
+        row["dayOfWeek_Cos"] = np.cos(2 * np.pi * day_of_week / 7)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row.update(
+                self._step(
+                    np.float64(bar["high"]),
+                    np.float64(bar["low"]),
+                    np.float64(close),
+                    np.float64(bar["volume"]),
+                )
+            )
+        self._n += 1
+
+        result = pd.DataFrame([row], index=pd.Index([bar.name], name=self.index_name))
+        result[INT_COLUMNS] = result[INT_COLUMNS].astype(int)
+        result[INT8_COLUMNS] = result[INT8_COLUMNS].astype(np.int8)
+
+        if self._verifying:
+            self._verify(result)
+
+        return result
+
+    def _step(self, high: float, low: float, close: float, volume: float) -> dict:
+        ema, rma, window, lag = self._ema, self._rma, self._window, self._lag
+        features = {}
+
+        close_lag = lambda periods: (
+            self._close[-periods] if len(self._close) >= periods else np.nan
+        )
+        self._close.append(close)
+        prev_close = close_lag(2)
+        prev_high = self._high[-1] if self._high else np.nan
+        prev_low = self._low[-1] if self._low else np.nan
+        prev_volume = self._volume[-1] if self._volume else np.nan
+        diff = close - prev_close
+
+        # EMA
+        ema_12 = ema["close_12"].update(close)
+        ema_26 = ema["close_26"].update(close)
+        features["EMA_12"] = ema_12
+        features["EMA_26"] = ema_26
+
+        # RSI
+        pos_avg = rma["rsi_pos"].update(max(diff, 0.0) if not np.isnan(diff) else diff)
+        neg_avg = rma["rsi_neg"].update(min(diff, 0.0) if not np.isnan(diff) else diff)
+        rsi = 100 * pos_avg / (pos_avg + abs(neg_avg))
+        features["RSI_14"] = rsi
+
+        # Bollinger Bands (20, 2)
+        bb_mid = window["close_20"].push(close).mean()
+        bb_std = window["close_20"].std()
+        features["BB_Middle"] = bb_mid
+        features["BB_Upper"] = bb_mid + 2 * bb_std
+        features["BB_Lower"] = bb_mid - 2 * bb_std
+
+        # OBV (pandas_ta uses +1 as the sign of the first bar)
+        sign = 1.0 if np.isnan(diff) else float(np.sign(diff))
+        self._obv += sign * volume
+        features["OBV"] = self._obv
+
+        median_price = 0.5 * (high + low)
+        features["AO"] = (
+            window["median_5"].push(median_price).mean()
+            - window["median_34"].push(median_price).mean()
+        )
+
+        # KAMA (10, 2, 30), seeded with 0 like pandas_ta
+        abs_diff = abs(_non_zero(close - close_lag(11)))
+        peer_sum = window["kama_peer"].push(abs(_non_zero(diff))).sum()
+        smoothing = (abs_diff / peer_sum * (2 / 3 - 2 / 31) + 2 / 31) ** 2
+        if self._n == 9:
+            self._kama = 0.0
+        elif self._n > 9:
+            self._kama = smoothing * close + (1 - smoothing) * self._kama
+        features["KAMA"] = self._kama
+
+        # PPO (SMA based) and PVO (EMA based)
+        slow_ma = window["close_26"].push(close).mean()
+        ppo = 100 * (window["close_12"].push(close).mean() - slow_ma) / slow_ma
+        ppo_signal = ema["ppo_signal"].update(ppo)
+        features["PPO"] = ppo
+        features["PPO_Signal"] = ppo_signal
+        features["PPO_Histogram"] = ppo - ppo_signal
+
+        volume_slow = ema["volume_26"].update(volume)
+        pvo = 100 * (ema["volume_12"].update(volume) - volume_slow) / volume_slow
+        pvo_signal = ema["pvo_signal"].update(pvo)
+        features["PVO"] = pvo
+        features["PVO_Signal"] = pvo_signal
+        features["PVO_Histogram"] = pvo - pvo_signal
+
+        roc = (
+            lambda periods: 100
+            * (close - close_lag(periods + 1))
+            / close_lag(periods + 1)
+        )
+        features["ROC"] = roc(10)
+        features["RSI"] = rsi
+
+        # Stochastic RSI
+        rsi_window = window["rsi_14"].push(rsi)
+        lowest_rsi, highest_rsi = rsi_window.min(), rsi_window.max()
+        stoch_rsi = 100 * (rsi - lowest_rsi) / _non_zero(highest_rsi - lowest_rsi)
+        stoch_rsi_k = window["stoch_rsi_k"].push(stoch_rsi).mean()
+        features["Stoch_RSI_K"] = stoch_rsi_k
+        features["Stoch_RSI_D"] = window["stoch_rsi_d"].push(stoch_rsi_k).mean()
+
+        # Stochastic Oscillator
+        lowest_low = window["low_14"].push(low).min()
+        highest_high = window["high_14"].push(high).max()
+        stoch = 100 * (close - lowest_low) / _non_zero(highest_high - lowest_low)
+        stoch_k = window["stoch_k"].push(stoch).mean()
+        features["Stoch_K"] = stoch_k
+        features["Stoch_D"] = window["stoch_d"].push(stoch_k).mean()
+
+        # TSI
+        tsi_fast = ema["tsi_fast"].update(ema["tsi_slow"].update(diff))
+        tsi_abs_fast = ema["tsi_abs_fast"].update(ema["tsi_abs_slow"].update(abs(diff)))
+        features["TSI"] = 100 * tsi_fast / tsi_abs_fast
+
+        # Ultimate Oscillator
+        max_high = np.nanmax([high, prev_close])
+        min_low = np.nanmin([low, prev_close])
+        uo = sum(
+            weight
+            * window[f"uo_bp_{n}"].push(close - min_low).sum()
+            / window[f"uo_tr_{n}"].push(max_high - min_low).sum()
+            for n, weight in [(7, 4.0), (14, 2.0), (28, 1.0)]
+        )
+        uo = 100 * uo / 7.0
+        features["Ultimate_Oscillator"] = uo
+        features["WilliamsR"] = 100 * (
+            (close - lowest_low) / (highest_high - lowest_low) - 1
+        )
+
+        # ADI and CMF
+        money_flow_volume = (2 * close - (high + low)) * volume / _non_zero(high - low)
+        self._adi += money_flow_volume
+        features["ADI"] = self._adi
+        features["CMF"] = (
+            window["cmf_mfv"].push(money_flow_volume).sum()
+            / window["cmf_volume"].push(volume).sum()
+        )
+
+        # Ease of Movement
+        distance = median_price - 0.5 * (prev_high + prev_low)
+        box_ratio = volume / 100000000 / _non_zero(high - low)
+        features["EMV"] = window["eom"].push(distance / box_ratio).mean()
+
+        features["FI"] = ema["efi"].update(diff * volume)
+
+        # MFI (see calculate_mfi: partial windows and a -1 sign on the first bar)
+        typical_price = (high + low + close) / 3
+        money_flow = typical_price * volume
+        mf_sign = 1 if typical_price > self._prev_tp else -1
+        self._prev_tp = typical_price
+        mf_avg_gain = window["mfi_pos"].push(max(money_flow * mf_sign, 0)).sum() / 14
+        mf_avg_loss = window["mfi_neg"].push(max(-money_flow * mf_sign, 0)).sum() / 14
+        features["MFI"] = 100 - 100 / (1 + mf_avg_gain / (mf_avg_loss + 1e-10))
+
+        # NVI
+        if np.isnan(self._nvi):
+            self._nvi = 1000.0
+        elif volume < prev_volume and not np.isnan(roc(1)):
+            self._nvi += roc(1)
+        features["NVI"] = self._nvi
+
+        features["VPT"] = close * volume
+
+        # Bollinger Bands (5, 2)
+        bbm = window["close_5"].push(close).mean()
+        bb5_std = window["close_5"].std()
+        features["BBM"] = bbm
+        features["BBW"] = ((bbm + 2 * bb5_std) - (bbm - 2 * bb5_std)) / bbm
+
+        # Donchian Channel
+        dc_lower = window["low_20"].push(low).min()
+        dc_upper = window["high_20"].push(high).max()
+        features["DCM"] = 0.5 * (dc_lower + dc_upper)
+        features["DCW"] = dc_upper - dc_lower
+
+        # Keltner Channel
+        true_range = (
+            np.nan
+            if np.isnan(prev_close)
+            else max(
+                abs(_non_zero(high - low)),
+                abs(high - prev_close),
+                abs(prev_close - low),
+            )
+        )
+        kc_basis = ema["kc_basis"].update(close)
+        kc_band = ema["kc_band"].update(true_range)
+        features["KCM"] = kc_basis
+        features["KCW"] = (kc_basis + 2 * kc_band) - (kc_basis - 2 * kc_band)
+
+        features["UI"] = uo
+
+        # Aroon
+        periods_from_high = (
+            window["aroon_high"].push(high).apply(lambda x: int(np.argmax(x[::-1])))
+        )
+        periods_from_low = (
+            window["aroon_low"].push(low).apply(lambda x: int(np.argmin(x[::-1])))
+        )
+        features["Aroon_down"] = 100 * (1 - periods_from_low / 14)
+        features["Aroon_up"] = 100 * (1 - periods_from_high / 14)
+
+        # CCI
+        tp_window = window["cci_tp"].push(typical_price)
+        mad = tp_window.apply(lambda x: np.fabs(x - x.mean()).mean())
+        features["CCI"] = (typical_price - tp_window.mean()) / (0.015 * mad)
+
+        # DPO is centred and needs 11 future bars
+        features["DPO"] = np.nan
+
+        # Ichimoku
+        tenkan = 0.5 * (
+            window["low_9"].push(low).min() + window["high_9"].push(high).max()
+        )
+        kijun = 0.5 * (
+            window["low_26"].push(low).min() + window["high_26"].push(high).max()
+        )
+        span_b = 0.5 * (
+            window["low_52"].push(low).min() + window["high_52"].push(high).max()
+        )
+        features["Ichimoku_A"] = lag["span_a"].push(0.5 * (tenkan + kijun))
+        features["Ichimoku_B"] = lag["span_b"].push(span_b)
+        features["Ichimoku_Base"] = kijun
+        features["Ichimoku_Conversion"] = tenkan
+
+        # KST
+        features["KST"] = 100 * (
+            window["kst_1"].push(roc(10)).mean()
+            + 2 * window["kst_2"].push(roc(15)).mean()
+            + 3 * window["kst_3"].push(roc(20)).mean()
+            + 4 * window["kst_4"].push(roc(30)).mean()
+        )
+
+        # MACD
+        macd = ema_12 - ema_26
+        features["MACD"] = macd
+        features["MACD_Signal"] = ema["macd_signal"].update(macd)
+
+        # Mass Index
+        hl_ema1 = ema["massi_1"].update(_non_zero(high - low))
+        hl_ema2 = ema["massi_2"].update(hl_ema1)
+        features["MI"] = window["massi"].push(hl_ema1 / hl_ema2).sum()
+
+        # TRIX
+        trix_ema = ema["trix_3"].update(
+            ema["trix_2"].update(ema["trix_1"].update(close))
+        )
+        features["TRIX"] = 100 * (trix_ema / self._trix_prev - 1)
+        self._trix_prev = trix_ema
+
+        # Vortex
+        tr_sum = window["vortex_tr"].push(true_range).sum()
+        features["Vortex_down"] = (
+            window["vortex_minus"].push(abs(low - prev_high)).sum() / tr_sum
+        )
+        features["Vortex_up"] = (
+            window["vortex_plus"].push(abs(high - prev_low)).sum() / tr_sum
+        )
+
+        features["WMA"] = (
+            window["close_10"].push(close).apply(lambda x: np.dot(x, np.arange(1, 11)))
+            / 55
+        )
+
+        # Chande Momentum Oscillator (RMA smoothed)
+        cmo_pos = rma["cmo_pos"].update(max(diff, 0.0) if not np.isnan(diff) else diff)
+        cmo_neg = rma["cmo_neg"].update(
+            abs(min(diff, 0.0)) if not np.isnan(diff) else diff
+        )
+        features["CR"] = 100 * (cmo_pos - cmo_neg) / (cmo_pos + cmo_neg)
+
+        falling = self._psar_step(high, low)
+        features["PSAR_down"] = int(falling is True)
+        features["PSAR_up"] = int(falling is False)
+
+        self._high.append(high)
+        self._low.append(low)
+        self._volume.append(volume)
+        return features
+
+    def _psar_step(self, high: float, low: float, af0=0.02, max_af=0.2):
+        """Advance the PSAR state and return True when falling (None on the first bar)"""
+        if not self._high:
+            return None
+
+        prev_high, prev_low = self._high[-1], self._low[-1]
+        if self._psar is None:
+            up = high - prev_high
+            down = prev_low - low
+            falling = down > up and down > 0
+            self._psar = {
+                "falling": falling,
+                "sar": prev_high if falling else prev_low,
+                "ep": prev_low if falling else prev_high,
+                "af": af0,
+            }
+
+        state = self._psar
+        sar, ep, af = state["sar"], state["ep"], state["af"]
+        if state["falling"]:
+            _sar = sar + af * (ep - sar)
+            reverse = high > _sar
+            if low < ep:
+                ep = low
+                af = min(af + af0, max_af)
+            _sar = max(self._high[0], prev_high, _sar)
+        else:
+            _sar = sar + af * (ep - sar)
+            reverse = low < _sar
+            if high > ep:
+                ep = high
+                af = min(af + af0, max_af)
+            _sar = min(self._low[0], prev_low, _sar)
+
+        if reverse:
+            _sar = ep
+            af = af0
+            state["falling"] = not state["falling"]
+            ep = low if state["falling"] else high
+
+        state.update(sar=_sar, ep=ep, af=af)
+        return state["falling"]
+
+    def _verify(self, result: pd.DataFrame):
+        history = pd.DataFrame(self._history)
+        history.index.name = result.index.name
+        expected = create_variables(history).iloc[[-1]]
+
+        mismatches = []
+        for col in expected.select_dtypes(include=np.number).columns:
+            if not np.isclose(
+                float(result[col].iloc[0]),
+                float(expected[col].iloc[0]),
+                rtol=self.rtol,
+                atol=self.atol,
+                equal_nan=True,
+            ):
+                mismatches.append(
+                    f"{col}: streaming={result[col].iloc[0]}, batch={expected[col].iloc[0]}"
+                )
+
+        if mismatches:
+            raise ValueError(
+                f"Streaming features diverge from create_variables at {result.index[0]}: "
+                + "; ".join(mismatches)
+            )
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+from statsmodels.tsa.adfvalues import mackinnonp
+
+
+# Vectorized ADF, Phillips-Perron and KPSS tests (constant only, as in stationarity.py)
+# for every column of a feature matrix. Columns sharing a length are stacked into one
+# design tensor and solved with batched QR, reproducing
+#   adfuller(x, autolag="AIC"), arch PhillipsPerron(x), kpss(x, regression="c", nlags="auto")
+
+KPSS_CRITICAL_VALUES = [0.347, 0.463, 0.574, 0.739]
+KPSS_PVALUES = [0.10, 0.05, 0.025, 0.01]
+# shortest series for which PP has at least as many residuals as Newey-West lags
+MIN_OBSERVATIONS = 8
+
+
+def _schwert_lags(nobs):
+    return int(np.ceil(12.0 * np.power(nobs / 100.0, 1 / 4.0)))
+
+
+def _autocovariances(resids, lags):
+    """Sums of lagged products, shape (lags + 1, k), row 0 being the sum of squares"""
+    n = len(resids)
+    products = np.zeros((lags + 1, resids.shape[1]))
+    for i in range(lags + 1):
+        products[i] = np.einsum("ij,ij->j", resids[i:], resids[: n - i])
+    return products
+
+
+def _lag_design(x, lags):
+    """Rows t = lags..N-2 of [const, x_t, dx_{t-1}, ..., dx_{t-lags}] and dx_t, for (N x k) x"""
+    n = len(x)
+    xdiff = np.diff(x, axis=0)
+    nobs = n - 1 - lags
+    design = np.empty((x.shape[1], nobs, lags + 2))
+    design[:, :, 0] = 1.0
+    design[:, :, 1] = x[lags : n - 1].T
+    for lag in range(1, lags + 1):
+        design[:, :, lag + 1] = xdiff[lags - lag : n - 1 - lag].T
+    return design, xdiff[lags:].T
+
+
+def adf_batch(x):
+    """
+    ADF test with AIC lag selection for every column of an (N x k) array.
+
+    Returns:
+    - tuple: (statistics, p-values, used lags), one entry per column.
+    """
+    n, k = x.shape
+    maxlag = min(n // 2 - 2, _schwert_lags(n))
+    if maxlag < 0:
+        raise ValueError(
+            "sample size is too short to use selected regression component"
+        )
+
+    # every lag order is a column prefix of the maxlag design, so one QR gives all SSRs
+    design, y = _lag_design(x, maxlag)
+    nobs = design.shape[1]
+    q, r = np.linalg.qr(design)
+    qty = np.einsum("kni,kn->ki", q, y)
+    resid = y - np.einsum("kni,ki->kn", q, qty)
+    ssr_full = np.einsum("kn,kn->k", resid, resid)
+    tail = np.cumsum((qty**2)[:, ::-1], axis=1)[:, ::-1]
+
+    aic = []
+    for lag in range(maxlag + 1):
+        n_params = lag + 2
+        ssr = ssr_full + (tail[:, n_params] if n_params < tail.shape[1] else 0.0)
+        llf = -nobs / 2.0 * (np.log(2 * np.pi) + np.log(ssr / nobs) + 1)
+        aic.append(-2 * llf + 2 * n_params)
+    # np.argmin keeps the smallest lag on ties, like statsmodels' min((aic, lag))
+    used_lags = np.argmin(np.array(aic), axis=0)
+
+    stats = np.full(k, np.nan)
+    for lag in np.unique(used_lags):
+        columns = np.flatnonzero(used_lags == lag)
+        design, y = _lag_design(x[:, columns], lag)
+        nobs, n_params = design.shape[1:]
+        q, r = np.linalg.qr(design)
+        qty = np.einsum("kni,kn->ki", q, y)
+        resid = y - np.einsum("kni,ki->kn", q, qty)
+        sigma2 = np.einsum("kn,kn->k", resid, resid) / (nobs - n_params)
+        r_inv = np.linalg.inv(r)
+        beta = np.einsum("kij,kj->ki", r_inv, qty)
+        # diagonal of (X'X)^-1 = R^-1 R^-T for the level coefficient
+        se = np.sqrt(sigma2 * np.einsum("kj,kj->k", r_inv[:, 1], r_inv[:, 1]))
+        stats[columns] = beta[:, 1] / se
+
+    pvalues = np.array([mackinnonp(stat, regression="c", N=1) for stat in stats])
+    return stats, pvalues, used_lags
+
+
+def pp_batch(x):
+    """
+    Phillips-Perron Z-tau test for every column of an (N x k) array.
+
+    Returns:
+    - tuple: (statistics, p-values), one entry per column.
+    """
+    lags = _schwert_lags(len(x))
+    y, y_lag = x[1:], x[:-1]
+    n, n_params = len(y), 2
+    if n < lags:
+        raise ValueError("number of observations is less than the number of lags")
+
+    lag_dev = y_lag - y_lag.mean(axis=0)
+    sxx = (lag_dev**2).sum(axis=0)
+    rho = (lag_dev * (y - y.mean(axis=0))).sum(axis=0) / sxx
+    u = y - y.mean(axis=0) - rho * lag_dev
+
+    products = _autocovariances(u, lags)
+    weights = 1 - np.arange(lags + 1) / (lags + 1)
+    lam2 = (products[0] + 2 * weights[1:] @ products[1:]) / n
+    lam = np.sqrt(lam2)
+
+    s2 = products[0] / (n - n_params)
+    s = np.sqrt(s2)
+    gamma0 = s2 * (n - n_params) / n
+    sigma = np.sqrt(s2 / sxx)
+
+    stats = np.sqrt(gamma0 / lam2) * ((rho - 1) / sigma) - 0.5 * (
+        (lam2 - gamma0) / lam
+    ) * (n * sigma / s)
+    pvalues = np.array([mackinnonp(stat, regression="c", N=1) for stat in stats])
+    return stats, pvalues
+
+
+def kpss_batch(x):
+    """
+    KPSS level-stationarity test with automatic lags for every column of an (N x k) array.
+
+    Returns:
+    - tuple: (statistics, p-values, lags), one entry per column.
+    """
+    nobs = len(x)
+    resids = x - x.mean(axis=0)
+
+    # Hobijn et al. (1998) automatic bandwidth, as in statsmodels' _kpss_autolag
+    covlags = int(np.power(nobs, 2.0 / 9.0))
+    products = _autocovariances(resids, covlags)
+    scaled = products[1:] / (nobs / 2.0)
+    s0 = products[0] / nobs + scaled.sum(axis=0)
+    s1 = (np.arange(1, covlags + 1)[:, None] * scaled).sum(axis=0)
+    gamma_hat = 1.1447 * np.power((s1 / s0) ** 2, 1.0 / 3.0)
+    lags = np.minimum((gamma_hat * np.power(nobs, 1.0 / 3.0)).astype(int), nobs - 1)
+
+    products = _autocovariances(resids, lags.max())
+    i = np.arange(1, lags.max() + 1)[:, None]
+    weights = np.where(i <= lags, 1.0 - i / (lags + 1.0), 0.0)
+    s_hat = (products[0] + 2 * (weights * products[1:]).sum(axis=0)) / nobs
+
+    eta = (np.cumsum(resids, axis=0) ** 2).sum(axis=0) / nobs**2
+    stats = eta / s_hat
+    pvalues = np.interp(stats, KPSS_CRITICAL_VALUES, KPSS_PVALUES)
+    return stats, pvalues, lags
+
+
+def stationarity_report(df, alpha=0.05, columns=None):
+    """
+    ADF, PP and KPSS results for every numeric column of a DataFrame in one sweep.
+
+    Columns are forward-filled and stripped of leading NaNs like in
+    difference_non_stationary_features, then grouped by length. Constant columns and
+    columns too short for the tests are left out of the report.
+
+    Parameters:
+    - df (pd.DataFrame): Feature matrix.
+    - alpha (float): Significance level.
+    - columns (list): Columns to test, all numeric columns by default.
+
+    Returns:
+    - pd.DataFrame: One row per column with "<test> Test Statistic", "<test> p-value"
+      and "<test> Stationary" columns for ADF, PP and KPSS, the selected lags and
+      the 2-of-3 "Non-stationary" vote.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=np.number).columns.tolist()
+
+    groups = {}
+    for col in columns:
+        series = df[col].ffill().dropna().to_numpy(dtype=float)
+        if len(series) < MIN_OBSERVATIONS or series.max() == series.min():
+            continue
+        groups.setdefault(len(series), []).append((col, series))
+
+    rows = {}
+    for group in groups.values():
+        names = [col for col, _ in group]
+        x = np.column_stack([series for _, series in group])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            adf_stats, adf_pvalues, adf_lags = adf_batch(x)
+            pp_stats, pp_pvalues = pp_batch(x)
+            kpss_stats, kpss_pvalues, kpss_lags = kpss_batch(x)
+
+        for i, col in enumerate(names):
+            rows[col] = {
+                "ADF Test Statistic": adf_stats[i],
+                "ADF p-value": adf_pvalues[i],
+                "ADF Lags": adf_lags[i],
+                "ADF Stationary": adf_pvalues[i] < alpha,
+                "PP Test Statistic": pp_stats[i],
+                "PP p-value": pp_pvalues[i],
+                "PP Stationary": pp_pvalues[i] < alpha,
+                "KPSS Test Statistic": kpss_stats[i],
+                "KPSS p-value": kpss_pvalues[i],
+                "KPSS Lags": kpss_lags[i],
+                "KPSS Stationary": kpss_pvalues[i] >= alpha,
+            }
+
+    report = pd.DataFrame.from_dict(rows, orient="index")
+    if report.empty:
+        return report
+    report = report.loc[[col for col in columns if col in rows]]
+    votes = sum(~report[f"{test} Stationary"] for test in ["ADF", "PP", "KPSS"])
+    report["Non-stationary"] = votes >= 2
+    return report
@@ -1,8 +1,13 @@
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
+
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
 from statsmodels.stats.diagnostic import het_white, het_breuschpagan, het_goldfeldquandt
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import PowerTransformer
+from sklearn.utils.validation import check_is_fitted
 from config import config
 
 
@@ -29,48 +34,183 @@ def check_heteroskedasticity(series, alpha=0.05):
     }
 
 
-def log_heteroskedastic_vars(
-    df,
-    target="logPriceChange",
-    variables_to_exclude=config.EXCLUDE_VARIABLES,
-    alpha=0.05,
-    verbose=False,
-):
-    processed_df = df.copy()
+def _residuals(X, Y):
+    # OLS residuals of every column of Y on the shared design X in one solve
+    beta, *_ = np.linalg.lstsq(X, Y, rcond=None)
+    return Y - X @ beta
+
+
+def _r_squared(X, Y):
+    resid = _residuals(X, Y)
+    centered = Y - Y.mean(axis=0)
+    return 1 - (resid**2).sum(axis=0) / (centered**2).sum(axis=0)
+
 
+def _heteroskedasticity_pvalues(values):
+    """White, Breusch-Pagan and Goldfeld-Quandt p-values for every column of (n x k) values"""
+    n = len(values)
+    time = np.arange(n, dtype=float)
+    X = sm.add_constant(time)
+    squared_resid = _residuals(X, values) ** 2
+
+    # White: squared residuals on the cross products [1, t, t^2] of the design
+    white_lm = n * _r_squared(np.column_stack([X, time**2]), squared_resid)
+    white_p = stats.chi2.sf(white_lm, 2)
+
+    # Breusch-Pagan (Koenker's robust LM): squared residuals on the design itself
+    bp_lm = n * _r_squared(X, squared_resid)
+    bp_p = stats.chi2.sf(bp_lm, 1)
+
+    # Goldfeld-Quandt: residual variance of the second half over the first half
+    split = n // 2
+    df1, df2 = split - X.shape[1], n - split - X.shape[1]
+    mse1 = (_residuals(X[:split], values[:split]) ** 2).sum(axis=0) / df1
+    mse2 = (_residuals(X[split:], values[split:]) ** 2).sum(axis=0) / df2
+    gq_p = stats.f.sf(mse2 / mse1, df1, df2)
+
+    return white_p, bp_p, gq_p
+
+
+def check_heteroskedasticity_batch(df, alpha=0.05):
+    """
+    Vectorized check_heteroskedasticity for every column of a DataFrame.
+
+    Columns with the same number of non-null values share the time-trend design, so
+    their residuals and the three tests are computed with one matrix solve per group.
+
+    Parameters:
+    - df (pd.DataFrame): Numeric columns to check, NaNs are dropped per column.
+    - alpha (float): Significance level.
+
+    Returns:
+    - pd.DataFrame: One row per column with the keys of check_heteroskedasticity.
+    """
+    groups = {}
     for col in df.columns:
-        if col == target or col in variables_to_exclude:
-            continue
+        values = df[col].dropna().to_numpy(dtype=float)
+        groups.setdefault(len(values), []).append((col, values))
+
+    rows = {}
+    for group in groups.values():
+        values = np.column_stack([v for _, v in group])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            white_p, bp_p, gq_p = _heteroskedasticity_pvalues(values)
+        for i, (col, _) in enumerate(group):
+            votes = [white_p[i] < alpha, bp_p[i] < alpha, gq_p[i] < alpha]
+            rows[col] = {
+                "White": votes[0],
+                "Breusch-Pagan": votes[1],
+                "Goldfeld-Quandt": votes[2],
+                "needs_transform": sum(votes) >= 2,
+            }
+
+    return pd.DataFrame.from_dict(rows, orient="index").reindex(df.columns)
 
-        series = df[col].copy()
-        processed_df[col] = processed_df[col].astype(float, errors="ignore")
 
-        non_null_series = series.dropna()
-        het_result = check_heteroskedasticity(non_null_series, alpha)
+def _fit_yeo_johnson(values):
+    return PowerTransformer(method="yeo-johnson").fit(values.reshape(-1, 1))
 
-        if het_result["needs_transform"]:
-            # Create mask for non-null values
-            mask = series.notna()
 
-            if (series[mask] > 0).all():
-                # Apply log transform to non-null values
-                processed_df.loc[mask, col] = np.log(series[mask])
-                if verbose:
+class HeteroskedasticityTransformer(BaseEstimator, TransformerMixin):
+    """
+    Log (strictly positive columns) or Yeo-Johnson transform of the heteroskedastic
+    columns found during fit.
+
+    The heteroskedasticity tests and the Yeo-Johnson lambdas are only estimated in fit,
+    transform and inverse_transform re-apply the stored parameters.
+
+    Attributes after fit:
+    - columns_ (list): Columns considered, i.e. all but the target and excluded ones.
+    - log_columns_ (list): Columns that get a log transform.
+    - power_transformers_ (dict): Fitted PowerTransformer per Yeo-Johnson column.
+    """
+
+    def __init__(
+        self,
+        target="logPriceChange",
+        variables_to_exclude=config.EXCLUDE_VARIABLES,
+        alpha=0.05,
+        verbose=False,
+        n_jobs=1,
+    ):
+        self.target = target
+        self.variables_to_exclude = variables_to_exclude
+        self.alpha = alpha
+        self.verbose = verbose
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y=None):
+        self.columns_ = [
+            col
+            for col in X.columns
+            if col != self.target and col not in self.variables_to_exclude
+        ]
+        het_results = check_heteroskedasticity_batch(X[self.columns_], self.alpha)
+
+        self.log_columns_ = []
+        yeo_johnson_columns = []
+        for col in self.columns_:
+            if not het_results.loc[col, "needs_transform"]:
+                continue
+            if (X[col].dropna() > 0).all():
+                self.log_columns_.append(col)
+                if self.verbose:
                     print(f"Applied log transform to {col}")
             else:
-                # Apply Yeo-Johnson to non-null values
-                pt = PowerTransformer(method="yeo-johnson")
-                transformed = pt.fit_transform(
-                    series[mask].values.reshape(-1, 1)
-                ).ravel()
-                processed_df.loc[mask, col] = transformed
-                if verbose:
-                    print(f"Applied Yeo-Johnson to {col}")
-
-    # Preserve target and excluded columns
-    processed_df[target] = df[target]
-    for col in variables_to_exclude:
-        if col in df.columns:
-            processed_df[col] = df[col]
-
-    return processed_df
+                yeo_johnson_columns.append(col)
+
+        # one independent Yeo-Johnson fit per column on its non-null values
+        values = [X[col].dropna().to_numpy(dtype=float) for col in yeo_johnson_columns]
+        if self.n_jobs > 1 and len(values) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                transformers = list(executor.map(_fit_yeo_johnson, values))
+        else:
+            transformers = [_fit_yeo_johnson(v) for v in values]
+        self.power_transformers_ = dict(zip(yeo_johnson_columns, transformers))
+
+        if self.verbose:
+            for col in yeo_johnson_columns:
+                print(f"Applied Yeo-Johnson to {col}")
+        return self
+
+    def _apply(self, X, log_func, power_method):
+        check_is_fitted(self, "power_transformers_")
+        processed_df = X.copy()
+        for col in self.columns_:
+            if col in processed_df.columns:
+                processed_df[col] = processed_df[col].astype(float, errors="ignore")
+
+        for col in self.log_columns_:
+            mask = X[col].notna()
+            processed_df.loc[mask, col] = log_func(X.loc[mask, col])
+
+        for col, pt in self.power_transformers_.items():
+            mask = X[col].notna()
+            values = X.loc[mask, col].to_numpy(dtype=float).reshape(-1, 1)
+            processed_df.loc[mask, col] = getattr(pt, power_method)(values).ravel()
+
+        return processed_df
+
+    def transform(self, X):
+        return self._apply(X, np.log, "transform")
+
+    def inverse_transform(self, X):
+        return self._apply(X, np.exp, "inverse_transform")
+
+
+def log_heteroskedastic_vars(
+    df,
+    target="logPriceChange",
+    variables_to_exclude=config.EXCLUDE_VARIABLES,
+    alpha=0.05,
+    verbose=False,
+    n_jobs=1,
+):
+    transformer = HeteroskedasticityTransformer(
+        target=target,
+        variables_to_exclude=variables_to_exclude,
+        alpha=alpha,
+        verbose=verbose,
+        n_jobs=n_jobs,
+    )
+    return transformer.fit_transform(df)
@@ -1,9 +1,18 @@
 import pandas as pd
 import numpy as np
+import hashlib
 import warnings
+
+from concurrent.futures import ProcessPoolExecutor
 from statsmodels.tsa.stattools import adfuller, kpss
 from statsmodels.tools.sm_exceptions import InterpolationWarning
 from arch.unitroot import PhillipsPerron
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+from src.preprocessing.transformations.batched_unit_root import stationarity_report
+
+ENGINES = ["statsmodels", "batched"]
 
 
 def adf_test(series, alpha):
@@ -38,15 +47,89 @@ def kpss_test(series, alpha):
     }
 
 
-def difference_non_stationary_features(
+# non-stationarity verdicts keyed by (hash of the cleaned column values, alpha)
+_verdict_cache = {}
+
+
+def clear_verdict_cache():
+    _verdict_cache.clear()
+
+
+def _verdict_key(values, alpha):
+    values = np.ascontiguousarray(values, dtype=float)
+    return hashlib.sha1(values.tobytes()).hexdigest(), alpha
+
+
+def is_non_stationary(series, alpha=0.05, early_exit=True):
+    """
+    Majority vote of the ADF, PP and KPSS tests.
+
+    KPSS and PP are run first. With early_exit the costly ADF search (autolag="AIC")
+    is skipped when they already agree, since the third vote can no longer change
+    the 2-of-3 outcome.
+    """
+    votes = [
+        not kpss_test(series, alpha)["Stationary"],
+        not pp_test(series, alpha)["Stationary"],
+    ]
+    if early_exit and votes[0] == votes[1]:
+        return votes[0]
+    votes.append(not adf_test(series, alpha)["Stationary"])
+    return sum(votes) >= 2
+
+
+def _is_non_stationary(args):
+    return is_non_stationary(*args)
+
+
+def non_stationary_verdicts(
+    columns, alpha=0.05, n_jobs=1, early_exit=True, use_cache=True
+):
+    """
+    Run is_non_stationary for several series, in parallel when n_jobs > 1.
+
+    Parameters:
+    - columns (list): Cleaned series (no NaNs) to test.
+    - alpha (float): Significance level.
+    - n_jobs (int): Number of worker processes.
+    - early_exit (bool): Skip ADF when KPSS and PP agree.
+    - use_cache (bool): Reuse verdicts of identical series tested before.
+
+    Returns:
+    - list: One bool per series, in input order.
+    """
+    keys = [_verdict_key(series, alpha) for series in columns]
+    verdicts = [_verdict_cache.get(key) if use_cache else None for key in keys]
+    pending = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    tasks = [(columns[i], alpha, early_exit) for i in pending]
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as executor:
+            results = list(executor.map(_is_non_stationary, tasks))
+    else:
+        results = [_is_non_stationary(task) for task in tasks]
+
+    for i, verdict in zip(pending, results):
+        verdicts[i] = bool(verdict)
+        if use_cache:
+            _verdict_cache[keys[i]] = verdicts[i]
+    return verdicts
+
+
+def find_non_stationary_columns(
     df,
     target="logPriceChange",
     variables_to_exclude=None,
     alpha=0.05,
     verbose=False,
+    n_jobs=1,
+    early_exit=True,
+    use_cache=True,
+    engine="statsmodels",
 ):
-    df
-    differenced_columns = []
+    """Numeric columns that fail the 2-of-3 stationarity vote, in column order"""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
 
     if variables_to_exclude is None:
         variables_to_exclude = []
@@ -56,6 +139,7 @@ def difference_non_stationary_features(
         c for c in numeric_cols if c not in variables_to_exclude and c != target
     ]
 
+    clean_columns = {}
     for col in cols_to_process:
         # Original series with potential NaNs
         original_series = df[col]
@@ -81,35 +165,143 @@ def difference_non_stationary_features(
                 print("Skipping - insufficient data after cleaning")
             continue
 
-        # check stationarity
-        tests = {
-            "ADF": adf_test(clean_series, alpha),
-            "PP": pp_test(clean_series, alpha),
-            "KPSS": kpss_test(clean_series, alpha),
-        }
-
-        non_stationary_votes = sum(
-            [
-                not tests["ADF"]["Stationary"],
-                not tests["PP"]["Stationary"],
-                not tests["KPSS"]["Stationary"],
-            ]
+        clean_columns[col] = clean_series
+
+    # check stationarity
+    if engine == "batched":
+        # constant and too-short columns are not in the report and are left as is
+        report = stationarity_report(pd.DataFrame(clean_columns), alpha=alpha)
+        verdicts = [
+            col in report.index and bool(report.loc[col, "Non-stationary"])
+            for col in clean_columns
+        ]
+    else:
+        verdicts = non_stationary_verdicts(
+            [series.to_numpy(dtype=float) for series in clean_columns.values()],
+            alpha=alpha,
+            n_jobs=n_jobs,
+            early_exit=early_exit,
+            use_cache=use_cache,
+        )
+
+    return [
+        col for col, non_stationary in zip(clean_columns, verdicts) if non_stationary
+    ]
+
+
+class StationarityTransformer(BaseEstimator, TransformerMixin):
+    """
+    First-differences the non-stationary columns found during fit.
+
+    The stationarity tests only run in fit. transform re-applies the stored decision,
+    so a model can be fitted once per training window and applied cheaply afterwards.
+    New rows that follow the fitted data are differenced against its last levels with
+    ``transform(new_rows, previous_levels=transformer.last_levels_)``, so no row is
+    lost, even a single new bar.
+
+    Attributes after fit:
+    - differenced_columns_ (list): Columns that are differenced.
+    - initial_levels_ (pd.Series): Level of each differenced column just before the first
+      row that transform keeps on the fitted data, used by inverse_transform.
+    - last_levels_ (pd.Series): Last (forward-filled) level of each differenced column
+      in the fitted data.
+    """
+
+    def __init__(
+        self,
+        target="logPriceChange",
+        variables_to_exclude=None,
+        alpha=0.05,
+        verbose=False,
+        n_jobs=1,
+        early_exit=True,
+        use_cache=True,
+        engine="statsmodels",
+    ):
+        self.target = target
+        self.variables_to_exclude = variables_to_exclude
+        self.alpha = alpha
+        self.verbose = verbose
+        self.n_jobs = n_jobs
+        self.early_exit = early_exit
+        self.use_cache = use_cache
+        self.engine = engine
+
+    def fit(self, X, y=None):
+        self.differenced_columns_ = find_non_stationary_columns(
+            X,
+            target=self.target,
+            variables_to_exclude=self.variables_to_exclude,
+            alpha=self.alpha,
+            verbose=self.verbose,
+            n_jobs=self.n_jobs,
+            early_exit=self.early_exit,
+            use_cache=self.use_cache,
+            engine=self.engine,
         )
 
-        if non_stationary_votes >= 2:
-            differenced = clean_series.diff()
+        levels = X[self.differenced_columns_].ffill()
+        kept = self.transform(X).index
+        position = X.index.get_loc(kept[0]) if len(kept) else 0
+        if position > 0:
+            self.initial_levels_ = levels.iloc[position - 1]
+        else:
+            self.initial_levels_ = pd.Series(np.nan, index=self.differenced_columns_)
+        self.last_levels_ = levels.iloc[-1] if len(levels) else self.initial_levels_
+        return self
 
-            # Preserve original index structure
-            df.loc[clean_series.index, col] = differenced
-            differenced_columns.append(col)
+    def transform(self, X, previous_levels=None):
+        """
+        First-difference the fitted columns and drop the rows where a difference is
+        undefined. Without ``previous_levels`` the first row has no difference and is
+        dropped; with them (e.g. ``last_levels_``) it is differenced against them.
+        NaNs in the other columns are kept.
+        """
+        check_is_fitted(self, "differenced_columns_")
+        X = X.copy()
+        for col in self.differenced_columns_:
+            values = X[col].to_numpy(dtype=float)
+            if previous_levels is not None:
+                values = np.concatenate([[previous_levels[col]], values])
+            differences = pd.Series(values).ffill().diff().to_numpy()
+            X[col] = differences[len(differences) - len(X) :]
+        return X.dropna(subset=self.differenced_columns_)
 
-    df = df.dropna()
+    def inverse_transform(self, X, initial_levels=None):
+        """
+        Cumulate the differences back to levels, starting from ``initial_levels``
+        (defaults to the levels preceding the fitted data). Rows must be contiguous.
+        """
+        check_is_fitted(self, "differenced_columns_")
+        if initial_levels is None:
+            initial_levels = self.initial_levels_
+        X = X.copy()
+        for col in self.differenced_columns_:
+            X[col] = initial_levels[col] + X[col].cumsum()
+        return X
 
-    if verbose:
-        print(f"\nColumn: {col}")
-        print(f"Original NaNs: {original_series.isna().sum()}")
-        print(f"NaNs filled by forward-fill: {n_filled}")
-        print(f"Leading NaNs dropped: {n_leading_dropped}")
-        print(f"Clean data points remaining: {len(clean_series)}")
 
-    return df, differenced_columns
+def difference_non_stationary_features(
+    df,
+    target="logPriceChange",
+    variables_to_exclude=None,
+    alpha=0.05,
+    verbose=False,
+    n_jobs=1,
+    early_exit=True,
+    use_cache=True,
+    engine="statsmodels",
+):
+    transformer = StationarityTransformer(
+        target=target,
+        variables_to_exclude=variables_to_exclude,
+        alpha=alpha,
+        verbose=verbose,
+        n_jobs=n_jobs,
+        early_exit=early_exit,
+        use_cache=use_cache,
+        engine=engine,
+    )
+    # rows with a NaN in any column are dropped, as this function always did
+    df = transformer.fit_transform(df).dropna()
+    return df, transformer.differenced_columns_
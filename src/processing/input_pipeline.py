@@ -0,0 +1,85 @@
+import numpy as np
+import tensorflow as tf
+
+from tensorflow.keras.utils import timeseries_dataset_from_array
+
+
+def _deterministic(dataset):
+    options = tf.data.Options()
+    options.deterministic = True
+    return dataset.with_options(options)
+
+
+def windowed_dataset(
+    features, target, seq_length=30, batch_size=None, dtype=np.float32
+):
+    """
+    tf.data pipeline of the same (window, label) pairs as create_sequences, built from
+    the scaled feature matrix without materializing the windows on the host.
+
+    Elements are cached after the first epoch in their original order, before batching,
+    so every batch size reuses the same cache.
+
+    Parameters:
+    - features (pd.DataFrame | np.ndarray): Scaled features ordered in time.
+    - target (pd.Series | np.ndarray): Target aligned with the features.
+    - seq_length (int): Window length.
+    - batch_size (int): Batch the dataset with batch_dataset, unbatched when None.
+    - dtype (np.dtype): dtype of the windows.
+
+    Returns:
+    - tf.data.Dataset: (seq_length x n_features, label) elements or batches.
+    """
+    values = np.asarray(features, dtype=dtype)
+    if values.ndim == 1:
+        values = values[:, None]
+    targets = np.asarray(target)[seq_length:]
+
+    # window i covers rows i..i+seq_length-1 and is labelled with row i+seq_length
+    dataset = timeseries_dataset_from_array(
+        values[:-1],
+        targets,
+        sequence_length=seq_length,
+        batch_size=None,
+        shuffle=False,
+    )
+    dataset = _deterministic(dataset.cache())
+
+    if batch_size is not None:
+        dataset = batch_dataset(dataset, batch_size)
+    return dataset
+
+
+def array_dataset(X, y, dtype=np.float32):
+    """Unbatched, cached tf.data pipeline over already materialized sequences"""
+    dataset = tf.data.Dataset.from_tensor_slices((np.asarray(X, dtype=dtype), y))
+    return _deterministic(dataset.cache())
+
+
+def batch_dataset(dataset, batch_size):
+    """Batch an unbatched pipeline in order and prefetch batches while training"""
+    return _deterministic(dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE))
+
+
+def is_batched(dataset):
+    # unbatched elements are single (seq_length x n_features) windows
+    return len(dataset.element_spec[0].shape) == 3
+
+
+def as_batched_dataset(X, y, batch_size):
+    """
+    Batched pipeline for model.fit from arrays or from a dataset.
+
+    Parameters:
+    - X (np.ndarray | tf.data.Dataset): Sequences, or a dataset of (window, label).
+    - y (np.ndarray): Labels, ignored when X is a dataset.
+    - batch_size (int): Batch size, ignored when the dataset is already batched.
+
+    Returns:
+    - tf.data.Dataset: Batched and prefetched dataset.
+    """
+    if not isinstance(X, tf.data.Dataset):
+        X = array_dataset(X, y)
+    if is_batched(X):
+        return X
+    return batch_dataset(X, batch_size)
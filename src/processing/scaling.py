@@ -1,6 +1,10 @@
+import json
+import numpy as np
 import pandas as pd
 
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
+from src.processing.splitting import time_based_positions, fold_arrays
 
 
 def scale_features(X_train, X_val, X_test):
@@ -12,3 +16,201 @@ def scale_features(X_train, X_val, X_test):
         pd.DataFrame(scaler.transform(X_test), X_test.index, X_test.columns),
         scaler,
     )
+
+
+def scale_in_place(values, fit_rows, scaler=None, chunk_size=1024):
+    """
+    Standardize a float array in place with statistics of some of its rows.
+
+    Parameters:
+    - values (np.ndarray): (n x f) float array, overwritten with the scaled values.
+    - fit_rows (slice): Rows the scaler is fitted on (if not fitted yet).
+    - scaler (StandardScaler): Fitted or new scaler.
+    - chunk_size (int): Rows processed at once, bounding temporary memory.
+
+    Returns:
+    - StandardScaler: The scaler.
+    """
+    if scaler is None:
+        scaler = StandardScaler()
+    if not hasattr(scaler, "mean_"):
+        fit_values = values[fit_rows]
+        for start in range(0, len(fit_values), chunk_size):
+            scaler.partial_fit(fit_values[start : start + chunk_size])
+
+    mean = scaler.mean_.astype(values.dtype)
+    scale = scaler.scale_.astype(values.dtype)
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start : start + chunk_size]
+        chunk -= mean
+        chunk /= scale
+    return scaler
+
+
+def split_and_scale(
+    df,
+    test_months=12,
+    val_months=3,
+    lags=30,
+    targets=["logPriceChange"],
+    dtype=np.float32,
+):
+    """
+    time_based_split followed by scale_features on one contiguous array.
+
+    The features are copied once into a (n x f) array of dtype, scaled in place with
+    statistics of the training rows, and the six sets are returned as views of it
+    (and of the target array) with the target shifted by one row within each set.
+
+    Parameters:
+    - df (pd.DataFrame): Features and targets with a sorted datetime index and no
+      missing values.
+    - test_months, val_months, lags, targets: As in time_based_split.
+    - dtype (np.dtype): dtype of the feature and target arrays.
+
+    Returns:
+    - tuple: X_train, y_train, X_val, y_val, X_test, y_test as arrays, the fitted
+      StandardScaler and a metadata dict with the "columns", "targets" and the
+      "index" of every set under "train", "val" and "test".
+    """
+    features = [col for col in df.columns if col not in targets]
+    values = np.empty((len(df), len(features)), dtype=dtype)
+    # column by column, so no wide float64 intermediate is created
+    for j, col in enumerate(features):
+        values[:, j] = df[col].to_numpy()
+        if np.isnan(values[:, j]).any():
+            raise ValueError(f"missing values in '{col}', use time_based_split")
+    target_values = df[targets].to_numpy(dtype=dtype)
+    if np.isnan(target_values).any():
+        raise ValueError("missing target values, use time_based_split")
+
+    train, val, test = time_based_positions(df.index, test_months, val_months, lags)
+    # fit on the training features, whose last row has no next-day target
+    scaler = scale_in_place(values, slice(train.start, train.stop - 1))
+
+    X_train, y_train, X_val, y_val = fold_arrays(values, target_values, train, val)
+    X_test, y_test, _, _ = fold_arrays(values, target_values, test, test)
+
+    index = pd.to_datetime(df.index)
+    meta = {
+        "columns": features,
+        "targets": list(targets),
+        "train": index[train.start : train.stop - 1],
+        "val": index[val.start : val.stop - 1],
+        "test": index[test.start : test.stop - 1],
+    }
+    return X_train, y_train, X_val, y_val, X_test, y_test, scaler, meta
+
+
+def _moments(X):
+    # row count, column means and sums of squared deviations of a batch
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[None, :]
+    mean = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+    return len(X), mean, ((X - mean) ** 2).sum(axis=0)
+
+
+class RollingScaler(BaseEstimator, TransformerMixin):
+    """
+    Standard scaler whose statistics are updated as rows enter and leave the window.
+
+    Keeps the row count, means and sums of squared deviations (merged batch-wise with
+    Chan's parallel form of Welford's update), so sliding a training window costs
+    O(new rows + old rows) instead of a refit. Scaling matches StandardScaler fitted
+    on the rows currently in the window.
+
+    Attributes after fit:
+    - n_samples_seen_ (int): Rows in the window.
+    - mean_, var_, scale_ (np.ndarray): As in StandardScaler.
+    """
+
+    def fit(self, X, y=None):
+        X = np.asarray(X, dtype=np.float64)
+        self.n_samples_seen_ = 0
+        self.mean_ = np.zeros(X.shape[-1])
+        self._m2 = np.zeros(X.shape[-1])
+        return self.add(X)
+
+    def partial_fit(self, X, y=None):
+        if not hasattr(self, "mean_"):
+            return self.fit(X)
+        return self.add(X)
+
+    def add(self, X):
+        """Add rows to the window"""
+        n_b, mean_b, m2_b = _moments(X)
+        n = self.n_samples_seen_ + n_b
+        if n_b:
+            delta = mean_b - self.mean_
+            self._m2 = self._m2 + m2_b + delta**2 * self.n_samples_seen_ * n_b / n
+            self.mean_ = self.mean_ + delta * n_b / n
+            self.n_samples_seen_ = n
+        return self._update_scale()
+
+    def remove(self, X):
+        """Remove rows that were added before from the window"""
+        n_b, mean_b, m2_b = _moments(X)
+        n = self.n_samples_seen_ - n_b
+        if n < 0:
+            raise ValueError("cannot remove more rows than the scaler has seen")
+        if n == 0:
+            self.mean_ = np.zeros_like(self.mean_)
+            self._m2 = np.zeros_like(self._m2)
+        elif n_b:
+            mean = (self.n_samples_seen_ * self.mean_ - n_b * mean_b) / n
+            delta = mean_b - mean
+            m2 = self._m2 - m2_b - delta**2 * n * n_b / self.n_samples_seen_
+            # rounding can leave tiny negative sums for constant columns
+            self._m2 = np.maximum(m2, 0.0)
+            self.mean_ = mean
+        self.n_samples_seen_ = n
+        return self._update_scale()
+
+    def slide(self, new_rows, old_rows):
+        """Move the window forward: add new_rows and remove old_rows"""
+        return self.add(new_rows).remove(old_rows)
+
+    def _update_scale(self):
+        self.var_ = self._m2 / max(self.n_samples_seen_, 1)
+        scale = np.sqrt(self.var_)
+        # constant columns are left unscaled, like StandardScaler
+        self.scale_ = np.where(scale < 10 * np.finfo(np.float64).eps, 1.0, scale)
+        return self
+
+    def transform(self, X):
+        scaled = (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+        if isinstance(X, pd.DataFrame):
+            return pd.DataFrame(scaled, X.index, X.columns)
+        return scaled
+
+    def inverse_transform(self, X):
+        values = np.asarray(X, dtype=np.float64) * self.scale_ + self.mean_
+        if isinstance(X, pd.DataFrame):
+            return pd.DataFrame(values, X.index, X.columns)
+        return values
+
+    def to_dict(self):
+        """JSON-serializable state, stored next to the model so inference never refits"""
+        return {
+            "n_samples_seen": int(self.n_samples_seen_),
+            "mean": self.mean_.tolist(),
+            "m2": self._m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        scaler = cls()
+        scaler.n_samples_seen_ = state["n_samples_seen"]
+        scaler.mean_ = np.array(state["mean"], dtype=np.float64)
+        scaler._m2 = np.array(state["m2"], dtype=np.float64)
+        return scaler._update_scale()
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
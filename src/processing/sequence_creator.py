@@ -1,13 +1,56 @@
 import numpy as np
 
+from numpy.lib.stride_tricks import sliding_window_view
 
-def create_sequences(features, target, seq_length=30):
-    X, y = [], []
-    for i in range(len(features) - seq_length):
 
-        seq = features.iloc[i : i + seq_length]
-        label = target.iloc[i + seq_length]
-        X.append(seq.values)
-        y.append(label)
+def sliding_windows(features, seq_length=30, dtype=None):
+    """
+    Read-only (n - seq_length, seq_length, n_features) view of every window of
+    ``seq_length`` consecutive rows that is followed by a label row.
 
-    return np.array(X), np.array(y)
+    Parameters:
+    - features (pd.DataFrame | np.ndarray): Rows ordered in time.
+    - seq_length (int): Window length.
+    - dtype (np.dtype): Convert the features once (e.g. np.float32) before windowing.
+
+    Returns:
+    - np.ndarray: Strided view sharing memory with the (converted) features.
+    """
+    values = np.asarray(features)
+    if dtype is not None:
+        values = values.astype(dtype, copy=False)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    n_windows = max(len(values) - seq_length, 0)
+    if n_windows == 0:
+        return np.empty((0, seq_length, values.shape[1]), dtype=values.dtype)
+
+    # (windows, n_features, seq_length) -> (windows, seq_length, n_features)
+    windows = sliding_window_view(values, seq_length, axis=0).transpose(0, 2, 1)
+    return windows[:n_windows]
+
+
+def create_sequences(features, target, seq_length=30, copy=False, dtype=None):
+    """
+    Windows of ``seq_length`` rows and the target value that follows each window.
+
+    Parameters:
+    - features (pd.DataFrame): Features ordered in time.
+    - target (pd.Series): Target aligned with the features.
+    - seq_length (int): Window length.
+    - copy (bool): Materialize the windows in a new array. By default a read-only
+      strided view is returned, which needs no extra memory; copy when the windows
+      are written to.
+    - dtype (np.dtype): Output dtype of X, e.g. np.float32.
+
+    Returns:
+    - np.ndarray: X of shape (n - seq_length, seq_length, n_features).
+    - np.ndarray: y of shape (n - seq_length,).
+    """
+    X = sliding_windows(features, seq_length, dtype=dtype)
+    y = np.asarray(target)[seq_length:]
+
+    if copy:
+        X = np.ascontiguousarray(X)
+    return X, y
@@ -0,0 +1,46 @@
+import math
+import numpy as np
+
+from tensorflow.keras.utils import PyDataset
+
+from src.processing.sequence_creator import create_sequences
+
+
+class SequenceDataset(PyDataset):
+    """
+    Keras dataset yielding (X, y) batches of windows, built lazily from a strided view
+    so only one batch of windows is materialized at a time.
+    """
+
+    def __init__(
+        self,
+        features,
+        target,
+        seq_length=30,
+        batch_size=32,
+        shuffle=False,
+        dtype=np.float32,
+        seed=None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.X, self.y = create_sequences(
+            features, target, seq_length, copy=False, dtype=dtype
+        )
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.indices = np.arange(len(self.y))
+        self.rng = np.random.default_rng(seed)
+        if shuffle:
+            self.rng.shuffle(self.indices)
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, idx):
+        batch = self.indices[idx * self.batch_size : (idx + 1) * self.batch_size]
+        return self.X[batch], self.y[batch]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
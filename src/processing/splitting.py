@@ -1,5 +1,19 @@
+import numpy as np
 import pandas as pd
 
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+
+def _split_boundaries(end_date, test_months, val_months, lags):
+    # date calculations
+    test_start = end_date - pd.DateOffset(months=test_months)
+    val_start = test_start - pd.DateOffset(months=val_months)
+    buffer = pd.DateOffset(days=lags)
+
+    # split boundaries: train <= train_end < val <= val_end < test
+    return val_start - buffer, test_start - buffer
+
 
 def time_based_split(
     df,
@@ -10,16 +24,9 @@ def time_based_split(
 ):
     # ensure the index is a datetime index
     df.index = pd.to_datetime(df.index)
-    end_date = df.index.max()
-
-    # date calculations
-    test_start = end_date - pd.DateOffset(months=test_months)
-    val_start = test_start - pd.DateOffset(months=val_months)
-    buffer = pd.DateOffset(days=lags)
-
-    # split boundaries
-    train_end = val_start - buffer
-    val_end = test_start - buffer
+    train_end, val_end = _split_boundaries(
+        df.index.max(), test_months, val_months, lags
+    )
 
     # separate data
     train = df[df.index <= train_end].copy()
@@ -48,3 +55,177 @@ def time_based_split(
         test[features],
         test[targets],
     )
+
+
+def time_based_positions(index, test_months=12, val_months=3, lags=30):
+    """
+    Row ranges of the time_based_split train, validation and test sets in a sorted
+    datetime index, before the target shift.
+
+    Returns:
+    - tuple: (train, val, test) slices covering all rows.
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(index))
+    train_end, val_end = _split_boundaries(index.max(), test_months, val_months, lags)
+    train_stop = index.searchsorted(train_end, side="right")
+    val_stop = index.searchsorted(val_end, side="right")
+    return (
+        slice(0, train_stop),
+        slice(train_stop, val_stop),
+        slice(val_stop, len(index)),
+    )
+
+
+def walk_forward_splits(
+    index,
+    n_folds=5,
+    val_months=3,
+    lags=30,
+    train_months=None,
+    step_months=None,
+):
+    """
+    Rolling-origin folds as positional ranges of a sorted datetime index.
+
+    Folds step forward by step_months (val_months by default), the last validation
+    window ending at the last date. As in time_based_split, training ends lags days
+    before the val_months window and validation starts right after it, so those lags
+    days are kept in validation as sequence warm-up: validation is
+    (train_end, fold_end] and its last val_months are the evaluated window.
+
+    Parameters:
+    - index (pd.Index): Sorted dates of the rows.
+    - n_folds (int): Number of folds.
+    - val_months (int): Length of each validation window.
+    - lags (int): Days of validation warm-up before each val_months window.
+    - train_months (int): Sliding training window length, expanding from the first
+      date when None.
+    - step_months (int): Distance between consecutive folds.
+
+    Yields:
+    - tuple: (train, val) slices of row positions, in chronological fold order.
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(index))
+    step_months = val_months if step_months is None else step_months
+    buffer = pd.DateOffset(days=lags)
+    end_date = index.max()
+
+    for k in range(n_folds - 1, -1, -1):
+        val_end = end_date - pd.DateOffset(months=step_months * k)
+        val_start = val_end - pd.DateOffset(months=val_months)
+        train_end = val_start - buffer
+
+        train_start = 0
+        if train_months is not None:
+            train_start = index.searchsorted(
+                train_end - pd.DateOffset(months=train_months), side="right"
+            )
+        train = slice(train_start, index.searchsorted(train_end, side="right"))
+        val = slice(train.stop, index.searchsorted(val_end, side="right"))
+
+        # a window needs two rows to hold one (features, next-day target) pair
+        if train.stop - train.start < 2 or val.stop - val.start < 2:
+            raise ValueError(f"not enough history for {n_folds} folds")
+        yield train, val
+
+
+def fold_arrays(features, targets, train, val):
+    """
+    Views of the fold windows with the target shifted by one row, as in time_based_split.
+
+    Parameters:
+    - features (np.ndarray): Feature matrix.
+    - targets (np.ndarray): Target matrix with the same rows.
+    - train, val (slice): Row ranges from walk_forward_splits.
+
+    Returns:
+    - tuple: (X_train, y_train, X_val, y_val), all sharing memory with the inputs.
+    """
+    arrays = []
+    for window in (train, val):
+        arrays.append(features[window.start : window.stop - 1])
+        arrays.append(targets[window.start + 1 : window.stop])
+    return tuple(arrays)
+
+
+# arrays attached to the shared memory block in fold worker processes
+_shared = {}
+
+
+def _attach_shared(name, layout):
+    block = shared_memory.SharedMemory(name=name)
+    _shared["block"] = block
+    offset = 0
+    for key, (shape, dtype) in layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        _shared[key] = array
+        offset += array.nbytes
+
+
+def _run_fold(args):
+    fold_fn, train, val = args
+    return fold_fn(*fold_arrays(_shared["features"], _shared["targets"], train, val))
+
+
+def run_walk_forward(
+    df,
+    fold_fn,
+    targets=["logPriceChange"],
+    n_jobs=1,
+    **split_params,
+):
+    """
+    Evaluate fold_fn on every walk-forward fold.
+
+    The features and targets are converted to one float matrix each. With n_jobs > 1
+    they are copied once into shared memory, and the worker processes slice their
+    folds from it without pickling or copying the data.
+
+    Parameters:
+    - df (pd.DataFrame): Features and targets with a sorted datetime index and no
+      missing values.
+    - fold_fn (callable): fold_fn(X_train, y_train, X_val, y_val) -> result, must be
+      picklable when n_jobs > 1 and must not modify its inputs.
+    - targets (list): Target columns.
+    - n_jobs (int): Number of worker processes.
+    - split_params: Arguments of walk_forward_splits.
+
+    Returns:
+    - list: fold_fn results in fold order.
+    """
+    features = [col for col in df.columns if col not in targets]
+    arrays = {
+        "features": df[features].to_numpy(dtype=float),
+        "targets": df[targets].to_numpy(dtype=float),
+    }
+    folds = list(walk_forward_splits(df.index, **split_params))
+
+    if n_jobs <= 1 or len(folds) < 2:
+        return [
+            fold_fn(*fold_arrays(arrays["features"], arrays["targets"], *fold))
+            for fold in folds
+        ]
+
+    layout = {key: (array.shape, array.dtype) for key, array in arrays.items()}
+    block = shared_memory.SharedMemory(
+        create=True, size=sum(array.nbytes for array in arrays.values())
+    )
+    try:
+        offset = 0
+        for array in arrays.values():
+            shared = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=block.buf, offset=offset
+            )
+            shared[:] = array
+            offset += array.nbytes
+            del shared
+
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_attach_shared,
+            initargs=(block.name, layout),
+        ) as executor:
+            return list(executor.map(_run_fold, [(fold_fn, *fold) for fold in folds]))
+    finally:
+        block.close()
+        block.unlink()
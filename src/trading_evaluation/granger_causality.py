@@ -1,10 +1,188 @@
 import pandas as pd
 import numpy as np
-import warnings
+import hashlib
 
-from statsmodels.tsa.stattools import grangercausalitytests
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
 from config import config
 
+# screening results keyed by (hash of the screened data, target, max_lag)
+_screen_cache = {}
+
+
+def clear_screen_cache():
+    _screen_cache.clear()
+
+
+def _lag_matrix(values, max_lag):
+    # column k - 1 holds the values lagged by k periods, zero where unavailable
+    n = len(values)
+    lags = np.zeros((n,) + values.shape[1:] + (max_lag,))
+    for k in range(1, max_lag + 1):
+        lags[k:, ..., k - 1] = values[: n - k]
+    return lags
+
+
+def _nested_ssr(augmented, sizes, max_lag):
+    """
+    SSR of the last column of ``augmented`` (k x n x m) on its first sizes[p - 1] columns,
+    using rows p..n-1, for every lag order p = 1..max_lag.
+
+    One QR over rows max_lag.. is computed, then rows max_lag - 1, ..., 1 are appended by
+    re-triangularizing [R; row]. For a column prefix of size s, the SSR is the sum of
+    squares of R[s:, -1], so every lag order is read off the same factor.
+    """
+    r = np.linalg.qr(augmented[:, max_lag:], mode="r")
+    ssr = np.empty((augmented.shape[0], max_lag))
+    for p in range(max_lag, 0, -1):
+        if p < max_lag:
+            r = np.linalg.qr(
+                np.concatenate([r, augmented[:, p : p + 1]], axis=1), mode="r"
+            )
+        ssr[:, p - 1] = (r[:, sizes[p - 1] :, -1] ** 2).sum(axis=1)
+    return ssr
+
+
+def restricted_ssr(y, max_lag):
+    """SSR of y on a constant and its own lags 1..p, on the sample grangercausalitytests uses for p"""
+    augmented = np.column_stack([np.ones(len(y)), _lag_matrix(y, max_lag), y])
+    sizes = 1 + np.arange(1, max_lag + 1)
+    return _nested_ssr(augmented[None], sizes, max_lag)[0]
+
+
+def granger_pvalue_curves(y, X, max_lag, ssr_own=None):
+    """
+    p-values of the ssr F-test of grangercausalitytests for every predictor and lag.
+
+    The unrestricted models of all lag orders are nested column prefixes of
+    [const, y_1, x_1, ..., y_max_lag, x_max_lag], so they share one QR per predictor
+    (batched over predictors) instead of one least-squares fit per lag.
+
+    Parameters:
+    - y (np.ndarray): Target values.
+    - X (np.ndarray): (n x k) predictor values.
+    - max_lag (int): Largest lag tested.
+    - ssr_own (np.ndarray): Precomputed restricted_ssr(y, max_lag), shared across predictors.
+
+    Returns:
+    - np.ndarray: (k x max_lag) p-values.
+    """
+    n, k = X.shape
+    ssr_own = restricted_ssr(y, max_lag) if ssr_own is None else ssr_own
+
+    augmented = np.empty((k, n, 2 * max_lag + 2))
+    augmented[:, :, 0] = 1.0
+    augmented[:, :, 1:-1:2] = _lag_matrix(y, max_lag)[None]
+    augmented[:, :, 2:-1:2] = np.moveaxis(_lag_matrix(X, max_lag), 1, 0)
+    augmented[:, :, -1] = y
+
+    lags = np.arange(1, max_lag + 1)
+    ssr_joint = _nested_ssr(augmented, 1 + 2 * lags, max_lag)
+    df_resid = n - lags - (1 + 2 * lags)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f_stat = (ssr_own - ssr_joint) / ssr_joint / lags * df_resid
+    return stats.f.sf(f_stat, lags, df_resid)
+
+
+def _screen_chunk(args):
+    try:
+        return granger_pvalue_curves(*args), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _data_hash(df):
+    return hashlib.sha1(
+        pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()
+        + str(list(df.columns)).encode()
+    ).hexdigest()
+
+
+def _screen(df, target, predictors, max_lag, n_jobs, chunk_size=16):
+    rows = {}
+    samples = {}
+
+    for predictor in predictors:
+        data = df[[target, predictor]].dropna()
+        n_obs = len(data)
+        rows[predictor] = {"p_value": np.nan, "lag": np.nan, "n_obs": n_obs}
+        # grangercausalitytests needs more than 3 * max_lag + 1 observations
+        if n_obs < max_lag * 2 or n_obs <= 3 * max_lag + 1:
+            rows[predictor]["status"] = "insufficient data"
+            continue
+        # predictors with the same sample share the target's restricted fits
+        samples.setdefault(tuple(data.index), []).append(predictor)
+
+    tasks, names = [], []
+    for index, group in samples.items():
+        data = df.loc[list(index), [target] + group]
+        y = data[target].to_numpy(dtype=float)
+        ssr_own = restricted_ssr(y, max_lag)
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i : i + chunk_size]
+            tasks.append((y, data[chunk].to_numpy(dtype=float), max_lag, ssr_own))
+            names.append(chunk)
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_screen_chunk, tasks))
+    else:
+        results = [_screen_chunk(task) for task in tasks]
+
+    for chunk, (curves, error) in zip(names, results):
+        for i, predictor in enumerate(chunk):
+            if error is not None:
+                rows[predictor]["status"] = f"error: {error}"
+                continue
+            rows[predictor].update(
+                p_value=np.min(curves[i]), lag=np.argmin(curves[i]) + 1, status="ok"
+            )
+
+    return pd.DataFrame.from_dict(
+        rows, orient="index", columns=["p_value", "lag", "n_obs", "status"]
+    )
+
+
+def granger_screen(
+    df: pd.DataFrame,
+    target: str,
+    variables_to_exclude: list[str] = config.EXCLUDE_VARIABLES,
+    max_lag: int = 30,
+    alpha: float = 0.05,
+    n_jobs: int = 1,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Granger causality screening of every predictor against the target.
+
+    Parameters:
+    - df (pd.DataFrame): Target and predictors.
+    - target (str): Column to predict.
+    - variables_to_exclude (list): Columns not screened.
+    - max_lag (int): Largest lag tested, the best lag is reported.
+    - alpha (float): Significance level.
+    - n_jobs (int): Number of worker processes, predictors are tested in parallel when > 1.
+    - use_cache (bool): Reuse results for identical data, target and max_lag.
+
+    Returns:
+    - pd.DataFrame: One row per predictor with the smallest ssr F-test "p_value", its
+      "lag", "n_obs", "status" ("ok", "insufficient data" or the error) and "significant".
+    """
+    exclude_vars = set(variables_to_exclude + [target])
+    predictors = [col for col in df.columns if col not in exclude_vars]
+    data = df[[target] + predictors]
+
+    key = (_data_hash(data), target, max_lag)
+    if use_cache and key in _screen_cache:
+        results = _screen_cache[key].copy()
+    else:
+        results = _screen(data, target, predictors, max_lag, n_jobs)
+        if use_cache:
+            _screen_cache[key] = results.copy()
+
+    results["significant"] = results["p_value"] < alpha
+    return results
+
 
 def granger_causality_tests(
     df: pd.DataFrame,
@@ -13,38 +191,31 @@ def granger_causality_tests(
     variables_to_exclude: list[str] = config.EXCLUDE_VARIABLES,
     max_lag: int = 30,
     alpha: float = 0.05,
+    n_jobs: int = 1,
 ):
-    exclude_vars = set(variables_to_exclude + [target])
-    predictors = [col for col in df.columns if col not in exclude_vars]
+    screen = granger_screen(
+        df,
+        target,
+        variables_to_exclude=variables_to_exclude,
+        max_lag=max_lag,
+        alpha=alpha,
+        n_jobs=n_jobs,
+    )
     results = {}
 
     print(f"\nGranger Causality Test for {crypto_symbol} '{target}'s")
     print("-" * 50)
 
-    for predictor in predictors:
-        data = df[[target, predictor]].dropna()
-        if len(data) < max_lag * 2:
+    for predictor, row in screen.iterrows():
+        if row["status"] == "insufficient data":
             print(f"Skipped {predictor}: insufficient data")
-            continue
-
-        try:
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=FutureWarning)
-
-                test_result = grangercausalitytests(data, maxlag=max_lag, verbose=False)
-                p_values = [
-                    test_result[lag][0]["ssr_ftest"][1] for lag in range(1, max_lag + 1)
-                ]
-                min_p = np.min(p_values)
-                opt_lag = np.argmin(p_values) + 1
-
-                if min_p < alpha:
-                    results[predictor] = {"p_value": min_p, "lag": opt_lag}
-                    print(f"✓ {predictor} (lag {opt_lag}, p={min_p:.2e})")
-                else:
-                    print(f"✗ {predictor} (best p={min_p:.2e})")
-        except Exception as e:
-            print(f"Error testing {predictor}: {str(e)[:50]}")
+        elif row["status"] != "ok":
+            print(f"Error testing {predictor}: {row['status'][7:57]}")
+        elif row["significant"]:
+            results[predictor] = {"p_value": row["p_value"], "lag": int(row["lag"])}
+            print(f"✓ {predictor} (lag {int(row['lag'])}, p={row['p_value']:.2e})")
+        else:
+            print(f"✗ {predictor} (best p={row['p_value']:.2e})")
 
     print("\nSignificant Predictors:")
     for pred, res in results.items():
@@ -1,7 +1,49 @@
+import inspect
+import multiprocessing
 import optuna
 
+from concurrent.futures import ProcessPoolExecutor
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+from tensorflow.keras.backend import clear_session
+from tensorflow.keras.callbacks import Callback
 
-def objective(trial, X_train, y_train, X_val, y_val, train_lstm):
+from src.training.lstm_training import clear_model_cache
+
+
+class PruningCallback(Callback):
+    """Report the monitored metric to the trial after every epoch and stop hopeless trials"""
+
+    def __init__(self, trial, monitor="val_loss"):
+        super().__init__()
+        self.trial = trial
+        self.monitor = monitor
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is None:
+            return
+        self.trial.report(float(value), step=epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(
+                f"trial pruned at epoch {epoch} with {self.monitor}={value:.4g}"
+            )
+
+
+def _accepted_kwargs(func, **kwargs):
+    # keyword arguments func takes, so a plain
+    # train_lstm(X_train, y_train, X_val, y_val, params) keeps working
+    parameters = inspect.signature(func).parameters
+    if any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        return kwargs
+    return {key: value for key, value in kwargs.items() if key in parameters}
+
+
+def objective(
+    trial, X_train, y_train, X_val, y_val, train_lstm, pruning=True, use_cache=True
+):
+    # X_train and X_val may be arrays or unbatched tf.data datasets (labels then None),
+    # cached datasets are shared by all trials and batched with the trial's batch size
     # LSTM layers
     num_lstm_layers = trial.suggest_int("num_lstm_layers", 2, 3)
     chosen_lstm_units = []
@@ -32,19 +74,116 @@ def objective(trial, X_train, y_train, X_val, y_val, train_lstm):
         "batch_size": batch_size,
     }
 
-    # train
-    model, history = train_lstm(X_train, y_train, X_val, y_val, params)
+    # train, reusing the compiled model of an already seen architecture; pruning and
+    # the model cache only apply when train_lstm takes callbacks and use_cache
+    kwargs = {}
+    if pruning:
+        kwargs["callbacks"] = [PruningCallback(trial)]
+    if use_cache:
+        kwargs["use_cache"] = True
+    try:
+        model, history = train_lstm(
+            X_train,
+            y_train,
+            X_val,
+            y_val,
+            params,
+            **_accepted_kwargs(train_lstm, **kwargs),
+        )
+    finally:
+        # drop the graphs and tensors of this trial so memory doesn't grow
+        clear_session(free_memory=True)
     val_loss = min(history.history["val_loss"])
 
+    timings = getattr(history, "timings", None)
+    if timings:
+        for phase, seconds in timings.items():
+            trial.set_user_attr(f"{phase}_seconds", seconds)
+        print(
+            f"Trial {trial.number}: tracing {timings['tracing']:.2f}s, "
+            f"training {timings['training']:.2f}s"
+        )
+
     return val_loss
 
 
-def tune_hyperparameters(X_train, y_train, X_val, y_val, train_lstm, n_trials=50):
-    study = optuna.create_study(direction="minimize")
-    study.optimize(
-        lambda trial: objective(trial, X_train, y_train, X_val, y_val, train_lstm),
-        n_trials=n_trials,
+def _optimize(study, data, train_lstm, n_trials):
+    # n_trials is the study total, so resumed studies only run the missing trials
+    try:
+        study.optimize(
+            lambda trial: objective(trial, *data, train_lstm),
+            n_trials=n_trials,
+            callbacks=[
+                MaxTrialsCallback(
+                    n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED)
+                )
+            ],
+        )
+    finally:
+        # the models cached by the trials are not needed once the study ends
+        clear_model_cache()
+
+
+def _tuning_worker(args):
+    storage, study_name, pruner, data, train_lstm, n_trials = args
+    study = optuna.load_study(study_name=study_name, storage=storage, pruner=pruner)
+    _optimize(study, data, train_lstm, n_trials)
+
+
+def tune_hyperparameters(
+    X_train,
+    y_train,
+    X_val,
+    y_val,
+    train_lstm,
+    n_trials=50,
+    storage=None,
+    study_name="lstm_tuning",
+    n_jobs=1,
+    pruner=None,
+):
+    """
+    Optuna search over the LSTM architecture and training hyperparameters.
+
+    Parameters:
+    - X_train, y_train, X_val, y_val: Training and validation data, see train_lstm.
+    - train_lstm (callable): Training function.
+    - n_trials (int): Total number of finished (complete or pruned) trials in the study.
+    - storage (str): RDB URL, e.g. "sqlite:///tuning.db". The study is resumed when it
+      already exists. In memory when None.
+    - study_name (str): Name of the study in the storage.
+    - n_jobs (int): Number of worker processes pulling trials from the storage.
+      Requires storage and array inputs when > 1.
+    - pruner (optuna.pruners.BasePruner): Pruner fed with the per-epoch val_loss,
+      MedianPruner by default.
+
+    Returns:
+    - optuna.Study: The study.
+    """
+    if n_jobs > 1 and storage is None:
+        raise ValueError("parallel tuning needs a storage shared by the workers")
+
+    if pruner is None:
+        pruner = optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=10)
+
+    study = optuna.create_study(
+        direction="minimize",
+        storage=storage,
+        study_name=study_name if storage is not None else None,
+        pruner=pruner,
+        load_if_exists=True,
     )
+    data = (X_train, y_train, X_val, y_val)
+
+    if n_jobs > 1:
+        # tensorflow is not fork-safe, workers start fresh interpreters
+        args = (storage, study.study_name, pruner, data, train_lstm, n_trials)
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            list(executor.map(_tuning_worker, [args] * n_jobs))
+    else:
+        _optimize(study, data, train_lstm, n_trials)
 
     print("Best trial:")
     best_trial = study.best_trial
@@ -1,27 +1,88 @@
+import time
+import numpy as np
+from collections import OrderedDict
 import tensorflow as tf
+from tensorflow.keras import initializers, ops, random
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Input, Layer
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.callbacks import Callback, EarlyStopping
 
+from src.processing.input_pipeline import as_batched_dataset
 
-def train_lstm(X_train, y_train, X_val, y_val, params):
+# compiled models and their initial weights keyed by layer shapes, least recently
+# used first; dropout and learning rate are set on the cached model
+MAX_CACHED_MODELS = 2
+_model_cache = OrderedDict()
 
+
+def clear_model_cache():
+    _model_cache.clear()
+    tf.keras.backend.clear_session(free_memory=True)
+
+
+class VariableDropout(Layer):
+    """
+    Dropout whose rate is a non-trainable variable, so a traced model can change it
+    without retracing. Only used by cached models, see get_model.
+    """
+
+    def __init__(self, rate, seed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.initial_rate = float(rate)
+        self.seed_generator = random.SeedGenerator(seed)
+
+    def build(self, input_shape):
+        self.rate = self.add_weight(
+            shape=(),
+            initializer=initializers.Constant(self.initial_rate),
+            trainable=False,
+            name="rate",
+        )
+
+    def call(self, inputs, training=False):
+        if not training:
+            return inputs
+        keep = 1.0 - ops.cast(self.rate, inputs.dtype)
+        mask = random.uniform(ops.shape(inputs), seed=self.seed_generator) < keep
+        return ops.where(mask, inputs / keep, ops.zeros_like(inputs))
+
+    def get_config(self):
+        return {**super().get_config(), "rate": self.initial_rate}
+
+
+def _architecture_key(input_shape, params):
+    # layer shapes only, the dropout rate is a variable of the cached model
+    return (
+        tuple(input_shape),
+        tuple(params["lstm_units"]),
+        tuple(params.get("dense_units", [])),
+    )
+
+
+def build_model(input_shape, params, variable_dropout=False):
+    """
+    Sequential LSTM regressor compiled with Adam on the mean squared error.
+
+    With variable_dropout, VariableDropout layers replace Dropout so the rate can be
+    changed after tracing; the default keeps plain Keras layers for saved models.
+    """
     lstm_units = params["lstm_units"]
     dense_units = params.get("dense_units", [])
     dropout_rate = params.get("dropout_rate", 0.2)
+    dropout = VariableDropout if variable_dropout else Dropout
 
     model = Sequential()
-    model.add(Input(shape=(X_train.shape[1], X_train.shape[2])))
+    model.add(Input(shape=input_shape))
 
     for i, units in enumerate(lstm_units):
         return_sequences = i < len(lstm_units) - 1
         model.add(LSTM(units, return_sequences=return_sequences))
-        model.add(Dropout(dropout_rate))
+        model.add(dropout(dropout_rate))
 
     for units in dense_units:
         model.add(Dense(units, activation="relu"))
-        model.add(Dropout(dropout_rate))
+        model.add(dropout(dropout_rate))
 
     model.add(Dense(1, activation="linear"))
 
@@ -30,16 +91,118 @@ def train_lstm(X_train, y_train, X_val, y_val, params):
         loss="mean_squared_error",
         metrics=["mae"],
     )
+    return model
+
+
+def get_model(input_shape, params, use_cache=False):
+    """
+    Compiled model for the architecture in params.
+
+    With use_cache, models are kept per layer shapes (input shape and layer units), up
+    to MAX_CACHED_MODELS least recently used, and built with VariableDropout. A cached
+    model gets its initial weights back, a zeroed optimizer state and the requested
+    dropout and learning rates instead of being rebuilt and recompiled, so trials that
+    only differ in those rates reuse its already traced train and test functions.
+
+    The cached model is shared: the next call with the same architecture resets the
+    weights of the model returned here. Copy its weights (or the model, with
+    tf.keras.models.clone_model) to keep them.
+    """
+    if not use_cache:
+        return build_model(input_shape, params)
+
+    key = _architecture_key(input_shape, params)
+    if key not in _model_cache:
+        model = build_model(input_shape, params, variable_dropout=True)
+        _model_cache[key] = (model, model.get_weights())
+        while len(_model_cache) > MAX_CACHED_MODELS:
+            _model_cache.popitem(last=False)
+        return model
+
+    _model_cache.move_to_end(key)
+    model, initial_weights = _model_cache[key]
+    model.set_weights(initial_weights)
+    for variable in model.optimizer.variables:
+        variable.assign(np.zeros(variable.shape, dtype=variable.dtype))
+    model.optimizer.learning_rate.assign(params.get("learning_rate", 0.001))
+    for layer in model.layers:
+        if isinstance(layer, VariableDropout):
+            layer.rate.assign(params.get("dropout_rate", 0.2))
+    return model
+
+
+class PhaseTimer(Callback):
+    """
+    Split the wall-clock time of fit into graph tracing and training.
+
+    The first train and validation steps include tracing of the step functions, their
+    excess over the median step time is counted as tracing.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.timings = {}
+        self._steps = {"train": [], "test": []}
+
+    def _begin(self, batch, logs=None):
+        self._start = time.perf_counter()
+
+    def _end(self, phase):
+        self._steps[phase].append(time.perf_counter() - self._start)
+
+    on_train_batch_begin = _begin
+    on_test_batch_begin = _begin
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._end("train")
+
+    def on_test_batch_end(self, batch, logs=None):
+        self._end("test")
+
+    def on_train_begin(self, logs=None):
+        self._fit_start = time.perf_counter()
+        self._steps = {"train": [], "test": []}
+
+    def on_train_end(self, logs=None):
+        tracing = 0.0
+        for steps in self._steps.values():
+            if len(steps) > 1:
+                tracing += max(steps[0] - np.median(steps[1:]), 0.0)
+            elif steps:
+                tracing += steps[0]
+        total = time.perf_counter() - self._fit_start
+        self.timings = {"tracing": tracing, "training": total - tracing}
+
+
+def train_lstm(X_train, y_train, X_val, y_val, params, callbacks=None, use_cache=False):
+    """
+    Build and train the LSTM regressor.
+
+    X_train and X_val are either sequence arrays with their labels, or tf.data datasets
+    of (window, label) from src.processing.input_pipeline, in which case y_train and
+    y_val are ignored. Unbatched inputs are batched with params["batch_size"], in order.
+    Extra Keras callbacks (e.g. Optuna pruning) run after EarlyStopping. With use_cache
+    the compiled model is reused across calls with the same architecture and is shared
+    with later calls, see get_model.
+
+    The returned history has a "timings" dict with the seconds spent tracing and training.
+    """
+    batch_size = params.get("batch_size", 32)
+    train_data = as_batched_dataset(X_train, y_train, batch_size)
+    val_data = as_batched_dataset(X_val, y_val, batch_size)
+
+    model = get_model(train_data.element_spec[0].shape[1:], params, use_cache)
 
+    timer = PhaseTimer()
     history = model.fit(
-        X_train,
-        y_train,
-        validation_data=(X_val, y_val),
+        train_data,
+        validation_data=val_data,
         epochs=params.get("epochs", 100),
-        batch_size=params.get("batch_size", 32),
-        callbacks=[EarlyStopping(patience=20, restore_best_weights=True)],
+        callbacks=[EarlyStopping(patience=20, restore_best_weights=True), timer]
+        + list(callbacks or []),
         shuffle=False,
         verbose=1,
     )
+    history.timings = timer.timings
 
     return model, history
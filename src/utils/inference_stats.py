@@ -0,0 +1,128 @@
+import time
+import numpy as np
+
+from typing import List, Optional
+
+PERCENTILES = [50, 90, 99]
+
+
+class InferenceStats:
+    """
+    Per-batch throughput of model inference.
+
+    Each recorded batch holds its rows, real (unpadded) tokens, padded tokens and
+    latency. summary() reports tokens per second, latency percentiles and padding
+    efficiency (share of the padded tokens that are real), serve_metrics() exposes the
+    same figures to Prometheus. Batches merged from parallel workers add up their
+    latencies, so rates are then per worker.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rows: List[int] = []
+        self.tokens: List[int] = []
+        self.padded_tokens: List[int] = []
+        self.seconds: List[float] = []
+        self.throttled_seconds = 0.0
+
+    def record(self, rows: int, tokens: int, padded_tokens: int, seconds: float):
+        self.rows.append(int(rows))
+        self.tokens.append(int(tokens))
+        self.padded_tokens.append(int(padded_tokens))
+        self.seconds.append(float(seconds))
+
+    def merge(self, other: "InferenceStats"):
+        """Add the batches of another instance, e.g. from a worker process"""
+        self.rows.extend(other.rows)
+        self.tokens.extend(other.tokens)
+        self.padded_tokens.extend(other.padded_tokens)
+        self.seconds.extend(other.seconds)
+        self.throttled_seconds += other.throttled_seconds
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+    def tokens_per_second(self) -> np.ndarray:
+        """Real tokens per second of every batch"""
+        return np.array(self.tokens) / np.maximum(np.array(self.seconds), 1e-9)
+
+    def summary(self) -> dict:
+        seconds = np.array(self.seconds)
+        total_seconds = float(seconds.sum())
+        tokens = sum(self.tokens)
+        padded = sum(self.padded_tokens)
+        summary = {
+            "batches": len(self),
+            "rows": sum(self.rows),
+            "tokens": tokens,
+            "seconds": total_seconds,
+            "throttled_seconds": self.throttled_seconds,
+            "tokens_per_second": tokens / total_seconds if total_seconds else 0.0,
+            "rows_per_second": sum(self.rows) / total_seconds if total_seconds else 0.0,
+            "padding_efficiency": tokens / padded if padded else 1.0,
+        }
+        for q in PERCENTILES:
+            summary[f"latency_p{q}"] = (
+                float(np.percentile(seconds, q)) if len(seconds) else 0.0
+            )
+        return summary
+
+    def format(self) -> str:
+        summary = self.summary()
+        return (
+            f"{summary['rows']} rows in {summary['seconds']:.1f}s, "
+            f"{summary['tokens_per_second']:.0f} tokens/s, "
+            f"p50 {summary['latency_p50'] * 1000:.0f}ms, "
+            f"p99 {summary['latency_p99'] * 1000:.0f}ms, "
+            f"padding efficiency {summary['padding_efficiency']:.0%}"
+        )
+
+
+class BatchTimer:
+    """Context manager recording one batch into an optional InferenceStats"""
+
+    def __init__(self, stats: Optional[InferenceStats], lengths: np.ndarray, rows: int):
+        self.stats = stats
+        self.lengths = lengths
+        self.rows = rows
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.stats is not None and exc[0] is None:
+            self.stats.record(
+                self.rows,
+                self.lengths.sum(),
+                len(self.lengths) * self.lengths.max(),
+                time.perf_counter() - self._start,
+            )
+        return False
+
+
+def serve_metrics(stats: InferenceStats, port: int = 8000, registry=None):
+    """
+    Expose the summary of stats as Prometheus gauges on an HTTP endpoint.
+
+    Values are read from stats at every scrape. Returns the registered collector.
+    """
+    from prometheus_client import REGISTRY, start_http_server
+    from prometheus_client.core import GaugeMetricFamily
+
+    class StatsCollector:
+        def collect(self):
+            for name, value in stats.summary().items():
+                yield GaugeMetricFamily(
+                    f"sentiment_inference_{name}",
+                    f"Zero-shot sentiment inference {name.replace('_', ' ')}",
+                    value=value,
+                )
+
+    registry = registry if registry is not None else REGISTRY
+    collector = StatsCollector()
+    registry.register(collector)
+    start_http_server(port, registry=registry)
+    return collector
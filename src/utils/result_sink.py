@@ -0,0 +1,218 @@
+import io
+import os
+import json
+import time
+import importlib.util
+import pandas as pd
+
+from pathlib import Path
+from typing import List, Optional
+
+FORMATS = ["csv", "jsonl", "parquet"]
+
+
+def _infer_format(path: Path) -> str:
+    suffix = path.suffix.lstrip(".").lower()
+    if suffix in ("json", "ndjson"):
+        return "jsonl"
+    if suffix == "pq":
+        return "parquet"
+    # no suffix: CSV, as the analyzer always wrote
+    return suffix or "csv"
+
+
+def _parquet_engine() -> str:
+    for engine in ("pyarrow", "fastparquet"):
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    raise ImportError(
+        "Parquet output needs pyarrow (pinned in requirements.txt) or fastparquet"
+    )
+
+
+def _fsync_directory(path: Path):
+    if os.name == "posix":
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class ResultSink:
+    """
+    Buffered writer of result rows to CSV, JSONL or Parquet.
+
+    Rows are kept in memory and written in a single append once flush_rows rows are
+    buffered or flush_seconds have passed since the last flush. CSV and JSONL go to one
+    file; Parquet goes to a directory with one part file per flush, renamed into place
+    once complete. After every flush the data is fsynced and a checkpoint (rows and
+    bytes written) is atomically replaced next to the output. On open, a file longer
+    than its checkpoint (a write interrupted by a crash) is truncated back to it, so
+    ``rows`` is always the number of complete rows on disk. A checkpoint longer than
+    its file is stale and ignored, the rows are then counted from the file.
+
+    Parameters:
+    - path (str): Output file, or directory for Parquet.
+    - columns (list): Columns written, in order (the CSV header).
+    - format (str): "csv", "jsonl" or "parquet", inferred from the suffix when None
+      (".json"/".ndjson" are JSONL, ".pq" is Parquet, no suffix is CSV).
+    - flush_rows (int): Buffered rows that trigger a flush.
+    - flush_seconds (float): Age of the last flush that triggers one at the next write.
+    - fsync (bool): fsync the output and checkpoint on every flush.
+    - float_format (str): Float format of CSV output.
+    """
+
+    def __init__(
+        self,
+        path,
+        columns: List[str],
+        format: Optional[str] = None,
+        flush_rows: int = 1024,
+        flush_seconds: float = 30.0,
+        fsync: bool = True,
+        float_format: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.format = format or _infer_format(self.path)
+        if self.format not in FORMATS:
+            raise ValueError(
+                f"Unknown format '{self.format}', expected one of {FORMATS}"
+            )
+        # checked before anything is scored, not at the first flush
+        self.engine = _parquet_engine() if self.format == "parquet" else None
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self.float_format = float_format
+        self.checkpoint_path = self.path.with_name(self.path.name + ".checkpoint")
+
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self._last_flush = time.monotonic()
+        # bytes written (CSV, JSONL) or part files (Parquet)
+        self.rows, self._offset = self._recover()
+
+    def _recover(self):
+        if self.format == "parquet":
+            self.path.mkdir(parents=True, exist_ok=True)
+            for part in self.path.glob("*.tmp"):
+                part.unlink()
+            parts = sorted(self.path.glob("part-*.parquet"))
+            rows = sum(len(pd.read_parquet(part, engine=self.engine)) for part in parts)
+            return rows, len(parts)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.checkpoint_path.exists() and self.path.exists():
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+            size = self.path.stat().st_size
+            if size >= checkpoint["bytes"]:
+                if size > checkpoint["bytes"]:
+                    with open(self.path, "ab") as f:
+                        f.truncate(checkpoint["bytes"])
+                return checkpoint["rows"], checkpoint["bytes"]
+            # the file was replaced or cut after the checkpoint, which is stale
+            print(f"Ignoring checkpoint {self.checkpoint_path}, longer than the file")
+            self.checkpoint_path.unlink()
+
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            # new file, starting with the CSV header
+            header = ",".join(self.columns) + "\n" if self.format == "csv" else ""
+            self.path.write_text(header)
+            return 0, len(header.encode())
+
+        # an existing file without checkpoint is taken as complete
+        rows = len(self.read())
+        return rows, self.path.stat().st_size
+
+    def write(self, df: pd.DataFrame):
+        """Buffer the rows of df (its columns in self.columns), flushing when due"""
+        self._buffer.append(df[self.columns])
+        self._buffered_rows += len(df)
+        if (
+            self._buffered_rows >= self.flush_rows
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def _encode(self, df: pd.DataFrame) -> bytes:
+        if self.format == "csv":
+            return df.to_csv(
+                header=False, index=False, float_format=self.float_format
+            ).encode()
+        return df.to_json(orient="records", lines=True, date_format="iso").encode()
+
+    def flush(self):
+        """Write the buffered rows in one append, then checkpoint"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        df = pd.concat(self._buffer, ignore_index=True)
+
+        if self.format == "parquet":
+            part = self.path / f"part-{self._offset:06d}.parquet"
+            tmp = part.with_suffix(".tmp")
+            df.to_parquet(tmp, engine=self.engine, index=False)
+            if self.fsync:
+                with open(tmp, "rb") as f:
+                    os.fsync(f.fileno())
+            os.replace(tmp, part)
+            if self.fsync:
+                _fsync_directory(self.path)
+            self._offset += 1
+        else:
+            data = self._encode(df)
+            if data and not data.endswith(b"\n"):
+                data += b"\n"
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._offset += len(data)
+
+        self.rows += len(df)
+        self._buffer.clear()
+        self._buffered_rows = 0
+        self._checkpoint()
+
+    def _checkpoint(self):
+        if self.format == "parquet":
+            # the part files are their own checkpoint
+            return
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"rows": self.rows, "bytes": self._offset}, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def read(self) -> pd.DataFrame:
+        """Rows flushed so far"""
+        if self.format == "csv":
+            return pd.read_csv(self.path)
+        if self.format == "jsonl":
+            with open(self.path, "rb") as f:
+                data = f.read()
+            if not data.strip():
+                return pd.DataFrame(columns=self.columns)
+            return pd.read_json(io.BytesIO(data), orient="records", lines=True)
+        parts = sorted(self.path.glob("part-*.parquet"))
+        if not parts:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(
+            [pd.read_parquet(part, engine=self.engine) for part in parts],
+            ignore_index=True,
+        )
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
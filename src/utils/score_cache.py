@@ -0,0 +1,137 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# SQLite limits the number of bound parameters per statement
+_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+class ScoreCache:
+    """
+    Persistent key-value store of model outputs in SQLite.
+
+    Keys hash the normalized text together with a namespace identifying the model and
+    its settings (model id, hypotheses, prompt...), so a change of model never returns
+    stale scores. Values are JSON (a float, or a list of probabilities). The least
+    recently used entries are evicted beyond max_entries. Hit and miss counts of this
+    instance are available from stats().
+
+    A connection must not be shared with forked processes, look up and store from the
+    parent only.
+    """
+
+    def __init__(self, path=":memory:", max_entries: Optional[int] = 1_000_000):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(self.path)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)"
+            )
+        # running number of entries, so eviction checks need no table scan; only
+        # approximate when several processes write the same file
+        self._entries = len(self)
+
+    @staticmethod
+    def namespace(*parts) -> str:
+        """Identifier of a model configuration, from JSON-serializable parts"""
+        return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def key(text: str, namespace: str) -> str:
+        digest = hashlib.sha256(f"{namespace}\x00{normalize_text(text)}".encode())
+        return digest.hexdigest()
+
+    def _select(self, columns: str, keys: List[str]) -> List[tuple]:
+        rows = []
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i : i + _CHUNK]
+            rows += self.conn.execute(
+                f"SELECT {columns} FROM scores WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+        return rows
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Cached values of the keys that are present, marking them as recently used"""
+        keys = list(dict.fromkeys(keys))
+        found = {
+            key: json.loads(value) for key, value in self._select("key, value", keys)
+        }
+
+        if found:
+            now = time.time_ns()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE scores SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, values: Dict[str, object]):
+        existing = len(self._select("key", list(values)))
+        now = time.time_ns()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO scores (key, value, last_used) VALUES (?, ?, ?)",
+                [(key, json.dumps(value), now) for key, value in values.items()],
+            )
+        self._entries += len(values) - existing
+        self._evict()
+
+    def put(self, key: str, value):
+        self.put_many({key: value})
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+        excess = self._entries - self.max_entries
+        if excess > 0:
+            with self.conn:
+                deleted = self.conn.execute(
+                    "DELETE FROM scores WHERE key IN "
+                    "(SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                ).rowcount
+            self._entries -= deleted
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM scores")
+        self.hits = self.misses = self._entries = 0
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,103 @@
+import os
+import time
+
+from typing import Optional
+
+
+class NoThrottle:
+    """No pauses between batches, for local inference"""
+
+    def wait(self, month_changed: bool) -> float:
+        return 0.0
+
+
+class FixedThrottle:
+    """
+    Fixed pause before a batch, when the month of the data changes (the previous
+    behaviour of the analyzer, 10 seconds) or before every batch.
+    """
+
+    def __init__(self, seconds: float = 10.0, every_batch: bool = False):
+        self.seconds = seconds
+        self.every_batch = every_batch
+
+    def wait(self, month_changed: bool) -> float:
+        if not (month_changed or self.every_batch):
+            return 0.0
+        time.sleep(self.seconds)
+        return self.seconds
+
+
+class AdaptiveThrottle:
+    """
+    Pause only while the machine is busy or hot, checked before every batch.
+
+    Parameters:
+    - max_load (float): Highest 1-minute load average per CPU to proceed with. The
+      analyzer's own inference keeps every core busy, so the load per CPU is about 1
+      from this process alone; the limit must stay clearly above 1 to only react to
+      other work on the machine.
+    - max_temperature (float): Highest CPU temperature in Celsius to proceed with, read
+      with psutil. Not checked when None or when the platform reports no sensors.
+    - poll_seconds (float): Pause between two checks.
+    - max_wait (float): Longest total pause before a batch, it then proceeds anyway.
+    """
+
+    def __init__(
+        self,
+        max_load: Optional[float] = 1.5,
+        max_temperature: Optional[float] = 85.0,
+        poll_seconds: float = 5.0,
+        max_wait: float = 60.0,
+    ):
+        self.max_load = max_load
+        self.max_temperature = max_temperature
+        self.poll_seconds = poll_seconds
+        self.max_wait = max_wait
+
+    def _load(self) -> Optional[float]:
+        if not hasattr(os, "getloadavg"):
+            return None
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+
+    def _temperature(self) -> Optional[float]:
+        import psutil
+
+        sensors = getattr(psutil, "sensors_temperatures", lambda: {})()
+        readings = [entry.current for entries in sensors.values() for entry in entries]
+        return max(readings) if readings else None
+
+    def _busy(self) -> bool:
+        if self.max_load is not None:
+            load = self._load()
+            if load is not None and load > self.max_load:
+                return True
+        if self.max_temperature is not None:
+            temperature = self._temperature()
+            if temperature is not None and temperature > self.max_temperature:
+                return True
+        return False
+
+    def wait(self, month_changed: bool) -> float:
+        waited = 0.0
+        while waited < self.max_wait and self._busy():
+            pause = min(self.poll_seconds, self.max_wait - waited)
+            time.sleep(pause)
+            waited += pause
+        return waited
+
+
+THROTTLES = {"none": NoThrottle, "fixed": FixedThrottle, "adaptive": AdaptiveThrottle}
+
+
+def get_throttle(throttle=None):
+    """Throttle policy from an instance, one of the THROTTLES names, or None (no pauses)"""
+    if throttle is None:
+        return NoThrottle()
+    if isinstance(throttle, str):
+        if throttle not in THROTTLES:
+            raise ValueError(
+                f"Unknown throttle '{throttle}', expected one of {list(THROTTLES)}"
+            )
+        return THROTTLES[throttle]()
+    return throttle
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 from unittest.mock import patch, MagicMock
 from src.llm.langchain_news_analyzer import CryptoNewsSentimentAnalyzer
+from src.utils.score_cache import ScoreCache
 
 
 @pytest.fixture
@@ -41,3 +42,35 @@ def test_analyze_articles_in_range(analyzer, sample_df):
     assert result.loc[0, "average_score"] == 8.0
     assert result.loc[1, "average_score"] == 5.0
     assert result.loc[2, "average_score"] == 3.0
+
+
+def test_classify_article_cache(tmp_path):
+    cache = ScoreCache()
+    analyzer = CryptoNewsSentimentAnalyzer(
+        output_file_path=str(tmp_path / "output.csv"), cache=cache
+    )
+    with patch.object(analyzer, "chain") as mock_chain:
+        mock_chain.invoke.side_effect = [Exception("timeout"), "7", "0"]
+        assert np.isnan(analyzer.classify_article("Title", "Subtitle"))
+        # failures are not cached
+        assert analyzer.classify_article("Title", "Subtitle") == 7.0
+        assert analyzer.classify_article("Title", " Subtitle ") == 7.0
+        assert np.isnan(analyzer.classify_article("Irrelevant", "Irrelevant"))
+        assert np.isnan(analyzer.classify_article("Irrelevant", "Irrelevant"))
+
+    assert mock_chain.invoke.call_count == 3
+    assert len(cache) == 2
+
+
+def test_classify_article_cache_keeps_fields_apart(tmp_path):
+    cache = ScoreCache()
+    analyzer = CryptoNewsSentimentAnalyzer(
+        output_file_path=str(tmp_path / "output.csv"), cache=cache
+    )
+    with patch.object(analyzer, "chain") as mock_chain:
+        mock_chain.invoke.side_effect = ["3", "8"]
+        assert analyzer.classify_article("A B", "") == 3.0
+        assert analyzer.classify_article("A", "B") == 8.0
+
+    assert mock_chain.invoke.call_count == 2
+    assert len(cache) == 2
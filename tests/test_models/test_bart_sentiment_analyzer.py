@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from src.models import bart_sentiment_analyzer
+from src.models.bart_sentiment_analyzer import UniversalSentimentAnalyzer
+from src.utils.score_cache import ScoreCache
+from tests.test_models.test_zero_shot_engine import (
+    HYPOTHESES,
+    make_texts,
+    model,
+    tokenizer,
+)
+
+
+@pytest.fixture(scope="module")
+def model_dir(model, tokenizer, tmp_path_factory):
+    path = tmp_path_factory.mktemp("model")
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+def make_analyzer(model_dir, output_path=None, cache=None):
+    return UniversalSentimentAnalyzer(
+        text_columns=["title", "selftext"],
+        hypotheses=HYPOTHESES,
+        batch_size=8,
+        model_name=model_dir,
+        output_path=output_path,
+        output_columns=["date", "title", "score"],
+        # every score is written, relevant or not
+        threshold=0.0,
+        cache=cache,
+    )
+
+
+def make_posts(n=30):
+    texts = make_texts(n, seed=3)
+    dates = pd.date_range("2023-01-01", periods=n, freq="D")
+    # shuffled input, the analyzer sorts by date
+    order = np.random.default_rng(0).permutation(n)
+    return pd.DataFrame(
+        {
+            "title": [texts[i] for i in order],
+            "selftext": [texts[::-1][i] for i in order],
+            "date": dates[order].strftime("%Y-%m-%d"),
+        }
+    )
+
+
+def test_sharded_matches_single_process(model_dir, tmp_path):
+    serial_path = tmp_path / "serial" / "scores.csv"
+    sharded_path = tmp_path / "sharded" / "scores.csv"
+
+    expected = make_analyzer(model_dir, str(serial_path)).analyze(
+        make_posts(), "2023-01-01", "2023-12-31"
+    )
+    result = make_analyzer(model_dir, str(sharded_path)).analyze_sharded(
+        make_posts(), "2023-01-01", "2023-12-31", n_workers=2, shards_per_worker=3
+    )
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert sharded_path.read_text() == serial_path.read_text()
+
+
+def test_shard_worker_loads_its_own_model(model_dir, monkeypatch):
+    analyzer = make_analyzer(model_dir)
+    texts = make_texts(5, seed=4)
+    monkeypatch.setattr(bart_sentiment_analyzer, "_shard_engine", None)
+    # the worker sets its thread budget process-wide
+    monkeypatch.setattr(torch, "set_num_threads", lambda n: None)
+
+    # what a spawned worker runs, from the analyzer's settings only
+    bart_sentiment_analyzer._init_shard_worker(
+        model_dir, "torch", None, HYPOTHESES, "cpu", analyzer.token_budget, 1
+    )
+    probs, stats = bart_sentiment_analyzer._predict_shard(texts)
+
+    assert bart_sentiment_analyzer._shard_engine.model is not analyzer.model
+    np.testing.assert_allclose(probs, analyzer.engine.predict(texts), atol=1e-6)
+    assert sum(stats.rows) == len(texts) * len(HYPOTHESES)
+
+
+def test_sharded_empty_range(model_dir):
+    result = make_analyzer(model_dir).analyze_sharded(
+        make_posts(), "2024-01-01", "2024-12-31"
+    )
+    assert result.empty
+
+
+def fail_predict(texts):
+    raise AssertionError(f"{len(texts)} texts scored again")
+
+
+def test_cached_rerun_skips_model(model_dir, tmp_path, monkeypatch):
+    path = tmp_path / "scores.sqlite"
+    posts = make_posts()
+
+    expected = make_analyzer(model_dir, cache=ScoreCache(path)).analyze(
+        posts, "2023-01-01", "2023-12-31"
+    )
+    cache = ScoreCache(path)
+    analyzer = make_analyzer(model_dir, cache=cache)
+    monkeypatch.setattr(analyzer.engine, "predict", fail_predict)
+    result = analyzer.analyze(posts, "2023-01-01", "2023-12-31")
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert cache.stats()["hit_rate"] == 1.0
+
+
+def test_cache_is_keyed_by_hypotheses(model_dir):
+    analyzer = make_analyzer(model_dir)
+    other = UniversalSentimentAnalyzer(
+        text_columns=["title"],
+        hypotheses=HYPOTHESES[::-1],
+        model_name=model_dir,
+    )
+
+    assert analyzer.cache_namespace != other.cache_namespace
+    assert analyzer._cache_key("text") != other._cache_key("text")
+
+
+def test_sharded_with_partial_cache(model_dir, tmp_path):
+    posts = make_posts()
+    # repeated texts across shards and a cache warmed on a third of the posts
+    posts = pd.concat([posts, posts.assign(date="2023-03-15")], ignore_index=True)
+    cache = ScoreCache()
+    make_analyzer(model_dir, cache=cache).analyze(
+        posts.iloc[:10], "2023-01-01", "2023-12-31"
+    )
+
+    expected = make_analyzer(model_dir).analyze(posts, "2023-01-01", "2023-12-31")
+    result = make_analyzer(model_dir, cache=cache).analyze_sharded(
+        posts, "2023-01-01", "2023-12-31", n_workers=2, shards_per_worker=3
+    )
+
+    pd.testing.assert_frame_equal(result, expected, atol=1e-6)
+    assert len(cache) == 30
+
+
+def test_no_pause_by_default(model_dir, monkeypatch):
+    monkeypatch.setattr("time.sleep", fail_predict)
+    analyzer = make_analyzer(model_dir)
+    analyzer.analyze(make_posts(), "2023-01-01", "2023-12-31")
+
+    summary = analyzer.stats.summary()
+    assert summary["rows"] == 30 * len(HYPOTHESES)
+    assert summary["throttled_seconds"] == 0.0
+
+
+def test_resume_after_crash(model_dir, tmp_path, monkeypatch):
+    expected_path = tmp_path / "expected" / "scores.csv"
+    path = tmp_path / "resumed" / "scores.csv"
+    expected = make_analyzer(model_dir, str(expected_path)).analyze(
+        make_posts(), "2023-01-01", "2023-12-31"
+    )
+
+    analyzer = make_analyzer(model_dir, str(path))
+    analyzer.sink.flush_rows = 16
+    calls = []
+    score = analyzer._score
+
+    def crash_on_fourth_batch(texts):
+        calls.append(len(texts))
+        if len(calls) == 4:
+            raise RuntimeError("killed")
+        return score(texts)
+
+    monkeypatch.setattr(analyzer, "_score", crash_on_fourth_batch)
+    with pytest.raises(RuntimeError):
+        analyzer.analyze(make_posts(), "2023-01-01", "2023-12-31")
+
+    resumed = make_analyzer(model_dir, str(path))
+    assert resumed.sink.rows == 24
+    result = resumed.analyze(make_posts(), "2023-01-01", "2023-12-31", resume=True)
+
+    pd.testing.assert_frame_equal(result, expected, atol=1e-6)
+    assert path.read_text() == expected_path.read_text()
+    assert sum(resumed.stats.rows) == 6 * len(HYPOTHESES)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from src.models.inference_backends import load_model, compare_backends
+from src.models.zero_shot_engine import ZeroShotEngine
+from tests.test_models.test_zero_shot_engine import (
+    HYPOTHESES,
+    make_texts,
+    model,
+    tokenizer,
+)
+
+
+@pytest.fixture(scope="module")
+def model_dir(model, tokenizer, tmp_path_factory):
+    path = tmp_path_factory.mktemp("model")
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+def test_int8_backend_is_cached(model_dir, tokenizer, tmp_path):
+    texts = make_texts(10)
+    fresh = load_model(model_dir, "int8", cache_dir=tmp_path)
+    assert (tmp_path / "model_int8.state_dict.pt").exists()
+    cached = load_model(model_dir, "int8", cache_dir=tmp_path)
+
+    np.testing.assert_array_equal(
+        ZeroShotEngine(cached, tokenizer, HYPOTHESES).predict(texts),
+        ZeroShotEngine(fresh, tokenizer, HYPOTHESES).predict(texts),
+    )
+
+
+def test_compare_backends_reports_drift(model_dir, tokenizer):
+    texts = make_texts(30)
+    engines = {
+        backend: ZeroShotEngine(load_model(model_dir, backend), tokenizer, HYPOTHESES)
+        for backend in ["torch", "int8"]
+    }
+
+    report = compare_backends(
+        engines, texts, score_fn=lambda bull, bear: (bull - bear + 1) * 4.5 + 1
+    )
+
+    assert list(report.index) == ["torch", "int8"]
+    assert report.loc["torch", "max_prob_drift"] == 0.0
+    assert report.loc["torch", "speedup"] == 1.0
+    assert 0.0 <= report.loc["int8", "max_prob_drift"] < 0.1
+    assert report.loc["int8", "relevance_agreement"] == 1.0
+
+
+def test_onnx_backend_matches_torch(model_dir, tokenizer, tmp_path):
+    pytest.importorskip("onnxruntime")
+    texts = make_texts(10)
+    reference = ZeroShotEngine(load_model(model_dir), tokenizer, HYPOTHESES)
+    onnx = ZeroShotEngine(
+        load_model(model_dir, "onnx", cache_dir=tmp_path), tokenizer, HYPOTHESES
+    )
+
+    np.testing.assert_allclose(onnx.predict(texts), reference.predict(texts), atol=1e-4)
+
+
+def test_unknown_backend(model_dir):
+    with pytest.raises(ValueError):
+        load_model(model_dir, "tensorrt")
+    with pytest.raises(ValueError):
+        load_model(model_dir, "onnx")
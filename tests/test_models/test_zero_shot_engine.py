@@ -0,0 +1,208 @@
+import inspect
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import (
+    BartConfig,
+    BartForSequenceClassification,
+    PreTrainedTokenizerFast,
+)
+from torch.nn.functional import softmax
+
+from src.models.zero_shot_engine import ZeroShotEngine, physical_cores
+from src.utils.inference_stats import InferenceStats
+from src.models.bart_sentiment_analyzer import UniversalSentimentAnalyzer
+
+HYPOTHESES = ["This text is bullish.", "This text is bearish."]
+WORDS = "bitcoin price goes up down today market crash rally this text is".split()
+
+
+def make_texts(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    # titles and long selftexts mixed
+    return [
+        " ".join(rng.choice(WORDS, size=rng.integers(1, 60))) + "." for _ in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    vocab = ["<s>", "<pad>", "</s>", "<unk>", "."] + sorted(
+        set(WORDS) | {"bullish", "bearish"}
+    )
+    backend = Tokenizer(
+        models.WordLevel({token: i for i, token in enumerate(vocab)}, "<unk>")
+    )
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    backend.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>",
+        pair="<s> $A </s> </s> $B </s>",
+        special_tokens=[("<s>", 0), ("</s>", 2)],
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        bos_token="<s>",
+        eos_token="</s>",
+        pad_token="<pad>",
+        unk_token="<unk>",
+    )
+
+
+@pytest.fixture(scope="module")
+def model(tokenizer):
+    torch.manual_seed(0)
+    config = BartConfig(
+        vocab_size=len(tokenizer),
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        max_position_embeddings=256,
+        num_labels=3,
+        pad_token_id=1,
+        bos_token_id=0,
+        eos_token_id=2,
+    )
+    return BartForSequenceClassification(config).eval()
+
+
+def naive_predict(model, tokenizer, texts):
+    # the previous implementation: every pair padded to the longest of the batch
+    pairs = [[text, hypothesis] for text in texts for hypothesis in HYPOTHESES]
+    inputs = tokenizer(pairs, padding=True, truncation=True, return_tensors="pt")
+    with torch.no_grad():
+        logits = model(**inputs).logits.view(len(texts), len(HYPOTHESES), -1)
+        return softmax(logits[..., [0, 2]], dim=-1)[..., 1].numpy()
+
+
+def test_matches_padded_batch(model, tokenizer):
+    texts = make_texts()
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES, token_budget=256)
+
+    np.testing.assert_allclose(
+        engine.predict(texts), naive_predict(model, tokenizer, texts), atol=1e-5
+    )
+
+
+def test_original_order(model, tokenizer):
+    texts = make_texts()
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES, token_budget=128)
+
+    forward = engine.predict(texts)
+    backward = engine.predict(texts[::-1])
+
+    np.testing.assert_allclose(backward, forward[::-1], atol=1e-6)
+
+
+def test_batches_respect_token_budget(model, tokenizer):
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES, token_budget=100)
+    lengths = np.array([3, 90, 40, 5, 200, 12, 41, 7])
+
+    batches = engine._batches(lengths)
+
+    assert sorted(np.concatenate(batches)) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) == 1 or len(batch) * lengths[batch].max() <= 100
+
+
+def test_empty_input(model, tokenizer):
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES)
+    assert engine.predict([]).shape == (0, 2)
+
+
+def test_analyzer_uses_engine(model, tokenizer, tmp_path):
+    model.save_pretrained(tmp_path)
+    tokenizer.save_pretrained(tmp_path)
+    analyzer = UniversalSentimentAnalyzer(
+        text_columns=["title", "selftext"],
+        hypotheses=HYPOTHESES,
+        batch_size=16,
+        model_name=str(tmp_path),
+        token_budget=256,
+    )
+    texts = make_texts(20)
+    df = pd.DataFrame(
+        {
+            "title": texts,
+            "selftext": texts[::-1],
+            "date": pd.date_range("2023-03-01", periods=20, freq="D"),
+        }
+    )
+
+    result = analyzer.analyze(df, "2023-03-01", "2023-03-20")
+
+    probs = naive_predict(model, tokenizer, analyzer._prepare_texts(df))
+    expected = analyzer._calculate_scores(probs[:, 0], probs[:, 1])
+    np.testing.assert_allclose(result["score"].to_numpy(), expected)
+
+
+class CountingEngine(ZeroShotEngine):
+    scored_rows = 0
+
+    def _forward(self, inputs):
+        self.scored_rows += len(inputs["input_ids"])
+        return super()._forward(inputs)
+
+
+def test_repeated_premises_are_scored_once(model, tokenizer):
+    texts = make_texts(10) * 3 + ["[removed]"] * 5
+    engine = CountingEngine(model, tokenizer, HYPOTHESES)
+    pairwise = CountingEngine(model, tokenizer, HYPOTHESES, deduplicate=False)
+
+    np.testing.assert_allclose(
+        engine.predict(texts), pairwise.predict(texts), atol=1e-6
+    )
+    assert engine.scored_rows == 11 * len(HYPOTHESES)
+    assert pairwise.scored_rows == len(texts) * len(HYPOTHESES)
+
+
+def test_records_batch_stats(model, tokenizer):
+    texts = make_texts()
+    stats = InferenceStats()
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES, token_budget=256, stats=stats)
+    engine.predict(texts)
+
+    # repeated texts are scored once
+    distinct = list(dict.fromkeys(texts))
+    lengths = np.array([len(ids) for ids in engine._encode(distinct)["input_ids"]])
+    assert len(stats) == len(engine._batches(lengths))
+    assert sum(stats.rows) == len(distinct) * len(HYPOTHESES)
+    assert sum(stats.tokens) == lengths.sum()
+    assert 0 < stats.summary()["padding_efficiency"] <= 1
+
+
+def test_threads_default_to_physical_cores(model, tokenizer):
+    assert ZeroShotEngine(model, tokenizer, HYPOTHESES).num_threads == physical_cores()
+    assert ZeroShotEngine(model, tokenizer, HYPOTHESES, num_threads=1).num_threads == 1
+
+
+def test_threads_are_scoped_to_scoring(model, tokenizer, monkeypatch):
+    previous = torch.get_num_threads()
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES, num_threads=1)
+    assert torch.get_num_threads() == previous
+
+    seen = []
+    forward = engine._forward
+    monkeypatch.setattr(
+        engine,
+        "_forward",
+        lambda inputs: seen.append(torch.get_num_threads()) or forward(inputs),
+    )
+    engine.predict(make_texts(4))
+
+    assert seen and set(seen) == {1}
+    assert torch.get_num_threads() == previous
+
+
+def test_default_step_is_packed(model, tokenizer):
+    # the pairs of a default analyzer step form several token-budgeted batches
+    batch_size = inspect.signature(UniversalSentimentAnalyzer).parameters["batch_size"]
+    lengths = np.full(batch_size.default * len(HYPOTHESES), 64)
+    engine = ZeroShotEngine(model, tokenizer, HYPOTHESES)
+    assert len(engine._batches(lengths)) > 1
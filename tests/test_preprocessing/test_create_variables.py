@@ -54,6 +54,11 @@ def test_create_local_extrema():
     assert df["localMin_2"].sum() > 0
     assert df["localMax_2"].sum() > 0
 
+    # flags match the per-window pandas rolling comparison
+    expected = (df["close"] == df["close"].rolling(3, min_periods=1).max()).astype(int)
+    assert df["localMax_3"].dtype == np.int8
+    assert (df["localMax_3"] == expected).all()
+
 
 def test_create_day_of_week_sin_cos():
     dates = pd.date_range(start="2023-10-01", periods=7, freq="D")
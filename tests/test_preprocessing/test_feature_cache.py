@@ -0,0 +1,111 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from src.preprocessing.feature_cache import FeatureCache
+
+
+def make_features(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "close": rng.normal(100, 1, n),
+            "volume": rng.uniform(1e6, 5e6, n),
+            "priceMovement": rng.integers(0, 2, n),
+            "localMin_7": rng.integers(0, 2, n).astype(np.int8),
+        },
+        index=pd.date_range(start="2023-01-01", periods=n, freq="D", name="date"),
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FeatureCache(cache_dir=tmp_path)
+
+
+def test_roundtrip(cache):
+    df = make_features()
+    df.attrs["differenced_columns"] = ["volume"]
+    cache.put("entry", df)
+
+    loaded = cache.get("entry")
+
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+    assert loaded.attrs["differenced_columns"] == ["volume"]
+    # copy-on-write maps can be modified without touching the cache
+    loaded.iloc[0, 0] = -1.0
+    assert cache.get("entry").iloc[0, 0] == df.iloc[0, 0]
+
+
+def test_key_depends_on_data_and_params():
+    df = make_features()
+    changed = df.copy()
+    changed.iloc[3, 0] += 1
+
+    assert FeatureCache.key(df, alpha=0.05) == FeatureCache.key(df.copy(), alpha=0.05)
+    assert FeatureCache.key(df, alpha=0.05) != FeatureCache.key(df, alpha=0.01)
+    assert FeatureCache.key(df, alpha=0.05) != FeatureCache.key(changed, alpha=0.05)
+
+
+def test_get_or_compute_calls_function_once(cache):
+    df = make_features()
+    calls = []
+
+    def double(frame, factor):
+        calls.append(factor)
+        return frame * factor
+
+    first = cache.get_or_compute(df, double, factor=2)
+    second = cache.get_or_compute(df, double, factor=2)
+
+    assert calls == [2]
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    df = make_features(n=1000)
+    cache = FeatureCache(cache_dir=tmp_path)
+    cache.put("a", df)
+    cache.max_bytes = 2.5 * cache.stats()["bytes"]
+
+    cache.put("b", df)
+    # touching "a" makes "b" the least recently used entry
+    cache.get("a")
+    cache.put("c", df)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_multiindex_is_rejected(cache):
+    df = make_features().set_index("priceMovement", append=True)
+
+    with pytest.raises(ValueError):
+        cache.put("entry", df)
+
+
+def test_columns_stay_memory_mapped(cache):
+    cache.put("entry", make_features())
+
+    loaded = cache.get("entry")
+    for name in loaded.columns:
+        base = loaded[name].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert base is not None, f"{name} was copied out of its map"
+
+
+def test_object_columns_are_rejected(cache, tmp_path):
+    df = make_features().assign(symbol="BTC")
+    with pytest.raises(ValueError, match="symbol"):
+        cache.put("entry", df)
+
+    df = make_features().reset_index(drop=True)
+    df.index = df.index.astype(str)
+    with pytest.raises(ValueError, match="index"):
+        cache.put("entry", df)
+
+    assert cache.stats()["entries"] == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,132 @@
+import pandas as pd
+import pandas_ta as ta
+import numpy as np
+import pytest
+
+from src.preprocessing import indicator_kernels
+from src.preprocessing.create_variables import create_variables
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(0)
+    n = 300
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = close * rng.uniform(0.005, 0.03, n)
+    return pd.DataFrame(
+        {
+            "open": close * (1 + rng.normal(0, 0.005, n)),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1e6, 5e6, n),
+        },
+        index=pd.date_range(start="2020-01-01", periods=n, freq="D"),
+    )
+
+
+def assert_matches(result, expected):
+    np.testing.assert_allclose(result, expected.to_numpy(float), rtol=1e-9, atol=1e-9)
+
+
+def test_ema(ohlcv):
+    assert_matches(
+        indicator_kernels.ema(ohlcv["close"], 12),
+        ohlcv.ta.ema(close="close", length=12),
+    )
+
+
+def test_kama(ohlcv):
+    assert_matches(indicator_kernels.kama(ohlcv["close"]), ohlcv.ta.kama())
+
+
+def test_nvi(ohlcv):
+    assert_matches(
+        indicator_kernels.nvi(ohlcv["close"], ohlcv["volume"]), ohlcv.ta.nvi()
+    )
+
+
+def test_ichimoku(ohlcv):
+    expected = ohlcv.ta.ichimoku(include_leading_span=False)[0]
+    span_a, span_b, tenkan_sen, kijun_sen = indicator_kernels.ichimoku(
+        ohlcv["high"], ohlcv["low"]
+    )
+
+    assert_matches(span_a, expected["ISA_9"])
+    assert_matches(span_b, expected["ISB_26"])
+    assert_matches(tenkan_sen, expected["ITS_9"])
+    assert_matches(kijun_sen, expected["IKS_26"])
+
+
+def test_massi(ohlcv):
+    assert_matches(
+        indicator_kernels.massi(ohlcv["high"], ohlcv["low"]), ohlcv.ta.massi()
+    )
+
+
+def test_kst(ohlcv):
+    assert_matches(
+        indicator_kernels.kst(ohlcv["close"]),
+        ohlcv.ta.kst()["KST_10_15_20_30_10_10_10_15"],
+    )
+
+
+def test_psar(ohlcv):
+    expected = ohlcv.ta.psar()
+    long, short = indicator_kernels.psar(ohlcv["high"], ohlcv["low"])
+
+    assert_matches(long, expected["PSARl_0.02_0.2"])
+    assert_matches(short, expected["PSARs_0.02_0.2"])
+
+
+def test_rolling_extrema():
+    close = pd.Series([3.0, 1.0, np.nan, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+    windows = [2, 3, 5]
+
+    mins, maxs = indicator_kernels.rolling_extrema(close, windows)
+
+    for window, local_min, local_max in zip(windows, mins, maxs):
+        rolling = close.rolling(window, min_periods=1)
+        np.testing.assert_array_equal(local_min, rolling.min())
+        np.testing.assert_array_equal(local_max, rolling.max())
+
+
+def test_rolling_extrema_nan_gaps_and_panels():
+    rng = np.random.default_rng(0)
+    close = rng.normal(size=(200, 3)).cumsum(axis=0)
+    # leading NaNs and a gap longer than the shortest window
+    close[:4, 0] = np.nan
+    close[50:60, 1] = np.nan
+    windows = [3, 7, 30]
+
+    mins, maxs = indicator_kernels.rolling_extrema(close, windows)
+
+    rolling_frame = pd.DataFrame(close)
+    for window, local_min, local_max in zip(windows, mins, maxs):
+        rolling = rolling_frame.rolling(window, min_periods=1)
+        np.testing.assert_array_equal(local_min, rolling.min())
+        np.testing.assert_array_equal(local_max, rolling.max())
+
+
+def test_kernels_accept_panels(ohlcv):
+    # columns of a (time x asset) array are computed independently
+    close = np.column_stack([ohlcv["close"], ohlcv["close"] * 2])
+
+    result = indicator_kernels.kama(close)
+
+    assert result.shape == close.shape
+    np.testing.assert_allclose(
+        result[:, 0], indicator_kernels.kama(ohlcv["close"]), equal_nan=True
+    )
+
+
+def test_create_variables_numba_backend(ohlcv):
+    expected = create_variables(ohlcv.copy())
+    result = create_variables(ohlcv.copy(), backend="numba")
+
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9)
+
+
+def test_unknown_backend(ohlcv):
+    with pytest.raises(ValueError):
+        create_variables(ohlcv.copy(), backend="talib")
@@ -0,0 +1,55 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from src.preprocessing.create_variables import create_variables
+from src.preprocessing.panel_variables import (
+    create_panel_variables,
+    panel_from_frames,
+)
+
+
+def make_ohlcv(n, seed, start="2020-01-01"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = close * rng.uniform(0.005, 0.03, n)
+    return pd.DataFrame(
+        {
+            "open": close * (1 + rng.normal(0, 0.005, n)),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1e6, 5e6, n),
+        },
+        index=pd.date_range(start=start, periods=n, freq="D", name="date"),
+    )
+
+
+@pytest.fixture
+def frames():
+    gappy = make_ohlcv(220, 3, start="2020-01-10")
+    gappy.iloc[100, gappy.columns.get_loc("volume")] = np.nan
+    return {
+        "BTC": make_ohlcv(250, 1),
+        "ETH": make_ohlcv(180, 2, start="2020-03-01"),
+        "SOL": gappy,
+    }
+
+
+def test_panel_matches_create_variables(frames):
+    result = create_panel_variables(panel_from_frames(frames))
+
+    for asset, df in frames.items():
+        expected = create_variables(df.copy())
+        pd.testing.assert_frame_equal(
+            result.xs(asset, level="asset"), expected, rtol=1e-9, check_freq=False
+        )
+
+
+def test_parallel_chunks_match_serial(frames):
+    panel = panel_from_frames(frames)
+
+    serial = create_panel_variables(panel)
+    parallel = create_panel_variables(panel, n_jobs=2, chunk_size=1)
+
+    pd.testing.assert_frame_equal(parallel, serial)
@@ -0,0 +1,86 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from src.preprocessing.create_variables import create_variables
+from src.preprocessing.streaming_variables import (
+    StreamingFeatureEngine,
+    _EWM,
+    _EMA,
+)
+
+
+def make_ohlcv(n=150, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = close * rng.uniform(0.005, 0.03, n)
+    df = pd.DataFrame(
+        {
+            "open": close * (1 + rng.normal(0, 0.005, n)),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1e6, 5e6, n),
+        },
+        index=pd.date_range(start="2023-01-01", periods=n, freq="D", name="date"),
+    )
+    return df
+
+
+def test_ewm_matches_pandas():
+    values = pd.Series([np.nan, 1.0, 2.0, np.nan, 4.0, 3.0, 5.0])
+
+    for adjust, min_periods in [(False, 0), (True, 3)]:
+        ewm = _EWM(alpha=0.3, adjust=adjust, min_periods=min_periods)
+        streamed = [ewm.update(value) for value in values]
+        expected = values.ewm(alpha=0.3, adjust=adjust, min_periods=min_periods).mean()
+        np.testing.assert_allclose(streamed, expected, equal_nan=True)
+
+
+def test_ema_uses_sma_seed():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    ema = _EMA(3)
+    streamed = [ema.update(value) for value in values]
+
+    assert np.isnan(streamed[0]) and np.isnan(streamed[1])
+    assert streamed[2] == pytest.approx(2.0)
+    assert streamed[3] == pytest.approx(0.5 * 2.0 + 0.5 * 4.0)
+
+
+def test_update_returns_batch_columns():
+    df = make_ohlcv()
+    engine = StreamingFeatureEngine.from_history(df.iloc[:100])
+    row = engine.update(df.iloc[100])
+
+    expected = create_variables(df.iloc[:101].copy())
+    assert list(row.columns) == list(expected.columns)
+    assert row.index[0] == df.index[100]
+    assert row["priceMovement"].dtype == expected["priceMovement"].dtype
+
+
+def test_streaming_matches_batch():
+    df = make_ohlcv()
+    engine = StreamingFeatureEngine.from_history(df.iloc[:100], verify=True)
+
+    # verification mode raises on any mismatch with create_variables
+    for i in range(100, len(df)):
+        row = engine.update(df.iloc[i])
+        assert row is not None
+
+
+def test_verification_detects_mismatch():
+    df = make_ohlcv()
+    engine = StreamingFeatureEngine.from_history(df.iloc[:100], verify=True)
+    engine._obv += 1e6
+
+    with pytest.raises(ValueError, match="OBV"):
+        engine.update(df.iloc[100])
+
+
+def test_rows_with_nan_are_dropped():
+    df = make_ohlcv()
+    engine = StreamingFeatureEngine.from_history(df.iloc[:100])
+    bar = df.iloc[100].copy()
+    bar["volume"] = np.nan
+
+    assert engine.update(bar) is None
@@ -0,0 +1,92 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.preprocessing.transformations.stationarity import (
+    adf_test,
+    pp_test,
+    kpss_test,
+    difference_non_stationary_features,
+)
+from src.preprocessing.transformations.batched_unit_root import (
+    adf_batch,
+    pp_batch,
+    kpss_batch,
+    stationarity_report,
+)
+
+
+class TestBatchedUnitRoot(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        noise = np.random.normal(0, 1, (300, 4))
+        self.x = np.column_stack(
+            [
+                noise[:, 0],
+                np.cumsum(noise[:, 1]),
+                np.cumsum(noise[:, 2]) * 0.1 + noise[:, 3],
+                # AR(2) so that the ADF lag search picks a non-zero lag
+                np.convolve(noise[:, 3], [1, 0.6, 0.3])[:300],
+            ]
+        )
+        self.df = pd.DataFrame(
+            self.x.copy(), columns=["stationary", "random_walk", "mixed", "ar"]
+        )
+        # shorter history for one column
+        self.df.loc[:49, "mixed"] = np.nan
+
+    def assert_matches(self, batched, single):
+        np.testing.assert_allclose(batched, single, rtol=1e-7)
+
+    def test_adf_matches_statsmodels(self):
+        stats, pvalues, _ = adf_batch(self.x)
+        for i in range(self.x.shape[1]):
+            expected = adf_test(self.x[:, i], 0.05)
+            self.assert_matches(stats[i], expected["Test Statistic"])
+            self.assert_matches(pvalues[i], expected["p-value"])
+
+    def test_pp_matches_arch(self):
+        stats, pvalues = pp_batch(self.x)
+        for i in range(self.x.shape[1]):
+            expected = pp_test(self.x[:, i], 0.05)
+            self.assert_matches(stats[i], expected["Test Statistic"])
+            self.assert_matches(pvalues[i], expected["p-value"])
+
+    def test_kpss_matches_statsmodels(self):
+        stats, pvalues, _ = kpss_batch(self.x)
+        for i in range(self.x.shape[1]):
+            expected = kpss_test(self.x[:, i], 0.05)
+            self.assert_matches(stats[i], expected["Test Statistic"])
+            self.assert_matches(pvalues[i], expected["p-value"])
+
+    def test_report_handles_different_lengths(self):
+        report = stationarity_report(self.df)
+
+        self.assertEqual(list(report.index), list(self.df.columns))
+        expected = adf_test(self.df["mixed"].dropna(), 0.05)
+        self.assert_matches(
+            report.loc["mixed", "ADF Test Statistic"], expected["Test Statistic"]
+        )
+        self.assertFalse(report.loc["random_walk", "ADF Stationary"])
+        self.assertTrue(report.loc["mixed", "Non-stationary"])
+        self.assertFalse(report.loc["stationary", "Non-stationary"])
+
+    def test_constant_columns_are_skipped(self):
+        df = self.df.assign(constant=1.0)
+        report = stationarity_report(df)
+        self.assertNotIn("constant", report.index)
+
+    def test_batched_engine_matches_statsmodels(self):
+        expected = difference_non_stationary_features(self.df.copy())
+        result = difference_non_stationary_features(self.df.copy(), engine="batched")
+
+        pd.testing.assert_frame_equal(result[0], expected[0])
+        self.assertEqual(result[1], expected[1])
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            difference_non_stationary_features(self.df.copy(), engine="numba")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,9 @@ import pandas as pd
 from sklearn.preprocessing import PowerTransformer
 from src.preprocessing.transformations.heteroskedasticity import (
     check_heteroskedasticity,
+    check_heteroskedasticity_batch,
     log_heteroskedastic_vars,
+    HeteroskedasticityTransformer,
 )
 
 
@@ -56,6 +58,52 @@ class TestHeteroskedasticityTransformations(unittest.TestCase):
         pd.testing.assert_series_equal(processed["target"], self.df["target"])
         pd.testing.assert_series_equal(processed["excluded"], self.df["excluded"])
 
+    def test_batch_matches_single_column_checks(self):
+        df = self.df.drop(columns=["target"])
+        df.loc[:9, "excluded"] = np.nan
+
+        results = check_heteroskedasticity_batch(df)
+
+        for col in df.columns:
+            expected = check_heteroskedasticity(df[col].dropna())
+            self.assertEqual(results.loc[col].to_dict(), expected)
+
+    def test_parallel_yeo_johnson_matches_serial(self):
+        df = self.df.assign(mixed_2=self.df["mixed"] * 3 - 1)
+        kwargs = dict(target="target", variables_to_exclude=["excluded"])
+
+        serial = log_heteroskedastic_vars(df, **kwargs)
+        parallel = log_heteroskedastic_vars(df, n_jobs=2, **kwargs)
+
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_transformer_stores_fitted_parameters(self):
+        kwargs = dict(target="target", variables_to_exclude=["excluded"])
+        transformer = HeteroskedasticityTransformer(**kwargs).fit(self.df)
+
+        self.assertIn("mixed", transformer.power_transformers_)
+        self.assertNotIn("no_transform", transformer.power_transformers_)
+        pd.testing.assert_frame_equal(
+            transformer.transform(self.df), log_heteroskedastic_vars(self.df, **kwargs)
+        )
+
+        # later data is transformed with the lambdas fitted above
+        new_data = self.df.iloc[50:]
+        pt = transformer.power_transformers_["mixed"]
+        np.testing.assert_allclose(
+            transformer.transform(new_data)["mixed"],
+            pt.transform(new_data[["mixed"]].to_numpy()).ravel(),
+        )
+
+    def test_transformer_inverse_transform(self):
+        transformer = HeteroskedasticityTransformer(
+            target="target", variables_to_exclude=["excluded"]
+        )
+        transformed = transformer.fit_transform(self.df)
+
+        restored = transformer.inverse_transform(transformed)
+        pd.testing.assert_frame_equal(restored, self.df)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,6 +7,12 @@ from src.preprocessing.transformations.stationarity import (
     pp_test,
     kpss_test,
     difference_non_stationary_features,
+    is_non_stationary,
+    non_stationary_verdicts,
+    clear_verdict_cache,
+    _verdict_cache,
+    _verdict_key,
+    StationarityTransformer,
 )
 
 
@@ -76,6 +82,96 @@ class TestStationarity(unittest.TestCase):
         self.assertEqual(len(diff_cols), 0)
         self.assertEqual(df_clean.shape[0], df.shape[0])
 
+    def test_early_exit_keeps_majority_vote(self):
+        for series in [
+            self.stationary_series,
+            self.non_stationary_series,
+            np.cumsum(self.stationary_series) * 0.05 + self.stationary_series,
+        ]:
+            self.assertEqual(
+                is_non_stationary(series, early_exit=True),
+                is_non_stationary(series, early_exit=False),
+            )
+
+    def test_verdicts_are_cached_by_values(self):
+        clear_verdict_cache()
+        # a planted verdict is returned instead of running the tests
+        _verdict_cache[_verdict_key(self.stationary_series, 0.05)] = True
+
+        verdicts = non_stationary_verdicts([self.stationary_series.copy()])
+        self.assertEqual(verdicts, [True])
+
+        clear_verdict_cache()
+        verdicts = non_stationary_verdicts([self.stationary_series])
+        self.assertEqual(verdicts, [False])
+        self.assertEqual(len(_verdict_cache), 1)
+
+    def test_parallel_matches_serial(self):
+        clear_verdict_cache()
+        serial = difference_non_stationary_features(self.test_df.copy(), n_jobs=1)
+        clear_verdict_cache()
+        parallel = difference_non_stationary_features(self.test_df.copy(), n_jobs=2)
+
+        pd.testing.assert_frame_equal(parallel[0], serial[0])
+        self.assertEqual(parallel[1], serial[1])
+
+    def test_transformer_reuses_fitted_decision(self):
+        transformer = StationarityTransformer().fit(self.test_df.iloc[:80])
+        self.assertEqual(
+            transformer.differenced_columns_, ["non_stationary", "with_nans"]
+        )
+
+        # new data is differenced with the stored decision, no tests are run
+        new_data = self.test_df.iloc[80:]
+        transformed = transformer.transform(new_data)
+        np.testing.assert_allclose(
+            transformed["non_stationary"], np.diff(new_data["non_stationary"])
+        )
+        np.testing.assert_allclose(
+            transformed["stationary"], new_data["stationary"].iloc[1:]
+        )
+
+    def test_transformer_single_new_row(self):
+        transformer = StationarityTransformer().fit(self.test_df.iloc[:80])
+
+        # one new bar is differenced against the last fitted levels
+        new_row = self.test_df.iloc[[80]]
+        transformed = transformer.transform(
+            new_row, previous_levels=transformer.last_levels_
+        )
+        self.assertEqual(len(transformed), 1)
+        self.assertAlmostEqual(
+            transformed["non_stationary"].iloc[0],
+            self.non_stationary_series[80] - self.non_stationary_series[79],
+        )
+        self.assertEqual(transformed["stationary"].iloc[0], self.stationary_series[80])
+
+        # consecutive rows give the same differences as transforming them together
+        rows = self.test_df.iloc[80:]
+        pd.testing.assert_frame_equal(
+            transformer.transform(rows, previous_levels=transformer.last_levels_),
+            transformer.transform(self.test_df).loc[rows.index],
+        )
+
+    def test_transform_keeps_nans_of_other_columns(self):
+        transformer = StationarityTransformer().fit(self.test_df)
+        df = self.test_df.copy()
+        df.loc[50, "stationary"] = np.nan
+
+        transformed = transformer.transform(df)
+        self.assertIn(50, transformed.index)
+        self.assertTrue(np.isnan(transformed.loc[50, "stationary"]))
+
+    def test_transformer_inverse_transform(self):
+        transformer = StationarityTransformer()
+        transformed = transformer.fit_transform(self.test_df)
+
+        restored = transformer.inverse_transform(transformed)
+        np.testing.assert_allclose(
+            restored["non_stationary"],
+            self.test_df.loc[transformed.index, "non_stationary"],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from src.processing.sequence_creator import create_sequences
+from src.processing.input_pipeline import (
+    windowed_dataset,
+    array_dataset,
+    as_batched_dataset,
+    is_batched,
+)
+
+
+class TestInputPipeline(unittest.TestCase):
+    def setUp(self):
+        self.features = pd.DataFrame(np.random.rand(40, 3))
+        self.target = pd.Series(np.random.rand(40))
+        self.X, self.y = create_sequences(
+            self.features, self.target, 5, dtype=np.float32
+        )
+
+    def collect(self, dataset):
+        batches = list(dataset.as_numpy_iterator())
+        return (
+            np.concatenate([X for X, _ in batches]),
+            np.concatenate([y for _, y in batches]),
+        )
+
+    def test_windows_match_create_sequences(self):
+        dataset = windowed_dataset(self.features, self.target, 5, batch_size=8)
+        X, y = self.collect(dataset)
+
+        np.testing.assert_array_equal(X, self.X)
+        np.testing.assert_array_equal(y, self.y)
+
+    def test_order_is_stable_across_epochs(self):
+        dataset = windowed_dataset(self.features, self.target, 5, batch_size=8)
+        first, _ = self.collect(dataset)
+        second, _ = self.collect(dataset)
+        np.testing.assert_array_equal(first, second)
+
+    def test_batching(self):
+        unbatched = windowed_dataset(self.features, self.target, 5)
+        self.assertFalse(is_batched(unbatched))
+
+        batched = as_batched_dataset(unbatched, None, 16)
+        self.assertTrue(is_batched(batched))
+        self.assertEqual([len(X) for X, _ in batched.as_numpy_iterator()], [16, 16, 3])
+        # already batched datasets are passed through
+        self.assertIs(as_batched_dataset(batched, None, 4), batched)
+
+    def test_array_dataset(self):
+        X, y = self.collect(as_batched_dataset(self.X, self.y, 10))
+        np.testing.assert_array_equal(X, self.X)
+        np.testing.assert_array_equal(y, self.y)
+        self.assertFalse(is_batched(array_dataset(self.X, self.y)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,16 @@
+import os
+import tempfile
 import unittest
+import numpy as np
 import pandas as pd
-from src.processing.scaling import scale_features
+from sklearn.preprocessing import StandardScaler
+from src.processing.scaling import (
+    scale_features,
+    scale_in_place,
+    split_and_scale,
+    RollingScaler,
+)
+from src.processing.splitting import time_based_split
 
 
 class TestScaleFeatures(unittest.TestCase):
@@ -26,3 +36,115 @@ class TestScaleFeatures(unittest.TestCase):
         self.assertEqual(X_train_scaled.shape, X_train.shape)
         self.assertEqual(X_val_scaled.shape, X_val.shape)
         self.assertEqual(X_test_scaled.shape, X_test.shape)
+
+
+class TestSplitAndScale(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        dates = pd.date_range(start="2020-01-01", periods=1000, freq="D")
+        self.df = pd.DataFrame(
+            {
+                "feature1": rng.normal(5, 2, 1000),
+                "feature2": rng.uniform(0, 100, 1000),
+                "logPriceChange": rng.normal(0, 0.01, 1000),
+            },
+            index=dates,
+        )
+
+    def test_matches_split_then_scale(self):
+        splits = time_based_split(self.df.copy())
+        expected = scale_features(splits[0], splits[2], splits[4])
+
+        result = split_and_scale(self.df)
+        X_train, y_train, X_val, y_val, X_test, y_test, scaler, meta = result
+
+        for X, X_expected in zip((X_train, X_val, X_test), expected[:3]):
+            self.assertEqual(X.dtype, np.float32)
+            np.testing.assert_allclose(X, X_expected.to_numpy(), atol=1e-5)
+        for y, y_expected in zip((y_train, y_val, y_test), splits[1::2]):
+            np.testing.assert_allclose(y, y_expected.to_numpy(), rtol=1e-6)
+        np.testing.assert_allclose(scaler.mean_, expected[3].mean_)
+
+        self.assertEqual(meta["columns"], ["feature1", "feature2"])
+        self.assertTrue(meta["train"].equals(splits[0].index))
+        self.assertTrue(meta["test"].equals(splits[4].index))
+
+    def test_sets_share_one_array(self):
+        X_train, _, X_val, _, X_test, *_ = split_and_scale(self.df)
+
+        # disjoint views of the same array
+        self.assertIsNotNone(X_train.base)
+        self.assertIs(X_val.base, X_train.base)
+        self.assertIs(X_test.base, X_train.base)
+
+    def test_missing_values_are_rejected(self):
+        self.df.iloc[10, 0] = np.nan
+        with self.assertRaises(ValueError):
+            split_and_scale(self.df)
+
+    def test_scale_in_place_with_fitted_scaler(self):
+        values = np.arange(20, dtype=np.float64).reshape(10, 2)
+        expected = StandardScaler().fit(values[:6]).transform(values)
+
+        scaler = scale_in_place(values, slice(0, 6), chunk_size=4)
+        np.testing.assert_allclose(values, expected)
+
+        again = np.arange(20, dtype=np.float64).reshape(10, 2)
+        scale_in_place(again, slice(0, 0), scaler=scaler)
+        np.testing.assert_allclose(again, expected)
+
+
+class TestRollingScaler(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.X = rng.normal(50, 10, (500, 3))
+        self.X[:, 2] = 7.0  # constant column
+
+    def assert_matches_standard(self, scaler, X):
+        expected = StandardScaler().fit(X)
+        np.testing.assert_allclose(scaler.mean_, expected.mean_)
+        np.testing.assert_allclose(scaler.var_, expected.var_, atol=1e-9)
+        np.testing.assert_allclose(scaler.transform(X), expected.transform(X))
+
+    def test_incremental_fit(self):
+        scaler = RollingScaler()
+        for start in range(0, 300, 70):
+            scaler.partial_fit(self.X[start : min(start + 70, 300)])
+
+        self.assertEqual(scaler.n_samples_seen_, 300)
+        self.assert_matches_standard(scaler, self.X[:300])
+
+    def test_sliding_window(self):
+        scaler = RollingScaler().fit(self.X[:200])
+        for start in range(0, 300, 25):
+            scaler.slide(self.X[start + 200 : start + 225], self.X[start : start + 25])
+            self.assert_matches_standard(scaler, self.X[start + 25 : start + 225])
+
+    def test_remove_everything(self):
+        scaler = RollingScaler().fit(self.X[:10])
+        scaler.remove(self.X[:10])
+        self.assertEqual(scaler.n_samples_seen_, 0)
+        with self.assertRaises(ValueError):
+            scaler.remove(self.X[:1])
+
+    def test_serialization(self):
+        scaler = RollingScaler().fit(self.X)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "scaler.json")
+            scaler.save(path)
+            loaded = RollingScaler.load(path)
+
+        np.testing.assert_array_equal(
+            loaded.transform(self.X), scaler.transform(self.X)
+        )
+        # the loaded scaler keeps sliding
+        loaded.slide(self.X[:5], self.X[:5])
+        self.assert_matches_standard(loaded, self.X)
+
+    def test_dataframe_roundtrip(self):
+        df = pd.DataFrame(self.X, columns=["a", "b", "c"])
+        scaler = RollingScaler().fit(df)
+        scaled = scaler.transform(df)
+
+        self.assertIsInstance(scaled, pd.DataFrame)
+        pd.testing.assert_frame_equal(scaler.inverse_transform(scaled), df)
@@ -1,6 +1,9 @@
 import unittest
 import pandas as pd
 import numpy as np
+import os
+import subprocess
+import sys
 from src.processing.sequence_creator import create_sequences
 
 
@@ -26,3 +29,44 @@ class TestCreateSequences(unittest.TestCase):
         # check if the last sequence and label are correct
         self.assertTrue(np.array_equal(X[-1], np.array([[7], [8], [9]])))
         self.assertEqual(y[-1], 100)
+
+    def test_view_matches_copy(self):
+        features = pd.DataFrame(np.arange(40, dtype=float).reshape(20, 2))
+        target = pd.Series(np.arange(20))
+
+        X_copy, y_copy = create_sequences(features, target, 5, copy=True)
+        X_view, y_view = create_sequences(features, target, 5)
+
+        np.testing.assert_array_equal(X_view, X_copy)
+        np.testing.assert_array_equal(y_view, y_copy)
+        # the default view shares memory with the features and cannot be written to
+        self.assertFalse(X_view.flags.writeable)
+        self.assertTrue(X_copy.flags.writeable)
+        self.assertFalse(np.shares_memory(X_view, X_copy))
+        self.assertTrue(np.shares_memory(X_view, features.to_numpy()))
+
+    def test_float32_output(self):
+        features = pd.DataFrame({"feature1": np.arange(10, dtype=float)})
+        X, _ = create_sequences(features, pd.Series(np.arange(10)), 3, dtype=np.float32)
+        self.assertEqual(X.dtype, np.float32)
+
+    def test_too_short_input(self):
+        features = pd.DataFrame({"feature1": [1.0, 2.0]})
+        X, y = create_sequences(features, pd.Series([1, 2]), 3)
+        self.assertEqual(X.shape, (0, 3, 1))
+        self.assertEqual(y.shape, (0,))
+
+    def test_import_does_not_load_tensorflow(self):
+        code = (
+            "import sys, src.processing.sequence_creator; "
+            "print('tensorflow' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            # repository root, where src is importable
+            cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        )
+        self.assertEqual(result.stdout.strip(), "False")
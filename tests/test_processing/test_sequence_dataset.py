@@ -0,0 +1,26 @@
+import unittest
+import pandas as pd
+import numpy as np
+from src.processing.sequence_creator import create_sequences
+from src.processing.sequence_dataset import SequenceDataset
+
+
+class TestSequenceDataset(unittest.TestCase):
+    def test_sequence_dataset_batches(self):
+        features = pd.DataFrame(np.random.rand(50, 3))
+        target = pd.Series(np.random.rand(50))
+        X, y = create_sequences(features, target, 10, dtype=np.float32)
+
+        dataset = SequenceDataset(features, target, seq_length=10, batch_size=16)
+
+        self.assertEqual(len(dataset), 3)
+        X_batches, y_batches = zip(*(dataset[i] for i in range(len(dataset))))
+        np.testing.assert_array_equal(np.concatenate(X_batches), X)
+        np.testing.assert_array_equal(np.concatenate(y_batches), y)
+
+        shuffled = SequenceDataset(features, target, 10, shuffle=True, seed=0)
+        self.assertEqual(sorted(shuffled.indices), list(range(len(y))))
+
+
+if __name__ == "__main__":
+    unittest.main()
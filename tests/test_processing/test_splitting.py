@@ -1,5 +1,13 @@
+import numpy as np
 import pandas as pd
-from src.processing.splitting import time_based_split
+import pytest
+from src.processing.splitting import (
+    time_based_split,
+    time_based_positions,
+    walk_forward_splits,
+    fold_arrays,
+    run_walk_forward,
+)
 
 
 # helper functions to get min/max dates
@@ -87,3 +95,112 @@ def test_time_based_split():
         y_test["localMin_7"].iloc[0]
         == df["localMin_7"].loc[X_test.index[0] + pd.DateOffset(days=1)]
     ), "test localMin_7 shift mismatch"
+
+
+def make_frame(n=1000):
+    dates = pd.date_range(start="2020-01-01", periods=n, freq="D")
+    return pd.DataFrame(
+        {
+            "feature1": np.arange(n, dtype=float),
+            "feature2": np.arange(n, 2 * n, dtype=float),
+            "logPriceChange": np.arange(2 * n, 3 * n, dtype=float),
+        },
+        index=dates,
+    )
+
+
+def fold_summary(X_train, y_train, X_val, y_val):
+    return X_train[0, 0], X_train[-1, 0], y_train[-1, 0], X_val[0, 0], len(X_val)
+
+
+@pytest.mark.parametrize("train_months", [None, 12])
+def test_walk_forward_splits(train_months):
+    df = make_frame()
+    folds = list(
+        walk_forward_splits(
+            df.index, n_folds=4, val_months=3, lags=30, train_months=train_months
+        )
+    )
+
+    assert len(folds) == 4
+    assert folds[-1][1].stop == len(df)
+    for k, (train, val) in enumerate(folds):
+        # validation starts right after training, with lags days of warm-up
+        assert val.start == train.stop
+        if k:
+            # evaluated windows follow each other, warm-ups overlap the previous fold
+            warmup = df.index[folds[k - 1][1].stop] - df.index[val.start]
+            assert pd.Timedelta(days=29) <= warmup <= pd.Timedelta(days=30)
+        if train_months is None:
+            assert train.start == 0
+        else:
+            span = df.index[train.stop - 1] - df.index[train.start]
+            assert span <= pd.Timedelta(days=366)
+
+
+def test_last_fold_matches_time_based_split_training():
+    df = make_frame()
+    X_train, y_train, *_ = time_based_split(
+        df.copy(), test_months=0, val_months=3, lags=30
+    )
+    train, val = list(walk_forward_splits(df.index, n_folds=1))[0]
+
+    X, y, _, _ = fold_arrays(
+        df[["feature1", "feature2"]].to_numpy(),
+        df[["logPriceChange"]].to_numpy(),
+        train,
+        val,
+    )
+
+    np.testing.assert_array_equal(X, X_train.to_numpy())
+    np.testing.assert_array_equal(y, y_train.to_numpy())
+
+
+@pytest.mark.parametrize("n_folds", [1, 3])
+def test_folds_match_time_based_positions(n_folds):
+    df = make_frame()
+    folds = list(walk_forward_splits(df.index, n_folds=n_folds, val_months=3, lags=30))
+
+    for k, (train, val) in enumerate(folds[::-1]):
+        # fold k back from the end is time_based_split with k steps as test period,
+        # its validation also taking the lags days that warm up the test set
+        tb_train, tb_val, tb_test = time_based_positions(
+            df.index, test_months=3 * k, val_months=3, lags=30
+        )
+        assert train == tb_train
+        assert val.start == tb_val.start
+        fold_end = df.index.max() - pd.DateOffset(months=3 * k)
+        assert val.stop == df.index.searchsorted(fold_end, side="right")
+        warmup = df.index[val.stop - 1] - df.index[tb_val.stop - 1]
+        assert warmup == pd.Timedelta(days=30)
+
+
+def test_fold_arrays_are_views():
+    features = np.arange(20.0).reshape(10, 2)
+    targets = np.arange(10.0)[:, None]
+
+    X_train, y_train, X_val, y_val = fold_arrays(
+        features, targets, slice(0, 5), slice(6, 10)
+    )
+
+    assert all(
+        np.shares_memory(a, b)
+        for a, b in [(X_train, features), (y_train, targets), (X_val, features)]
+    )
+    assert y_train[0, 0] == 1 and y_val[-1, 0] == 9
+    assert len(X_val) == len(y_val) == 3
+
+
+def test_too_many_folds():
+    with pytest.raises(ValueError):
+        list(walk_forward_splits(make_frame(200).index, n_folds=10))
+
+
+def test_parallel_folds_match_serial():
+    df = make_frame()
+
+    serial = run_walk_forward(df, fold_summary, n_folds=3)
+    parallel = run_walk_forward(df, fold_summary, n_folds=3, n_jobs=2)
+
+    assert serial == parallel
+    assert len(serial) == 3
@@ -1,6 +1,14 @@
 import pandas as pd
 import numpy as np
-from src.trading_evaluation.granger_causality import granger_causality_tests
+from statsmodels.tsa.stattools import grangercausalitytests
+
+from src.trading_evaluation import granger_causality
+from src.trading_evaluation.granger_causality import (
+    granger_causality_tests,
+    granger_screen,
+    clear_screen_cache,
+    granger_pvalue_curves,
+)
 
 
 def test_output_is_dict():
@@ -39,3 +47,64 @@ def test_insufficient_data_returns_empty():
 
     # check the output is an empty dict
     assert results == {}, "should return empty dict for insufficient data"
+
+
+def make_causal_frame(n=200):
+    rng = np.random.default_rng(0)
+    driver = rng.normal(size=n)
+    target = np.zeros(n)
+    for t in range(2, n):
+        target[t] = 0.6 * driver[t - 2] + 0.2 * target[t - 1] + rng.normal(0, 0.5)
+    return pd.DataFrame(
+        {"target": target, "driver": driver, "noise": rng.normal(size=n)},
+        index=pd.date_range("2020-01-01", periods=n),
+    )
+
+
+def test_screen_matches_statsmodels_ssr_ftest():
+    df = make_causal_frame()
+    screen = granger_screen(df, target="target", max_lag=5, use_cache=False)
+
+    assert isinstance(screen, pd.DataFrame)
+    assert screen.loc["driver", "significant"]
+    assert screen.loc["driver", "lag"] == 2
+
+    expected = grangercausalitytests(df[["target", "noise"]], maxlag=5)
+    p_values = [expected[lag][0]["ssr_ftest"][1] for lag in range(1, 6)]
+    assert np.isclose(screen.loc["noise", "p_value"], min(p_values), rtol=1e-9)
+
+
+def test_screen_results_are_cached(monkeypatch):
+    df = make_causal_frame()
+    clear_screen_cache()
+    first = granger_screen(df, target="target", max_lag=5)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached screen should not be recomputed")
+
+    monkeypatch.setattr(granger_causality, "_screen", fail)
+    second = granger_screen(df, target="target", max_lag=5, alpha=0.01)
+
+    pd.testing.assert_series_equal(first["p_value"], second["p_value"])
+    assert second["significant"].equals(second["p_value"] < 0.01)
+
+
+def test_parallel_screen_matches_serial():
+    df = make_causal_frame()
+    serial = granger_screen(df, target="target", max_lag=5, use_cache=False)
+    parallel = granger_screen(df, target="target", max_lag=5, n_jobs=2, use_cache=False)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_pvalue_curves_match_every_lag():
+    df = make_causal_frame()
+    curves = granger_pvalue_curves(
+        df["target"].to_numpy(), df[["driver", "noise"]].to_numpy(), max_lag=8
+    )
+
+    assert curves.shape == (2, 8)
+    for i, predictor in enumerate(["driver", "noise"]):
+        expected = grangercausalitytests(df[["target", predictor]], maxlag=8)
+        p_values = [expected[lag][0]["ssr_ftest"][1] for lag in range(1, 9)]
+        np.testing.assert_allclose(curves[i], p_values, rtol=1e-8)
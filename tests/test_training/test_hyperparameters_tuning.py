@@ -1,6 +1,14 @@
+import os
+import tempfile
 import unittest
 import numpy as np
-from src.training.hyperparameters_tuning import objective, tune_hyperparameters
+import optuna
+from src.training import lstm_training
+from src.training.hyperparameters_tuning import (
+    objective,
+    tune_hyperparameters,
+    PruningCallback,
+)
 
 
 # mock train_lstm function
@@ -11,6 +19,19 @@ def mock_train_lstm(X_train, y_train, X_val, y_val, params):
     return None, history
 
 
+# mock train_lstm running the callbacks on a diverging validation loss
+def mock_train_lstm_with_callbacks(
+    X_train, y_train, X_val, y_val, params, callbacks=None, use_cache=False
+):
+    val_loss = []
+    for epoch, value in enumerate([0.5, 1.0, 2.0, 4.0]):
+        val_loss.append(value)
+        for callback in callbacks or []:
+            callback.on_epoch_end(epoch, {"val_loss": value})
+    history = type("obj", (object,), {"history": {"val_loss": val_loss}})
+    return None, history
+
+
 # mock trial class
 class MockTrial:
     def __init__(self, trial_params):
@@ -26,6 +47,20 @@ class MockTrial:
         return self.trial_params.get(name, choices[0])
 
 
+# trial that is pruned once a reported value exceeds the threshold
+class PrunableTrial(MockTrial):
+    def __init__(self, threshold):
+        super().__init__({})
+        self.threshold = threshold
+        self.reports = []
+
+    def report(self, value, step):
+        self.reports.append((step, value))
+
+    def should_prune(self):
+        return self.reports[-1][1] > self.threshold
+
+
 class TestHyperparameterTuning(unittest.TestCase):
     def setUp(self):
         self.X_train = np.random.rand(100, 10, 5)
@@ -71,3 +106,79 @@ class TestHyperparameterTuning(unittest.TestCase):
         self.assertTrue(hasattr(study, "best_trial"))
         self.assertTrue(hasattr(study.best_trial, "value"))
         self.assertTrue(hasattr(study.best_trial, "params"))
+
+    def test_model_cache_is_cleared_after_study(self):
+        lstm_training.get_model((10, 5), {"lstm_units": [8]}, use_cache=True)
+        tune_hyperparameters(
+            self.X_train,
+            self.y_train,
+            self.X_val,
+            self.y_val,
+            mock_train_lstm,
+            n_trials=1,
+        )
+        self.assertEqual(len(lstm_training._model_cache), 0)
+
+    def test_pruning_callback(self):
+        trial = PrunableTrial(threshold=1.0)
+        callback = PruningCallback(trial)
+
+        callback.on_epoch_end(0, {"loss": 0.3, "val_loss": 0.5})
+        self.assertEqual(trial.reports, [(0, 0.5)])
+        with self.assertRaises(optuna.TrialPruned):
+            callback.on_epoch_end(1, {"val_loss": 2.0})
+
+    def test_objective_prunes_through_callbacks(self):
+        trial = PrunableTrial(threshold=1.5)
+        with self.assertRaises(optuna.TrialPruned):
+            objective(
+                trial,
+                self.X_train,
+                self.y_train,
+                self.X_val,
+                self.y_val,
+                mock_train_lstm_with_callbacks,
+            )
+        self.assertEqual(trial.reports, [(0, 0.5), (1, 1.0), (2, 2.0)])
+
+    def test_study_is_resumed_from_storage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = f"sqlite:///{os.path.join(tmp, 'tuning.db')}"
+            data = (self.X_train, self.y_train, self.X_val, self.y_val)
+
+            tune_hyperparameters(*data, mock_train_lstm, n_trials=2, storage=storage)
+            study = tune_hyperparameters(
+                *data, mock_train_lstm, n_trials=3, storage=storage
+            )
+
+            # only the missing trial is run
+            self.assertEqual(len(study.trials), 3)
+
+    def test_parallel_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = f"sqlite:///{os.path.join(tmp, 'tuning.db')}"
+
+            study = tune_hyperparameters(
+                self.X_train,
+                self.y_train,
+                self.X_val,
+                self.y_val,
+                mock_train_lstm,
+                n_trials=4,
+                storage=storage,
+                n_jobs=2,
+            )
+
+            finished = [t for t in study.trials if t.state.is_finished()]
+            self.assertGreaterEqual(len(finished), 4)
+
+    def test_parallel_needs_storage(self):
+        with self.assertRaises(ValueError):
+            tune_hyperparameters(
+                self.X_train,
+                self.y_train,
+                self.X_val,
+                self.y_val,
+                mock_train_lstm,
+                n_jobs=2,
+            )
@@ -3,7 +3,9 @@ import numpy as np
 from tensorflow.keras.models import Model
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
 
-from src.training.lstm_training import train_lstm
+from src.training import lstm_training
+from src.training.lstm_training import train_lstm, clear_model_cache, get_model
+from src.processing.input_pipeline import array_dataset
 
 
 class TestLSTMTraining(unittest.TestCase):
@@ -68,6 +70,106 @@ class TestLSTMTraining(unittest.TestCase):
         # check if the model's output shape matches the expected shape
         self.assertEqual(output.shape, (1, 1))  # Batch size of 1, output of 1 value
 
+    def test_dataset_input(self):
+        train = array_dataset(self.X_train, self.y_train)
+        val = array_dataset(self.X_val, self.y_val)
+
+        model, history = train_lstm(train, None, val, None, self.params)
+
+        self.assertEqual(len(history.history["val_loss"]), self.params["epochs"])
+        self.assertEqual(model.input_shape, (None, 10, 5))
+
+    def test_cached_model_is_reset(self):
+        clear_model_cache()
+        params = dict(self.params, epochs=2)
+        first, history = train_lstm(
+            self.X_train, self.y_train, self.X_val, self.y_val, params, use_cache=True
+        )
+        trained_weights = first.get_weights()
+
+        params["learning_rate"] = 0.01
+        second, history = train_lstm(
+            self.X_train, self.y_train, self.X_val, self.y_val, params, use_cache=True
+        )
+
+        self.assertIs(first, second)
+        self.assertAlmostEqual(float(second.optimizer.learning_rate.numpy()), 0.01)
+        # weights were reset before training, not trained further
+        self.assertEqual(int(second.optimizer.iterations.numpy()), 2 * 4)
+        self.assertFalse(
+            all(
+                np.allclose(a, b) for a, b in zip(trained_weights, second.get_weights())
+            )
+        )
+        self.assertEqual(set(history.timings), {"tracing", "training"})
+
+        # a different architecture gets its own model
+        other, _ = train_lstm(
+            self.X_train,
+            self.y_train,
+            self.X_val,
+            self.y_val,
+            dict(params, lstm_units=[16, 16]),
+            use_cache=True,
+        )
+        self.assertIsNot(other, first)
+        clear_model_cache()
+
+    def test_cache_hit_across_dropout_and_learning_rate(self):
+        clear_model_cache()
+        params = dict(self.params, dropout_rate=0.2, learning_rate=0.001)
+        first, _ = train_lstm(
+            self.X_train, self.y_train, self.X_val, self.y_val, params, use_cache=True
+        )
+        train_function = first.train_function
+
+        second, _ = train_lstm(
+            self.X_train,
+            self.y_train,
+            self.X_val,
+            self.y_val,
+            dict(params, dropout_rate=0.5, learning_rate=0.01),
+            use_cache=True,
+        )
+
+        self.assertIs(first, second)
+        self.assertEqual(len(lstm_training._model_cache), 1)
+        # the traced train function is reused with the new rates
+        self.assertIs(second.train_function, train_function)
+        rates = [
+            float(layer.rate.numpy())
+            for layer in second.layers
+            if isinstance(layer, lstm_training.VariableDropout)
+        ]
+        self.assertTrue(rates)
+        self.assertTrue(all(rate == 0.5 for rate in rates))
+        self.assertAlmostEqual(float(second.optimizer.learning_rate.numpy()), 0.01)
+        clear_model_cache()
+
+    def test_uncached_model_uses_keras_dropout(self):
+        model = get_model((10, 3), self.params)
+        self.assertFalse(
+            any(
+                isinstance(layer, lstm_training.VariableDropout)
+                for layer in model.layers
+            )
+        )
+
+    def test_model_cache_is_bounded(self):
+        clear_model_cache()
+        models = [
+            get_model((10, n_features), self.params, use_cache=True)
+            for n_features in (3, 4, 5)
+        ]
+
+        self.assertEqual(
+            len(lstm_training._model_cache), lstm_training.MAX_CACHED_MODELS
+        )
+        # the least recently used architecture was evicted and is built again
+        self.assertIsNot(get_model((10, 3), self.params, use_cache=True), models[0])
+        self.assertIs(get_model((10, 5), self.params, use_cache=True), models[2])
+        clear_model_cache()
+
 
 if __name__ == "__main__":
     unittest.main()
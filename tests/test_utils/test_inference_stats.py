@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from src.utils.inference_stats import BatchTimer, InferenceStats
+
+
+class TestInferenceStats(unittest.TestCase):
+
+    def test_summary(self):
+        stats = InferenceStats()
+        stats.record(rows=4, tokens=30, padded_tokens=40, seconds=0.5)
+        stats.record(rows=2, tokens=50, padded_tokens=60, seconds=1.5)
+        summary = stats.summary()
+
+        self.assertEqual(summary["batches"], 2)
+        self.assertEqual(summary["rows"], 6)
+        self.assertEqual(summary["tokens_per_second"], 40.0)
+        self.assertEqual(summary["rows_per_second"], 3.0)
+        self.assertEqual(summary["padding_efficiency"], 0.8)
+        self.assertEqual(summary["latency_p50"], 1.0)
+        np.testing.assert_allclose(stats.tokens_per_second(), [60.0, 100 / 3])
+
+    def test_empty(self):
+        summary = InferenceStats().summary()
+        self.assertEqual(summary["tokens_per_second"], 0.0)
+        self.assertEqual(summary["latency_p99"], 0.0)
+        self.assertIn("0 rows", InferenceStats().format())
+
+    def test_merge(self):
+        stats, other = InferenceStats(), InferenceStats()
+        stats.record(1, 10, 10, 1.0)
+        other.record(2, 20, 30, 2.0)
+        other.throttled_seconds = 5.0
+        stats.merge(other)
+
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats.summary()["throttled_seconds"], 5.0)
+
+    def test_batch_timer(self):
+        stats = InferenceStats()
+        with BatchTimer(stats, np.array([3, 5, 4]), rows=3):
+            pass
+        with BatchTimer(None, np.array([3]), rows=1):
+            pass
+
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats.tokens, [12])
+        self.assertEqual(stats.padded_tokens, [15])
+
+    def test_failed_batch_is_not_recorded(self):
+        stats = InferenceStats()
+        with self.assertRaises(RuntimeError):
+            with BatchTimer(stats, np.array([3]), rows=1):
+                raise RuntimeError("out of memory")
+        self.assertEqual(len(stats), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
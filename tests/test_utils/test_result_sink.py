@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from src.utils.result_sink import ResultSink
+
+COLUMNS = ["date", "title", "score"]
+
+
+def make_rows(start, n):
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2023-01-01", periods=n, freq="D")
+            + pd.Timedelta(days=start),
+            "title": [f"title {i}" for i in range(start, start + n)],
+            "score": np.arange(start, start + n) / 10 + 1,
+            "extra": 0,
+        }
+    )
+
+
+class TestResultSink(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def path(self, name):
+        return os.path.join(self.test_dir, "out", name)
+
+    def test_rows_are_buffered(self):
+        path = self.path("scores.csv")
+        sink = ResultSink(path, COLUMNS, flush_rows=10, float_format="%.1f")
+        sink.write(make_rows(0, 4))
+        sink.write(make_rows(4, 4))
+
+        with open(path) as f:
+            self.assertEqual(f.read(), "date,title,score\n")
+        self.assertEqual(sink.rows, 0)
+
+        sink.write(make_rows(8, 4))
+        self.assertEqual(sink.rows, 12)
+        sink.write(make_rows(12, 1))
+        sink.close()
+
+        result = pd.read_csv(path)
+        self.assertEqual(list(result.columns), COLUMNS)
+        self.assertEqual(len(result), 13)
+        self.assertEqual(result["score"].iloc[-1], 2.2)
+
+    def test_flush_after_seconds(self):
+        sink = ResultSink(self.path("scores.csv"), COLUMNS, flush_seconds=0.0)
+        sink.write(make_rows(0, 2))
+        self.assertEqual(sink.rows, 2)
+
+    def test_jsonl(self):
+        path = self.path("scores.jsonl")
+        with ResultSink(path, COLUMNS) as sink:
+            sink.write(make_rows(0, 3))
+        self.assertEqual(sink.format, "jsonl")
+
+        result = ResultSink(path, COLUMNS).read()
+        self.assertEqual(list(result["title"]), ["title 0", "title 1", "title 2"])
+
+    def test_interrupted_write_is_truncated(self):
+        path = self.path("scores.csv")
+        with ResultSink(path, COLUMNS) as sink:
+            sink.write(make_rows(0, 5))
+        with open(path, "a") as f:
+            f.write("2023-01-06,partial ro")
+
+        sink = ResultSink(path, COLUMNS)
+        self.assertEqual(sink.rows, 5)
+        sink.write(make_rows(5, 2))
+        sink.close()
+        self.assertEqual(list(sink.read()["title"]), [f"title {i}" for i in range(7)])
+
+    def test_stale_checkpoint_is_ignored(self):
+        path = self.path("scores.csv")
+        with ResultSink(path, COLUMNS) as sink:
+            sink.write(make_rows(0, 5))
+        # replaced by a shorter file after the checkpoint
+        make_rows(0, 2)[COLUMNS].to_csv(path, index=False)
+
+        sink = ResultSink(path, COLUMNS)
+        self.assertEqual(sink.rows, 2)
+        sink.write(make_rows(2, 1))
+        sink.close()
+        with open(path, "rb") as f:
+            self.assertNotIn(b"\x00", f.read())
+        self.assertEqual(list(sink.read()["title"]), ["title 0", "title 1", "title 2"])
+
+    def test_no_suffix_is_csv(self):
+        sink = ResultSink(self.path("scores"), COLUMNS)
+        self.assertEqual(sink.format, "csv")
+        self.assertTrue(os.path.isfile(self.path("scores")))
+
+    def test_existing_file_without_checkpoint(self):
+        path = self.path("scores.csv")
+        os.makedirs(os.path.dirname(path))
+        make_rows(0, 3)[COLUMNS].to_csv(path, index=False)
+
+        with ResultSink(path, COLUMNS) as sink:
+            self.assertEqual(sink.rows, 3)
+            sink.write(make_rows(3, 1))
+        self.assertEqual(len(pd.read_csv(path)), 4)
+
+    def test_parquet_parts(self):
+        path = self.path("scores.parquet")
+        sink = ResultSink(path, COLUMNS, flush_rows=2)
+        sink.write(make_rows(0, 2))
+        sink.write(make_rows(2, 1))
+        sink.close()
+
+        self.assertEqual(len(os.listdir(path)), 2)
+        reopened = ResultSink(path, COLUMNS)
+        self.assertEqual(reopened.rows, 3)
+        pd.testing.assert_frame_equal(reopened.read(), make_rows(0, 3)[COLUMNS])
+
+    def test_parquet_needs_an_engine(self):
+        with patch("importlib.util.find_spec", return_value=None):
+            with self.assertRaises(ImportError):
+                ResultSink(self.path("scores.parquet"), COLUMNS)
+        self.assertFalse(os.path.exists(self.path("scores.parquet")))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ResultSink(self.path("scores.xlsx"), COLUMNS)
+
+
+if __name__ == "__main__":
+    unittest.main()
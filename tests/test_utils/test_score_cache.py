@@ -0,0 +1,90 @@
+import math
+import os
+import tempfile
+import unittest
+
+from src.utils.score_cache import ScoreCache, normalize_text
+
+
+class TestScoreCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "cache", "scores.sqlite")
+        self.namespace = ScoreCache.namespace("model", ["bullish", "bearish"])
+
+    def tearDown(self):
+        for root, dirs, files in os.walk(self.test_dir, topdown=False):
+            for name in files:
+                os.remove(os.path.join(root, name))
+            for name in dirs:
+                os.rmdir(os.path.join(root, name))
+        os.rmdir(self.test_dir)
+
+    def test_roundtrip(self):
+        cache = ScoreCache()
+        key = ScoreCache.key("Bitcoin rallies", self.namespace)
+        cache.put(key, [0.25, 0.75])
+        cache.put(ScoreCache.key("unrelated", self.namespace), float("nan"))
+
+        self.assertEqual(cache.get(key), [0.25, 0.75])
+        self.assertTrue(
+            math.isnan(cache.get(ScoreCache.key("unrelated", self.namespace)))
+        )
+        self.assertIsNone(cache.get(ScoreCache.key("missing", self.namespace)))
+
+    def test_key_normalizes_whitespace(self):
+        self.assertEqual(normalize_text("  Bitcoin\n rallies\t"), "Bitcoin rallies")
+        self.assertEqual(
+            ScoreCache.key("Bitcoin  rallies ", self.namespace),
+            ScoreCache.key("Bitcoin rallies", self.namespace),
+        )
+
+    def test_namespaces_are_separate(self):
+        other = ScoreCache.namespace("model", ["bearish", "bullish"])
+        self.assertNotEqual(other, self.namespace)
+        self.assertNotEqual(
+            ScoreCache.key("text", other), ScoreCache.key("text", self.namespace)
+        )
+
+    def test_least_recently_used_are_evicted(self):
+        cache = ScoreCache(max_entries=2)
+        cache.put("a", 1.0)
+        cache.put("b", 2.0)
+        cache.get("a")
+        cache.put("c", 3.0)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1.0, "c": 3.0})
+
+    def test_replaced_entries_are_counted_once(self):
+        cache = ScoreCache(max_entries=2)
+        cache.put("a", 1.0)
+        cache.put("a", 1.5)
+        cache.put_many({"a": 2.0, "b": 2.0})
+
+        self.assertEqual(cache.get_many(["a", "b"]), {"a": 2.0, "b": 2.0})
+        cache.put("c", 3.0)
+        self.assertEqual(len(cache), 2)
+
+    def test_stats(self):
+        cache = ScoreCache()
+        cache.put_many({"a": 1.0, "b": 2.0})
+        cache.get_many(["a", "b", "c", "d"])
+
+        self.assertEqual(
+            cache.stats(), {"hits": 2, "misses": 2, "hit_rate": 0.5, "entries": 2}
+        )
+
+    def test_persists_across_instances(self):
+        cache = ScoreCache(self.path)
+        cache.put("a", [0.1, 0.9])
+        cache.close()
+
+        cache = ScoreCache(self.path)
+        self.assertEqual(cache.get("a"), [0.1, 0.9])
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
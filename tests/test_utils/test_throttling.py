@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch
+from src.utils.throttling import (
+    AdaptiveThrottle,
+    FixedThrottle,
+    NoThrottle,
+    get_throttle,
+)
+
+
+class BusyThrottle(AdaptiveThrottle):
+    # load readings in order, then idle
+    def __init__(self, loads, **kwargs):
+        super().__init__(max_temperature=None, **kwargs)
+        self.loads = list(loads)
+
+    def _load(self):
+        return self.loads.pop(0) if self.loads else 0.0
+
+
+class TestThrottling(unittest.TestCase):
+
+    def test_default_is_no_pause(self):
+        self.assertIsInstance(get_throttle(None), NoThrottle)
+        with patch("time.sleep") as sleep:
+            self.assertEqual(get_throttle(None).wait(True), 0.0)
+        sleep.assert_not_called()
+
+    def test_get_throttle_by_name(self):
+        self.assertIsInstance(get_throttle("fixed"), FixedThrottle)
+        self.assertIsInstance(get_throttle("adaptive"), AdaptiveThrottle)
+        throttle = FixedThrottle(1.0)
+        self.assertIs(get_throttle(throttle), throttle)
+        with self.assertRaises(ValueError):
+            get_throttle("sometimes")
+
+    def test_fixed_pauses_on_month_change(self):
+        throttle = FixedThrottle(10.0)
+        with patch("time.sleep") as sleep:
+            self.assertEqual(throttle.wait(False), 0.0)
+            self.assertEqual(throttle.wait(True), 10.0)
+        sleep.assert_called_once_with(10.0)
+
+    def test_adaptive_waits_while_busy(self):
+        throttle = BusyThrottle([3.0, 2.0, 0.5], max_load=1.0, poll_seconds=5.0)
+        with patch("time.sleep") as sleep:
+            self.assertEqual(throttle.wait(False), 10.0)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_adaptive_ignores_own_load(self):
+        # one runnable thread per CPU is the analyzer's own inference
+        throttle = BusyThrottle([1.0, 1.2])
+        with patch("time.sleep") as sleep:
+            self.assertEqual(throttle.wait(False), 0.0)
+            self.assertEqual(throttle.wait(False), 0.0)
+        sleep.assert_not_called()
+
+    def test_adaptive_max_wait(self):
+        throttle = BusyThrottle([3.0] * 10, poll_seconds=5.0, max_wait=12.0)
+        with patch("time.sleep") as sleep:
+            self.assertEqual(throttle.wait(True), 12.0)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [5, 5, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()